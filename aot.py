@@ -0,0 +1,110 @@
+"""
+Ahead-of-time compilation of a pattern library into a Python module.
+
+The input file holds one named pattern per line, the name and the
+pattern separated by the first run of whitespace; blank lines and lines
+starting with # are skipped. The generated module carries the compiled
+tables of every pattern as literals and rebuilds them on import:
+
+    python3 aot.py rules.txt -o rules.py
+
+    import rules
+    rules.NFA['ip'].match('10.0.0.1')
+    rules.REGEX['email'].search(line)
+
+so a short-lived job pays neither tokenizing nor Thompson construction
+at startup, and Python caches the tables in the module's .pyc.
+"""
+import sys
+import argparse
+from typing import Dict, IO, List
+
+import nfa
+import regex
+from nfa.export import to_tables as nfa_tables
+from regex.tables import to_tables as regex_tables
+
+
+IMPLS = ['nfa', 'regex']
+
+
+def read_patterns(f: IO[str]) -> Dict[str, str]:
+    """Named patterns of a library file, in file order."""
+    patterns: Dict[str, str] = {}
+    for lineno, line in enumerate(f, 1):
+        line = line.rstrip('\r\n')
+        if not line.strip() or line.lstrip().startswith('#'):
+            continue
+        parts = line.strip().split(None, 1)
+        if len(parts) != 2:
+            raise Exception(f'line {lineno}: expected "name pattern"')
+        name, pattern = parts
+        if name in patterns:
+            raise Exception(f'line {lineno}: duplicate pattern name {name!r}')
+        patterns[name] = pattern
+    return patterns
+
+
+def compile_tables(patterns: Dict[str, str], impl: str) -> Dict[str, object]:
+    """Compile every pattern with impl, return its tables by name."""
+    tables: Dict[str, object] = {}
+    for name, pattern in patterns.items():
+        try:
+            if impl == 'nfa':
+                tables[name] = nfa_tables(nfa.compile(pattern))
+            else:
+                tables[name] = regex_tables(regex.Regex(pattern))
+        except Exception as e:
+            raise Exception(f'{impl} cannot compile {name!r}: {e}') from e
+    return tables
+
+
+def literal(name: str, values: Dict[str, object]) -> List[str]:
+    """Source lines assigning a dict literal, one entry per line."""
+    lines = [f'{name} = {{\n']
+    for k, v in values.items():
+        lines.append(f'    {k!r}: {v!r},\n')
+    lines.append('}\n')
+    return lines
+
+
+def build(patterns: Dict[str, str], impls: List[str], source: str = '') -> str:
+    """Source code of a module holding patterns compiled with each of impls."""
+    lines = ['"""\n', f'Pattern library compiled from {source or "a pattern file"} by aot.py, do not edit.\n', '"""\n']
+    if 'nfa' in impls:
+        lines.append('from nfa.export import from_tables as load_nfa\n')
+    if 'regex' in impls:
+        lines.append('from regex.tables import from_tables as load_regex\n')
+    lines.append('\n')
+    lines += literal('SOURCES', patterns)
+    if 'nfa' in impls:
+        lines.append('\n')
+        lines += literal('_NFA', compile_tables(patterns, 'nfa'))
+        lines.append('\n_edges = {}\nNFA = {name: load_nfa(t, _edges) for name, t in _NFA.items()}\n')
+    if 'regex' in impls:
+        lines.append('\n')
+        lines += literal('_REGEX', compile_tables(patterns, 'regex'))
+        lines.append('\nREGEX = {name: load_regex(t) for name, t in _REGEX.items()}\n')
+    return ''.join(lines)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Compile a file of named patterns into an importable module.')
+    parser.add_argument('patterns', type=str, help='file of "name pattern" lines')
+    parser.add_argument('--output', '-o', type=str, required=True,
+                        help='Python module to write')
+    parser.add_argument('--impl', choices=IMPLS, action='append',
+                        help='engine to compile for, repeatable (default: both)')
+    args = parser.parse_args()
+
+    with open(args.patterns, encoding='utf-8') as f:
+        patterns = read_patterns(f)
+    code = build(patterns, args.impl or IMPLS, args.patterns)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        f.write(code)
+    print(f'{len(patterns)} patterns written to {args.output}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
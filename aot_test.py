@@ -0,0 +1,64 @@
+import io
+import unittest
+
+import aot
+
+
+RULES = '''
+# sample rule pack
+ip      \\d+\\.\\d+\\.\\d+\\.\\d+
+email   \\w+@\\w+\\.com
+named   (?P<user>\\w+):(?P<id>\\d+)
+'''
+
+
+def load(code):
+    module = {}
+    exec(compile(code, 'rules.py', 'exec'), module)
+    return module
+
+
+class TestReadPatterns(unittest.TestCase):
+    """Test the pattern library file format"""
+
+    def test_read(self):
+        """Test names and patterns, comments and blank lines skipped"""
+        patterns = aot.read_patterns(io.StringIO(RULES))
+        self.assertEqual(list(patterns), ['ip', 'email', 'named'])
+        self.assertEqual(patterns['email'], '\\w+@\\w+\\.com')
+
+    def test_pattern_with_spaces(self):
+        """Test only the first run of whitespace separates the name"""
+        self.assertEqual(aot.read_patterns(io.StringIO('greet  hello world\n')), {'greet': 'hello world'})
+
+    def test_errors(self):
+        """Test missing patterns and duplicate names are rejected"""
+        with self.assertRaises(Exception):
+            aot.read_patterns(io.StringIO('lonely\n'))
+        with self.assertRaises(Exception):
+            aot.read_patterns(io.StringIO('a x\na y\n'))
+
+
+class TestBuild(unittest.TestCase):
+    """Test generated modules"""
+
+    def test_both(self):
+        """Test the module rebuilds working patterns for both engines"""
+        module = load(aot.build(aot.read_patterns(io.StringIO(RULES)), aot.IMPLS, 'rules.txt'))
+        self.assertTrue(module['NFA']['ip'].match('10.0.0.1'))
+        self.assertFalse(module['NFA']['ip'].match('10.0.0'))
+        self.assertEqual(module['NFA']['email'].search('to: me@host.com'), (4, 15))
+        m = module['REGEX']['named'].match('bob:12')
+        self.assertEqual(m.groupdict(), {'user': 'bob', 'id': '12'})
+        self.assertEqual(module['SOURCES']['ip'], '\\d+\\.\\d+\\.\\d+\\.\\d+')
+
+    def test_one_engine(self):
+        """Test only the chosen engine is compiled"""
+        module = load(aot.build({'x': 'a+'}, ['nfa']))
+        self.assertIn('NFA', module)
+        self.assertNotIn('REGEX', module)
+
+    def test_unsupported(self):
+        """Test patterns an engine can't compile are reported by name"""
+        with self.assertRaisesRegex(Exception, "'bad'"):
+            aot.build({'bad': '(ab)+'}, ['regex'])
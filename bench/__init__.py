@@ -0,0 +1,5 @@
+"""
+Benchmarks for the regex and nfa engines, with stdlib re as a baseline.
+
+Run with `python3 -m bench`, see bench/__main__.py for the commands.
+"""
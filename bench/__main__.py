@@ -0,0 +1,149 @@
+"""
+Benchmark command line.
+
+    python3 -m bench throughput [--sizes 10,1K,100K] [-o out.json]
+    python3 -m bench pathological [--ns 8,16,32] [-o out.json]
+    python3 -m bench compare old.json new.json [--threshold 0.1]
+    python3 -m bench footprint PATTERN... [--limit BYTES]
+    python3 -m bench layout [--repeat 7]
+"""
+import sys
+import logging
+import argparse
+from typing import List
+
+from . import footprint, pathological, stats, throughput
+from .engines import ENGINES
+
+
+def csv(s: str) -> List[str]:
+    return [x for x in s.split(',') if x]
+
+
+def cmd_throughput(args: argparse.Namespace) -> int:
+    sizes = [stats.parse_size(s) for s in csv(args.sizes)]
+    results = throughput.run(csv(args.families), csv(args.engines), sizes,
+                             args.warmup, args.repeat, args.max_seconds)
+    stats.save(results, {k: v for k, v in vars(args).items() if k != 'func'}, args.output)
+    return 0
+
+
+def cmd_pathological(args: argparse.Namespace) -> int:
+    ns = [int(n) for n in csv(args.ns)]
+    results, summaries = pathological.run(csv(args.cases), csv(args.engines), ns,
+                                          args.warmup, args.repeat, args.max_seconds)
+    stats.save(results, {k: v for k, v in vars(args).items() if k != 'func'}, args.output,
+               {'growth': summaries})
+    failed = 0
+    for s in summaries:
+        print(f'{s["case"]:24s} {s["engine"]:6s} n<={s["max_n"]} ({s["stopped"]}) '
+              f'time {s["time_growth"]} memory {s["memory_growth"]} '
+              f'limit {"demo" if s["demo"] else s["limit"]} {"ok" if s["ok"] else "FAIL"}',
+              file=sys.stderr)
+        failed += not s['ok']
+    return 1 if failed else 0
+
+
+def cmd_footprint(args: argparse.Namespace) -> int:
+    results = footprint.report(args.patterns, csv(args.engines))
+    over = 0
+    for r in results:
+        if 'error' in r:
+            print(f'{r["engine"]:6s} {r["pattern"]}: {r["error"]}')
+            continue
+        parts = ', '.join(f'{k} {v}' for k, v in sorted(r['sizes'].items(), key=lambda kv: -kv[1]))
+        flag = ''
+        if args.limit is not None and r['total'] > args.limit:
+            flag = ' OVER LIMIT'
+            over += 1
+        print(f'{r["engine"]:6s} {r["pattern"]}: {r["total"]} bytes (traced {r["traced"]}){flag}\n'
+              f'       {parts}')
+    if args.output:
+        stats.save(results, {k: v for k, v in vars(args).items() if k != 'func'}, args.output)
+    return 1 if over else 0
+
+
+def cmd_layout(args: argparse.Namespace) -> int:
+    print(f'{"class":18s} {"before":>6s} {"after":>6s}  bytes per instance, without and with __slots__')
+    for name, sizes in footprint.layout().items():
+        print(f'{name:18s} {sizes["before"]:6d} {sizes["after"]:6d}'
+              + (f'  ({sizes["dict"]} in __dict__)' if sizes['dict'] else ''))
+    print(f'\n{"loop":18s} {"before":>8s} {"after":>8s}  ms per batch, without and with __slots__')
+    for name, times in footprint.speed(args.repeat).items():
+        print(f'{name:18s} {times["before"]*1e3:8.3f} {times["after"]*1e3:8.3f}'
+              f'  {times["before"] / times["after"] - 1:+.1%}')
+    return 0
+
+
+def cmd_compare(args: argparse.Namespace) -> int:
+    rows = stats.compare(stats.load(args.old), stats.load(args.new), args.threshold)
+    regressions = 0
+    for row in rows:
+        family, case, engine, size = row['key']
+        print(f'{family + "/" + case:28s} {engine:6s} {size:>10d} '
+              f'{row["old"]*1e3:10.3f}ms {row["new"]*1e3:10.3f}ms {row["ratio"]:6.2f}x {row["verdict"]}')
+        if row['verdict'] == 'regression':
+            regressions += 1
+    print(f'{len(rows)} compared, {regressions} regressions over {args.threshold:.0%}')
+    return 1 if regressions else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog='python3 -m bench', description='Benchmark the regex engines.')
+    parser.add_argument('--loglevel', '-l', default='WARNING')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('throughput', help='matches/sec and ns/char over pattern families')
+    p.add_argument('--families', default=','.join(throughput.FAMILIES),
+                   help='comma separated pattern families (default: all)')
+    p.add_argument('--engines', default=','.join(ENGINES),
+                   help='comma separated engines (default: all)')
+    p.add_argument('--sizes', default='10,1K,100K',
+                   help='comma separated input sizes, up to 100M (default: 10,1K,100K)')
+    p.add_argument('--warmup', type=int, default=1, help='untimed runs before measuring')
+    p.add_argument('--repeat', type=int, default=5, help='timed runs per measurement')
+    p.add_argument('--max-seconds', type=float, default=10.0,
+                   help='skip sizes predicted to take longer per run (default: 10)')
+    p.add_argument('--output', '-o', help='JSON result file (default: stdout)')
+    p.set_defaults(func=cmd_throughput)
+
+    p = sub.add_parser('pathological', help='growth of time and memory on worst-case patterns')
+    p.add_argument('--cases', default=','.join(pathological.CASES),
+                   help='comma separated cases (default: all)')
+    p.add_argument('--engines', default=','.join(ENGINES),
+                   help='comma separated engines (default: all)')
+    p.add_argument('--ns', default='8,16,32,64,128,256',
+                   help='comma separated values of n (default: 8,16,32,64,128,256)')
+    p.add_argument('--warmup', type=int, default=1, help='untimed runs before measuring')
+    p.add_argument('--repeat', type=int, default=3, help='timed runs per measurement')
+    p.add_argument('--max-seconds', type=float, default=2.0,
+                   help='budget timeout and skip threshold per run (default: 2)')
+    p.add_argument('--output', '-o', help='JSON result file (default: stdout)')
+    p.set_defaults(func=cmd_pathological)
+
+    p = sub.add_parser('footprint', help='retained memory of compiled patterns by construct')
+    p.add_argument('--engines', default=','.join(footprint.COMPILERS),
+                   help='comma separated engines (default: nfa,regex)')
+    p.add_argument('--limit', type=int, help='exit 1 if a pattern retains more bytes')
+    p.add_argument('--output', '-o', help='also write JSON results here')
+    p.add_argument('patterns', nargs='+')
+    p.set_defaults(func=cmd_footprint)
+
+    p = sub.add_parser('layout', help='bytes per instance and match speed of the hot classes, before and after __slots__')
+    p.add_argument('--repeat', type=int, default=7, help='timed runs of each match loop (default: 7)')
+    p.set_defaults(func=cmd_layout)
+
+    p = sub.add_parser('compare', help='flag regressions between two result files')
+    p.add_argument('old')
+    p.add_argument('new')
+    p.add_argument('--threshold', type=float, default=0.1,
+                   help='relative slowdown counted as regression (default: 0.1)')
+    p.set_defaults(func=cmd_compare)
+
+    args = parser.parse_args()
+    logging.basicConfig(level=args.loglevel, format='%(asctime)s [%(levelname)s] %(message)s')
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
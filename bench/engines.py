@@ -0,0 +1,33 @@
+"""
+Uniform adapters over the engines under test.
+"""
+import re
+from typing import Callable, Dict
+
+import nfa
+import regex
+
+# Count the non-overlapping matches in a string
+Finder = Callable[[str], int]
+
+
+def regex_finder(pattern: str) -> Finder:
+    r = regex.Regex(pattern)
+    return lambda s: sum(1 for _ in r.finditer(s))
+
+
+def nfa_finder(pattern: str) -> Finder:
+    graph = nfa.compile(pattern)
+    return lambda s: sum(1 for _ in graph.finditer(s))
+
+
+def re_finder(pattern: str) -> Finder:
+    r = re.compile(pattern)
+    return lambda s: sum(1 for _ in r.finditer(s))
+
+
+ENGINES: Dict[str, Callable[[str], Finder]] = {
+    'regex': regex_finder,
+    'nfa': nfa_finder,
+    're': re_finder,
+}
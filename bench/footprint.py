@@ -0,0 +1,188 @@
+"""
+Memory footprint of compiled patterns, by getsizeof walk and by tracemalloc.
+
+The walk (nfa.footprint, regex.footprint) is cheap and breaks the size
+down by construct; tracemalloc measures what compiling actually left
+allocated, including anything the walk doesn't know about.
+"""
+import copy
+import sys
+import tracemalloc
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+import nfa
+import regex
+from nfa.edges import Char, Charset, Empty
+from nfa.nodes import Node
+from nfa.scanner import plan
+from regex.matcher import Context, Group, GroupMatch
+from regex.matcher import Charset as RegexCharset
+from regex.regex import Search
+
+from .stats import Record, measure
+
+COMPILERS = {
+    'nfa': (nfa.compile, nfa.footprint),
+    'regex': (regex.Regex, regex.footprint),
+}
+
+
+def traced(build: Callable[[], Any]) -> Tuple[Any, int]:
+    """Run build, return its result and the bytes still allocated while it's alive."""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        obj = build()
+        return obj, tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+
+
+def report(patterns: Sequence[str], engines: Sequence[str]) -> List[Record]:
+    """Footprint record of every pattern compiled by every engine."""
+    results = []
+    for pattern in patterns:
+        for engine in engines:
+            compiler, walk = COMPILERS[engine]
+            record: Record = {'pattern': pattern, 'engine': engine}
+            try:
+                compiled, record['traced'] = traced(lambda: compiler(pattern))
+            except Exception as e:
+                record['error'] = str(e)
+                results.append(record)
+                continue
+            fp = walk(compiled)
+            record['total'] = fp.total
+            record['sizes'] = fp.sizes
+            record['counts'] = fp.counts
+            results.append(record)
+    return results
+
+
+def slot_values(obj: Any) -> Dict[str, Any]:
+    """The attributes obj keeps in the __slots__ of its class and bases."""
+    values = {}
+    for cls in type(obj).__mro__:
+        for name in getattr(cls, '__slots__', ()):
+            if not name.startswith('__') and hasattr(obj, name):
+                values[name] = getattr(obj, name)
+    return values
+
+
+# Class attributes that only make sense on the slotted original
+SLOT_ONLY = {'__slots__', '__dict__', '__weakref__', '__abstractmethods__', '_abc_impl'}
+
+# Slot-less copies of classes, built once each
+PLAIN: Dict[type, type] = {}
+
+
+def plain_class(cls: type) -> type:
+    """cls as it was before __slots__: a plain class with the methods and class attributes of cls and its bases."""
+    if cls not in PLAIN:
+        attrs: Dict[str, Any] = {}
+        for base in reversed(cls.__mro__[:-1]):
+            slots = getattr(base, '__slots__', ())
+            for name, value in vars(base).items():
+                if name not in SLOT_ONLY and name not in slots:
+                    attrs[name] = value
+        PLAIN[cls] = type(cls.__name__, (object,), attrs)
+    return PLAIN[cls]
+
+
+def plain_copy(obj: Any) -> Any:
+    """Copy of obj on plain_class(type(obj)), its attributes in a __dict__."""
+    o = object.__new__(plain_class(type(obj)))
+    for name, value in slot_values(obj).items():
+        setattr(o, name, value)
+    return o
+
+
+def unslotted(obj: Any) -> Callable[[], Any]:
+    """Maker of slot-less copies of obj."""
+    plain_class(type(obj))
+    return lambda: plain_copy(obj)
+
+
+def plain_graph(head: Node) -> Any:
+    """Copy of the graph from head with every node and edge slot-less."""
+    copies: Dict[int, Any] = {}
+
+    def copy_of(obj: Any) -> Any:
+        if id(obj) not in copies:
+            copies[id(obj)] = plain_copy(obj)
+        return copies[id(obj)]
+    for node in head.walk():
+        copy_of(node).outs = [(copy_of(e), copy_of(n)) for e, n in node.outs]
+    return copy_of(head)
+
+
+def per_instance(make: Callable[[], Any], n: int = 1000) -> int:
+    """Bytes tracemalloc sees allocated per object made, without the list holding them."""
+    objs, size = traced(lambda: [make() for _ in range(n)])
+    return round((size - sys.getsizeof(objs)) / n)
+
+
+def layout() -> Dict[str, Dict[str, int]]:
+    """
+    Bytes per instance of the hot classes: object and __dict__ by getsizeof,
+    and by tracemalloc before and after __slots__, the before side being
+    the same attributes on a slot-less class.
+    """
+    group = Group('g', 1)
+    samples = {
+        'nfa.Node': Node(),
+        'nfa.Empty': Empty(),
+        'nfa.Char': Char('a'),
+        'nfa.Charset': Charset({'a'}, True),
+        'regex.Context': Context(),
+        'regex.Charset': RegexCharset({'a'}),
+        'regex.Search': Search(RegexCharset({'a'}), '*', True),
+        'regex.Group': group,
+        'regex.GroupStart': group.left,
+        'regex.GroupMatch': GroupMatch(0, '', 0),
+    }
+    r = {}
+    for name, obj in samples.items():
+        d = getattr(obj, '__dict__', None)
+        r[name] = {'object': sys.getsizeof(obj), 'dict': sys.getsizeof(d) if d is not None else 0,
+                   'before': per_instance(unslotted(obj)),
+                   'after': per_instance(lambda: copy.copy(obj))}
+    return r
+
+
+# Patterns and inputs of the match loops speed() times
+SPEED_PATTERN = '(get|post|put)/[a-z]+/\\d{1,4}'
+SPEED_INPUTS = [f'{verb}/{path}/{n}' for verb in ['get', 'post', 'head'] for path in ['api', 'x1', 'users']
+                for n in [1, 12345, 67]] * 20
+
+
+def speed(repeat: int = 7) -> Dict[str, Dict[str, float]]:
+    """
+    Fastest seconds per batch of matches run on the hot classes before and
+    after __slots__: the nfa graph's nodes and edges, and the regex Context
+    reused across matches, each against slot-less copies.
+    """
+    graph = nfa.compile(SPEED_PATTERN)
+    # The analysis checks edge classes, which the copies aren't: share the original's
+    plan(graph)
+    plain = plain_graph(graph)
+    r = regex.Regex(SPEED_PATTERN)
+    ctx = Context()
+    plain_ctx = plain_copy(Context())
+    loops = {
+        'nfa match': (lambda: [plain.match(s) for s in SPEED_INPUTS],
+                      lambda: [graph.match(s) for s in SPEED_INPUTS]),
+        'nfa search': (lambda: [plain.search(s) for s in SPEED_INPUTS],
+                       lambda: [graph.search(s) for s in SPEED_INPUTS]),
+        'regex match': (lambda: [r.match(s, ctx=plain_ctx) for s in SPEED_INPUTS],
+                        lambda: [r.match(s, ctx=ctx) for s in SPEED_INPUTS]),
+    }
+    results = {}
+    for name, (before, after) in loops.items():
+        times: Dict[str, List[float]] = {'before': [], 'after': []}
+        # Interleaved, so drift in machine load hits both sides alike
+        for _ in range(repeat):
+            times['before'] += measure(before, 1, 1)
+            times['after'] += measure(after, 1, 1)
+        results[name] = {k: min(v) for k, v in times.items()}
+    return results
@@ -0,0 +1,36 @@
+import unittest
+
+import nfa
+from nfa.edges import Char
+
+from .footprint import SPEED_INPUTS, layout, plain_graph, slot_values, speed, unslotted
+
+
+class TestLayout(unittest.TestCase):
+    """Test the before/after __slots__ comparison"""
+
+    def test_unslotted(self):
+        """Test the baseline copy keeps the attributes in a __dict__"""
+        c = Char('a')
+        copy = unslotted(c)()
+        self.assertEqual(vars(copy), slot_values(c))
+        self.assertEqual(type(copy).__name__, 'Char')
+
+    def test_layout(self):
+        """Test every hot class is slotted and smaller than its baseline"""
+        for name, sizes in layout().items():
+            self.assertEqual(sizes['dict'], 0, name)
+            self.assertLess(sizes['after'], sizes['before'], name)
+
+    def test_plain_graph(self):
+        """Test the slot-less copy of a graph matches like the original"""
+        graph = nfa.compile('(get|post)/[a-z]+/\\d{1,4}')
+        plain = plain_graph(graph)
+        self.assertFalse(hasattr(type(plain), '__slots__'))
+        self.assertEqual([plain.match(s) for s in SPEED_INPUTS], [graph.match(s) for s in SPEED_INPUTS])
+
+    def test_speed(self):
+        """Test every match loop is timed before and after"""
+        for name, times in speed(1).items():
+            self.assertGreater(times['before'], 0, name)
+            self.assertGreater(times['after'], 0, name)
@@ -0,0 +1,207 @@
+"""
+Scaling of each engine on known worst-case patterns.
+
+For growing n, one case builds a pattern and a subject string, and the
+engine compiles the pattern and fully matches the subject. Run time is
+the median of repeated runs; peak memory is taken with tracemalloc on a
+separate run, since tracing slows everything down. Our engines run under
+a Budget timeout of max_seconds and stop at the first MatchTimeout; for
+re, sizes predicted to take longer are skipped.
+
+The growth rate of time (fastest run, the least noisy) and memory is
+estimated as the slope of log(value) over log(n) across the last measured
+points, and classified as linear, polynomial or exponential; each case
+states the worst class it allows per engine. Engines a case is known to
+blow up on are run as a demonstration only and never fail the check.
+"""
+import math
+import re
+import time
+import logging
+import tracemalloc
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import nfa
+import regex
+
+from .stats import Record, measure, predict, summarize
+
+GROWTH = ['linear', 'polynomial', 'exponential']
+# Slopes of log(time) over log(n) that separate the classes
+LINEAR_DEGREE = 1.5
+EXP_DEGREE = 4.5
+# Times below this are too noisy to fit
+NOISE_FLOOR = 1e-4
+
+
+class Case(NamedTuple):
+    pattern: Callable[[int], str]
+    text: Callable[[int], str]
+    # engine -> worst growth class allowed, engines not listed are unchecked
+    limits: Dict[str, str]
+    # engines known to blow up, reported but left out of pass/fail
+    demos: Tuple[str, ...] = ()
+
+
+CASES: Dict[str, Case] = {
+    'nested-optional': Case(lambda n: 'a?' * n + 'a' * n, lambda n: 'a' * n,
+                            {'nfa': 'polynomial'}, demos=('regex',)),
+    'nested-star': Case(lambda n: '(a*)*b', lambda n: 'a' * n,
+                        {'nfa': 'linear'}),
+    'overlapping-alternation': Case(lambda n: '(a|aa)*c', lambda n: 'a' * n,
+                                    {'nfa': 'linear'}),
+    'multi-dotstar': Case(lambda n: '.*.*.*=.*', lambda n: 'a' * n,
+                          {'nfa': 'linear', 'regex': 'polynomial'}),
+    'large-bounds': Case(lambda n: f'a{{{n},{2*n}}}b', lambda n: 'a' * (2*n) + 'c',
+                         {'nfa': 'polynomial', 'regex': 'polynomial'}),
+}
+
+# Compile pattern under a timeout, return a full-match function
+Runner = Callable[[str, float], Callable[[str], Any]]
+
+
+def regex_runner(pattern: str, timeout: float) -> Callable[[str], Any]:
+    r = regex.Regex(pattern, regex.Budget(timeout=timeout))
+    return r.match
+
+
+def nfa_runner(pattern: str, timeout: float) -> Callable[[str], Any]:
+    graph = nfa.compile(pattern, nfa.Budget(timeout=timeout))
+    return graph.match
+
+
+def re_runner(pattern: str, timeout: float) -> Callable[[str], Any]:
+    return re.compile(pattern).fullmatch
+
+
+RUNNERS: Dict[str, Runner] = {'regex': regex_runner, 'nfa': nfa_runner, 're': re_runner}
+TIMEOUTS = (regex.MatchTimeout, nfa.MatchTimeout)
+
+
+def degree(ns: Sequence[int], values: Sequence[float], floor: float = 0.0) -> Optional[float]:
+    """Least-squares slope of log(value) over log(n), on the last 3 points above floor."""
+    points = [(math.log(n), math.log(v)) for n, v in zip(ns, values) if v > floor][-3:]
+    if len(points) < 2:
+        return None
+    mx = sum(x for x, _ in points) / len(points)
+    my = sum(y for _, y in points) / len(points)
+    sxx = sum((x - mx) ** 2 for x, _ in points)
+    return sum((x - mx) * (y - my) for x, y in points) / sxx
+
+
+def forecast(ns: Sequence[int], times: Sequence[float], n: int) -> float:
+    """Like predict(), but extrapolate exponentially in n once growth looks exponential."""
+    d = degree(ns[-2:], times[-2:])
+    if d is None or d <= EXP_DEGREE:
+        return predict(ns, times, n)
+    k = (n - ns[-1]) / (ns[-1] - ns[-2])
+    return math.exp(min(700.0, math.log(times[-1]) + k * math.log(times[-1] / times[-2])))
+
+
+def classify(d: Optional[float], timed_out: bool) -> str:
+    """Growth class of a fitted degree, a timeout with nothing to fit counts as exponential."""
+    if d is None:
+        return 'exponential' if timed_out else 'linear'
+    if d > EXP_DEGREE:
+        return 'exponential'
+    if d > LINEAR_DEGREE:
+        return 'polynomial'
+    return 'linear'
+
+
+def peak_memory(fn: Callable[[], Any]) -> int:
+    """Peak bytes traced while running fn once."""
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run_once(runner: Runner, pattern: str, text: str, timeout: float) -> Callable[[], Any]:
+    return lambda: runner(pattern, timeout)(text)
+
+
+def run_case(name: str, case: Case, engine: str, ns: Sequence[int],
+             warmup: int, repeat: int, max_seconds: float) -> Tuple[List[Record], Record]:
+    """Per-n records of one case and engine, and the growth summary."""
+    runner = RUNNERS[engine]
+    records: List[Record] = []
+    done_ns: List[int] = []
+    times: List[float] = []
+    peaks: List[float] = []
+    status = 'ok'
+    for n in ns:
+        record: Record = {'family': 'pathological', 'case': name, 'engine': engine, 'size': n}
+        records.append(record)
+        if status != 'ok':
+            record['status'] = status
+            continue
+        pattern, text = case.pattern(n), case.text(n)
+        fn = run_once(runner, pattern, text, max_seconds)
+        if forecast(done_ns, times, n) > max_seconds:
+            status = record['status'] = 'skipped'
+            continue
+        try:
+            t = time.perf_counter()
+            fn()
+            elapsed = time.perf_counter() - t
+            runs = repeat if elapsed * repeat < max_seconds else 1
+            sample = measure(fn, warmup if runs > 1 else 0, runs)
+            peak = peak_memory(fn) if elapsed < max_seconds / 10 else 0
+        except TIMEOUTS:
+            status = record['status'] = 'timeout'
+            continue
+        except Exception as e:
+            logging.info(f'{engine} {pattern[:40]}: {e}')
+            status = record['status'] = 'unsupported'
+            continue
+        record['status'] = 'ok'
+        record.update(summarize(sample))
+        record['times'] = sample
+        record['peak_bytes'] = peak
+        done_ns.append(n)
+        times.append(record['min'])
+        peaks.append(peak)
+        logging.info(f'{name} {engine} n={n}: {record["median"]*1e3:.3f}ms, {peak} bytes')
+    return records, growth(name, case, engine, done_ns, times, peaks, status)
+
+
+def growth(name: str, case: Case, engine: str, ns: List[int], times: List[float],
+           peaks: List[float], status: str) -> Record:
+    """Fit and check the growth of time and memory of one case and engine."""
+    timed_out = status == 'timeout'
+    time_degree = degree(ns, times, NOISE_FLOOR)
+    if time_degree is None:
+        # Too fast to fit reliably, unless it blew up right after
+        time_degree = degree(ns, times)
+    mem_ns = [n for n, p in zip(ns, peaks) if p]
+    mem_degree = degree(mem_ns, [p for p in peaks if p])
+    summary: Record = {
+        'case': name, 'engine': engine, 'max_n': ns[-1] if ns else None, 'stopped': status,
+        'time_degree': time_degree, 'time_growth': classify(time_degree, timed_out),
+        'memory_degree': mem_degree, 'memory_growth': classify(mem_degree, False),
+        'limit': case.limits.get(engine), 'demo': engine in case.demos, 'ok': True,
+    }
+    if status == 'unsupported':
+        summary['time_growth'] = summary['memory_growth'] = None
+    elif summary['limit'] is not None:
+        worst = GROWTH.index(summary['limit'])
+        summary['ok'] = (GROWTH.index(summary['time_growth']) <= worst
+                         and GROWTH.index(summary['memory_growth']) <= worst)
+    return summary
+
+
+def run(cases: Sequence[str], engines: Sequence[str], ns: Sequence[int],
+        warmup: int, repeat: int, max_seconds: float) -> Tuple[List[Record], List[Record]]:
+    """Run the selected cases, return per-n records and growth summaries."""
+    results: List[Record] = []
+    summaries: List[Record] = []
+    for name in cases:
+        for engine in engines:
+            records, summary = run_case(name, CASES[name], engine, sorted(ns),
+                                        warmup, repeat, max_seconds)
+            results.extend(records)
+            summaries.append(summary)
+    return results, summaries
@@ -0,0 +1,52 @@
+import unittest
+
+from . import pathological
+from .pathological import classify, degree, forecast
+
+
+class TestGrowth(unittest.TestCase):
+    """Test growth rate fitting"""
+
+    def test_degree(self):
+        """Test slopes of power laws"""
+        ns = [10, 20, 40, 80]
+        self.assertAlmostEqual(degree(ns, [n for n in ns]), 1.0)
+        self.assertAlmostEqual(degree(ns, [n ** 3 for n in ns]), 3.0)
+        self.assertIsNone(degree(ns, [1e-6] * 4, 1e-4))
+
+    def test_classify(self):
+        """Test growth classes"""
+        self.assertEqual(classify(1.1, False), 'linear')
+        self.assertEqual(classify(2.5, False), 'polynomial')
+        self.assertEqual(classify(9.0, False), 'exponential')
+        self.assertEqual(classify(None, True), 'exponential')
+        self.assertEqual(classify(None, False), 'linear')
+
+    def test_forecast(self):
+        """Test exponential extrapolation once growth looks exponential"""
+        self.assertAlmostEqual(forecast([8, 16], [1.0, 2.0], 32), 4.0)
+        self.assertAlmostEqual(forecast([8, 16], [1e-3, 1.0], 24), 1000.0)
+
+
+class TestRun(unittest.TestCase):
+    """Test a small pathological run"""
+
+    def test_run(self):
+        """Test records and summaries of supported and unsupported engines"""
+        results, summaries = pathological.run(['nested-star'], ['regex', 'nfa'], [4, 8], 0, 1, 2.0)
+        self.assertEqual([r['status'] for r in results], ['unsupported'] * 2 + ['ok'] * 2)
+        regex, nfa = summaries
+        self.assertIsNone(regex['time_growth'])
+        self.assertEqual(nfa['limit'], 'linear')
+        self.assertEqual(nfa['max_n'], 8)
+        self.assertGreater(results[2]['peak_bytes'], 0)
+
+    def test_demo(self):
+        """Test known-bad engines are reported but never checked"""
+        results, summaries = pathological.run(['nested-optional'], ['regex', 'nfa'], [4, 8], 0, 1, 2.0)
+        regex, nfa = summaries
+        self.assertTrue(regex['demo'])
+        self.assertIsNone(regex['limit'])
+        self.assertTrue(regex['ok'])
+        self.assertFalse(nfa['demo'])
+        self.assertEqual(nfa['limit'], 'polynomial')
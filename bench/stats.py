@@ -0,0 +1,112 @@
+"""
+Timing, summary statistics and result files shared by all benchmarks.
+"""
+import json
+import math
+import platform
+import statistics
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+# One benchmark record, as stored in the JSON results
+Record = Dict[str, Any]
+# Identity of a record across runs: family, case, engine, size
+Key = Tuple[str, str, str, int]
+
+
+def measure(fn: Callable[[], Any], warmup: int, repeat: int) -> List[float]:
+    """Call fn warmup times untimed, then repeat times, return seconds per call."""
+    for _ in range(warmup):
+        fn()
+    times = []
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t)
+    return times
+
+
+def summarize(times: Sequence[float]) -> Dict[str, float]:
+    """Median, min, mean and standard deviation of a timing sample."""
+    return {
+        'median': statistics.median(times),
+        'min': min(times),
+        'mean': statistics.fmean(times),
+        'stdev': statistics.stdev(times) if len(times) > 1 else 0.0,
+    }
+
+
+def predict(sizes: Sequence[int], times: Sequence[float], size: int) -> float:
+    """Extrapolate run time at size from the last two measurements, as a power law."""
+    if not times:
+        return 0.0
+    if len(times) < 2 or times[-2] <= 0 or sizes[-1] == sizes[-2]:
+        return times[-1] * size / sizes[-1]
+    degree = math.log(times[-1] / times[-2]) / math.log(sizes[-1] / sizes[-2])
+    return times[-1] * (size / sizes[-1]) ** max(degree, 1.0)
+
+
+def parse_size(s: str) -> int:
+    """Parse a size such as 10, 1K, 4M or 100MB into bytes."""
+    s = s.strip().upper().rstrip('B')
+    units = {'K': 1 << 10, 'M': 1 << 20, 'G': 1 << 30}
+    if s and s[-1] in units:
+        return int(float(s[:-1]) * units[s[-1]])
+    return int(s)
+
+
+def key(record: Record) -> Key:
+    return record['family'], record['case'], record['engine'], record['size']
+
+
+def save(results: List[Record], args: Dict[str, Any], path: Optional[str],
+         extra: Optional[Dict[str, Any]] = None) -> None:
+    """Write results with run metadata and any extra sections as JSON, to path or stdout."""
+    doc = {
+        'meta': {
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'machine': platform.machine(),
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'args': args,
+        },
+        'results': results,
+    }
+    doc.update(extra or {})
+    if path is None:
+        json.dump(doc, sys.stdout, indent=2)
+        sys.stdout.write('\n')
+        return
+    with open(path, 'w') as f:
+        json.dump(doc, f, indent=2)
+
+
+def load(path: str) -> List[Record]:
+    with open(path) as f:
+        return json.load(f)['results']
+
+
+def compare(old: List[Record], new: List[Record], threshold: float) -> List[Record]:
+    """
+    Pair up records measured in both runs and rate the change of median time.
+
+    A ratio new/old above 1+threshold is a regression, below
+    1/(1+threshold) an improvement. Records not timed in both runs are
+    left out.
+    """
+    before = {key(r): r for r in old if r.get('status') == 'ok'}
+    rows = []
+    for r in new:
+        k = key(r)
+        if r.get('status') != 'ok' or k not in before:
+            continue
+        ratio = r['median'] / before[k]['median'] if before[k]['median'] > 0 else 1.0
+        verdict = ''
+        if ratio > 1 + threshold:
+            verdict = 'regression'
+        elif ratio < 1 / (1 + threshold):
+            verdict = 'improvement'
+        rows.append({'key': k, 'old': before[k]['median'], 'new': r['median'],
+                     'ratio': ratio, 'verdict': verdict})
+    return rows
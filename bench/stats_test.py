@@ -0,0 +1,55 @@
+import unittest
+
+from . import stats
+from .throughput import make_text, run
+
+
+class TestStats(unittest.TestCase):
+    """Test timing helpers"""
+
+    def test_summarize(self):
+        """Test summary of a sample"""
+        s = stats.summarize([3.0, 1.0, 2.0])
+        self.assertEqual((s['median'], s['min'], s['mean'], s['stdev']), (2.0, 1.0, 2.0, 1.0))
+
+    def test_parse_size(self):
+        """Test size suffixes"""
+        self.assertEqual(stats.parse_size('10'), 10)
+        self.assertEqual(stats.parse_size('1K'), 1024)
+        self.assertEqual(stats.parse_size('100MB'), 100 << 20)
+
+    def test_predict(self):
+        """Test power-law extrapolation"""
+        self.assertAlmostEqual(stats.predict([10, 20], [1.0, 4.0], 40), 16.0)
+        self.assertAlmostEqual(stats.predict([10], [1.0], 100), 10.0)
+        self.assertEqual(stats.predict([], [], 100), 0.0)
+
+    def test_compare(self):
+        """Test regressions and improvements beyond the threshold"""
+        def rec(case, median):
+            return {'family': 'f', 'case': case, 'engine': 'nfa', 'size': 10,
+                    'status': 'ok', 'median': median}
+        old = [rec('a', 1.0), rec('b', 1.0), rec('c', 1.0)]
+        new = [rec('a', 1.05), rec('b', 1.5), rec('c', 0.5), rec('d', 1.0)]
+        rows = stats.compare(old, new, 0.1)
+        self.assertEqual([(r['key'][1], r['verdict']) for r in rows],
+                         [('a', ''), ('b', 'regression'), ('c', 'improvement')])
+
+
+class TestThroughput(unittest.TestCase):
+    """Test the throughput benchmark"""
+
+    def test_make_text(self):
+        """Test generated text is deterministic and sized"""
+        self.assertEqual(len(make_text(1000)), 1000)
+        self.assertEqual(make_text(100), make_text(100))
+
+    def test_run(self):
+        """Test statuses and metrics of a tiny run"""
+        results = run(['literal', 'alternation'], ['regex', 'nfa'], [100], 0, 1, 10.0)
+        status = {(r['case'], r['engine']): r['status'] for r in results}
+        self.assertEqual(status[('word', 'nfa')], 'ok')
+        self.assertEqual(status[('words', 'regex')], 'mismatch')
+        word = [r for r in results if r['case'] == 'word'][0]
+        self.assertIn('ns_per_char', word)
+        self.assertEqual(len(word['times']), 1)
@@ -0,0 +1,104 @@
+"""
+Throughput of each engine over pattern families and input sizes.
+
+Every case is first checked against re on a small input; an engine that
+fails to compile the pattern is recorded as unsupported, one that finds a
+different number of matches as mismatch, and neither is timed. Sizes an
+engine is predicted to need more than max_seconds per run for are
+recorded as skipped.
+"""
+import logging
+import random
+import time
+from typing import Dict, List, Sequence, Tuple
+
+from .engines import ENGINES
+from .stats import Record, measure, predict, summarize
+
+# family -> [(case name, pattern)]
+FAMILIES: Dict[str, List[Tuple[str, str]]] = {
+    'literal': [('word', 'hello'), ('absent', 'zqxj')],
+    'class': [('letters-digit', '[a-z]+\\d'), ('digits', '\\d+')],
+    'alternation': [('words', 'foo|bar|baz')],
+    'repetition': [('bounded', 'a{2,4}b'), ('digits3', 'x\\d{3}')],
+    'group': [('pair', '(ab)(cd)'), ('email', '(\\w+)@(\\w+)')],
+}
+
+WORDS = ['hello', 'world', 'foo', 'bar', 'baz', 'aab', 'abcd', 'x123', 'a1',
+         'user@host', 'lorem', 'ipsum', 'dolor', '42', 'sit', 'amet']
+
+BLOCK = 1 << 16
+
+
+def make_text(size: int, seed: int = 0) -> str:
+    """Deterministic text of random words, repeated up to size chars."""
+    rnd = random.Random(seed)
+    words: List[str] = []
+    n = 0
+    while n < min(size, BLOCK):
+        w = rnd.choice(WORDS)
+        words.append(w)
+        n += len(w) + 1
+    block = ' '.join(words)
+    return (block * (size // len(block) + 1))[:size]
+
+
+def check(engine: str, pattern: str, sample: str) -> str:
+    """Status of engine on pattern: ok, unsupported or mismatch."""
+    try:
+        finder = ENGINES[engine](pattern)
+        n = finder(sample)
+    except Exception as e:
+        logging.info(f'{engine} {pattern}: {e}')
+        return 'unsupported'
+    if n != ENGINES['re'](pattern)(sample):
+        return 'mismatch'
+    return 'ok'
+
+
+def run(families: Sequence[str], engines: Sequence[str], sizes: Sequence[int],
+        warmup: int, repeat: int, max_seconds: float) -> List[Record]:
+    """Benchmark every case of families with every engine at every size."""
+    texts = {size: make_text(size) for size in sorted(sizes)}
+    sample = make_text(4096, seed=1)
+    results = []
+    for family in families:
+        for case, pattern in FAMILIES[family]:
+            for engine in engines:
+                results.extend(run_case(family, case, pattern, engine, texts,
+                                        sample, warmup, repeat, max_seconds))
+    return results
+
+
+def run_case(family: str, case: str, pattern: str, engine: str, texts: Dict[int, str],
+             sample: str, warmup: int, repeat: int, max_seconds: float) -> List[Record]:
+    """Records of one case and engine over all sizes, smallest first."""
+    status = check(engine, pattern, sample)
+    finder = ENGINES[engine](pattern) if status == 'ok' else None
+    done_sizes: List[int] = []
+    done_times: List[float] = []
+    records = []
+    for size, text in texts.items():
+        record: Record = {'family': family, 'case': case, 'pattern': pattern,
+                          'engine': engine, 'size': size, 'status': status}
+        records.append(record)
+        if finder is None:
+            continue
+        if predict(done_sizes, done_times, size) > max_seconds:
+            record['status'] = 'skipped'
+            continue
+        t = time.perf_counter()
+        matches = finder(text)
+        elapsed = time.perf_counter() - t
+        # Big inputs: one timed call is already a stable sample
+        runs = repeat if elapsed * repeat < max_seconds else 1
+        times = measure(lambda: finder(text), warmup if runs > 1 else 0, runs)
+        record.update(summarize(times))
+        record['times'] = times
+        record['matches'] = matches
+        record['ns_per_char'] = record['median'] * 1e9 / size
+        record['matches_per_sec'] = matches / record['median'] if record['median'] > 0 else 0.0
+        done_sizes.append(size)
+        done_times.append(record['median'])
+        logging.info(f'{family}/{case} {engine} {size}: {record["ns_per_char"]:.1f} ns/char')
+    return records
@@ -0,0 +1,3 @@
+"""
+Pieces shared by the regex and nfa engines.
+"""
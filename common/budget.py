@@ -0,0 +1,63 @@
+"""
+Step budget and deadline for bounding a match in either engine.
+"""
+import time
+from typing import Optional
+
+
+class MatchTimeout(Exception):
+    """Raised when a match runs out of steps or passes its deadline."""
+
+    def __init__(self, message: str, steps: int) -> None:
+        super().__init__(message)
+        self.steps: int = steps
+
+
+class Budget(object):
+    """
+    Limits on the work a single match may do.
+
+    max_steps bounds the steps of a match: states popped from the work
+    queue in nfa, elements and search candidates tried in regex. timeout
+    bounds wall-clock seconds. The clock is only read every
+    `interval` steps, so the main loop pays a single integer compare per
+    step. After a match, `steps` holds the work it consumed, whether it
+    succeeded, failed or timed out.
+    """
+
+    def __init__(self, max_steps: Optional[int] = None,
+                 timeout: Optional[float] = None, interval: int = 256) -> None:
+        self.max_steps: Optional[int] = max_steps
+        self.timeout: Optional[float] = timeout
+        self.interval: int = interval
+        self.steps: int = 0
+        self.deadline: Optional[float] = None
+
+    def __repr__(self) -> str:
+        return f'<budget {self.steps}/{self.max_steps} steps, timeout {self.timeout}>'
+
+    def start(self) -> float:
+        """Reset counters for a new match, return the first checkpoint."""
+        self.steps = 0
+        self.deadline = None
+        if self.timeout is not None:
+            self.deadline = time.monotonic() + self.timeout
+        return self.checkpoint(0)
+
+    def checkpoint(self, steps: int) -> float:
+        """Return the step count at which check() must run next."""
+        if self.max_steps is None and self.deadline is None:
+            return float('inf')
+        limit = steps + self.interval
+        if self.max_steps is not None:
+            limit = min(limit, self.max_steps + 1)
+        return limit
+
+    def check(self, steps: int) -> float:
+        """Record progress, raise MatchTimeout if a limit is exceeded."""
+        self.steps = steps
+        if self.max_steps is not None and steps > self.max_steps:
+            raise MatchTimeout(f'step budget {self.max_steps} exhausted', steps)
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            raise MatchTimeout(f'timeout {self.timeout}s exceeded', steps)
+        return self.checkpoint(steps)
@@ -0,0 +1,89 @@
+import unittest
+
+import nfa
+import regex
+from nfa import compile
+
+from .budget import Budget, MatchTimeout
+
+
+class TestBudget(unittest.TestCase):
+    """Test Budget bookkeeping"""
+
+    def test_unlimited(self):
+        """Test budget without limits never needs a check"""
+        budget = Budget()
+        self.assertEqual(budget.start(), float('inf'))
+
+    def test_checkpoint_max_steps(self):
+        """Test checkpoint never skips past max_steps"""
+        budget = Budget(max_steps=10, interval=256)
+        self.assertEqual(budget.start(), 11)
+
+    def test_checkpoint_interval(self):
+        """Test checkpoint advances by interval under a deadline"""
+        budget = Budget(timeout=10, interval=100)
+        self.assertEqual(budget.start(), 100)
+        self.assertEqual(budget.check(100), 200)
+
+    def test_check_raises_on_steps(self):
+        """Test check raises once max_steps is exceeded"""
+        budget = Budget(max_steps=5)
+        budget.start()
+        with self.assertRaises(MatchTimeout) as cm:
+            budget.check(6)
+        self.assertEqual(cm.exception.steps, 6)
+
+    def test_check_raises_on_deadline(self):
+        """Test check raises once the deadline has passed"""
+        budget = Budget(timeout=-1)
+        budget.start()
+        with self.assertRaises(MatchTimeout):
+            budget.check(1)
+
+    def test_shared(self):
+        """Test both engines use the same budget and exception classes"""
+        self.assertIs(nfa.Budget, Budget)
+        self.assertIs(regex.Budget, Budget)
+        self.assertIs(nfa.MatchTimeout, regex.MatchTimeout)
+
+
+class TestMatchBudget(unittest.TestCase):
+    """Test Node.match under a budget"""
+
+    def test_steps_reported_on_success(self):
+        """Test steps are reported when the match succeeds"""
+        budget = Budget()
+        self.assertTrue(compile('abc').match('abc', budget))
+        self.assertGreater(budget.steps, 0)
+
+    def test_steps_reported_on_failure(self):
+        """Test steps are reported when the match fails"""
+        budget = Budget()
+        self.assertFalse(compile('abc').match('abd', budget))
+        self.assertGreater(budget.steps, 0)
+
+    def test_per_call_budget(self):
+        """Test per-call step budget raises MatchTimeout"""
+        budget = Budget(max_steps=10)
+        with self.assertRaises(MatchTimeout):
+            compile('x.*.*.*=y').match('x' + 'a' * 50 + 'y', budget)
+        self.assertEqual(budget.steps, 11)
+
+    def test_per_pattern_budget(self):
+        """Test budget given to compile applies to every match"""
+        nfa = compile('x.*y', Budget(max_steps=10))
+        self.assertTrue(nfa.match('xy'))
+        with self.assertRaises(MatchTimeout):
+            nfa.match('x' + 'a' * 50 + 'y')
+
+    def test_per_call_overrides_pattern(self):
+        """Test per-call budget takes precedence over the pattern budget"""
+        nfa = compile('x.*y', Budget(max_steps=10))
+        self.assertTrue(nfa.match('x' + 'a' * 50 + 'y', Budget()))
+
+    def test_states_run_once(self):
+        """Test each (position, node) state is queued once, so nested loops stay linear"""
+        budget = Budget()
+        self.assertFalse(compile('(a*)*b').match('a' * 100, budget))
+        self.assertLess(budget.steps, 20 * 100)
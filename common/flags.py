@@ -0,0 +1,27 @@
+"""
+Flags changing how nfa.compile() and regex.Regex read a pattern.
+"""
+from enum import IntFlag
+
+
+class Flag(IntFlag):
+    """
+    Compile options, combined with |.
+
+    UNICODE makes \\d \\s \\w and their negations follow the Unicode
+    digit, space and word tables instead of ASCII.
+
+    IGNORECASE folds literals and bracket sets into classes holding every
+    case of each char, so input is matched as is, never lowercased.
+
+    MULTILINE lets ^ and $ also hold just after and just before each
+    newline, \\A and \\Z still only at the ends of the text.
+    """
+    UNICODE = 1
+    IGNORECASE = 2
+    MULTILINE = 4
+
+
+UNICODE = Flag.UNICODE
+IGNORECASE = Flag.IGNORECASE
+MULTILINE = Flag.MULTILINE
@@ -0,0 +1,20 @@
+import unittest
+
+import nfa
+import regex
+
+from .flags import Flag, IGNORECASE, MULTILINE, UNICODE
+
+
+class TestFlags(unittest.TestCase):
+    """Test compile flags"""
+
+    def test_combine(self):
+        """Test flags combine with | and keep their bits"""
+        self.assertEqual(int(UNICODE | IGNORECASE | MULTILINE), 7)
+        self.assertEqual(Flag(5), UNICODE | MULTILINE)
+
+    def test_engines(self):
+        """Test both engines export the same flags"""
+        self.assertIs(nfa.Flag, regex.Flag)
+        self.assertIs(nfa.MULTILINE, regex.MULTILINE)
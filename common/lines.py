@@ -0,0 +1,83 @@
+"""
+Newline offset index of a buffer, for line-oriented scanning.
+"""
+import mmap
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Iterator, Tuple, Union
+
+Text = Union[str, bytes, bytearray, memoryview, mmap.mmap]
+
+
+class LineIndex(object):
+    """
+    Offsets where the lines of one buffer start, found once with find().
+
+    Built in one pass over a str or bytes-like buffer (an mmap too) and
+    kept as an array of 8-byte ints, so a 1 GB log costs 8 bytes per line
+    instead of a Python string per line. The index holds no reference to
+    the buffer and can be shared by every pattern scanning it, in either
+    engine: Scanner, Node.finditer() and Regex.finditer() take it to jump
+    between the lines of MULTILINE patterns, and line_of() turns match
+    offsets into line numbers.
+
+    Lines end at '\\n', which is not part of their span. A buffer ending
+    with '\\n' has no empty line after it. starts ends with the start the
+    line after the last one would have, as if the buffer ended with '\\n'.
+    """
+    __slots__ = ('starts', 'size')
+
+    def __init__(self, s: Text) -> None:
+        if isinstance(s, memoryview) and s.format != 'B':
+            s = s.cast('B')
+        find = getattr(s, 'find', None)
+        if find is None:
+            # memoryview has no find(), search a copy
+            find = bytes(s).find
+        nl = '\n' if isinstance(s, str) else b'\n'
+        self.size: int = len(s)
+        self.starts: array = array('q', [0])
+        i = find(nl)
+        while i >= 0:
+            self.starts.append(i+1)
+            i = find(nl, i+1)
+        if self.starts[-1] != self.size:
+            self.starts.append(self.size+1)
+
+    def __repr__(self) -> str:
+        return f'<line index of {len(self)} lines>'
+
+    def __len__(self) -> int:
+        return len(self.starts) - 1
+
+    def check(self, s: Text) -> None:
+        """Raise if the index can't have been built for s."""
+        if len(s) != self.size:
+            raise Exception(f'line index of {self.size} chars used on {len(s)}')
+
+    def line_of(self, pos: int) -> int:
+        """Number of the line holding offset pos, counting from 0."""
+        return min(bisect_right(self.starts, pos), len(self)) - 1
+
+    def span(self, n: int) -> Tuple[int, int]:
+        """(start, end) of line n, without its newline."""
+        return self.starts[n], self.starts[n+1] - 1
+
+    def spans(self) -> Iterator[Tuple[int, int]]:
+        """(start, end) of every line, in order."""
+        for n in range(len(self)):
+            yield self.span(n)
+
+    def next_start(self, pos: int) -> int:
+        """First offset at or after pos that follows a newline or is 0, -1 if none."""
+        n = bisect_left(self.starts, pos)
+        if n < len(self.starts) and self.starts[n] <= self.size:
+            return self.starts[n]
+        return -1
+
+    def line_end(self, pos: int) -> int:
+        """First offset at or after pos holding a newline, or the end of the buffer."""
+        n = bisect_right(self.starts, pos)
+        if n < len(self.starts):
+            return self.starts[n] - 1
+        return self.size
@@ -0,0 +1,58 @@
+import unittest
+
+import nfa
+import regex
+
+from .lines import LineIndex
+
+
+class TestLineIndex(unittest.TestCase):
+    """Test the newline offset index"""
+
+    def test_starts(self):
+        """Test one start per line, plus the end sentinel"""
+        self.assertEqual(list(LineIndex('ab\ncd').starts), [0, 3, 6])
+        self.assertEqual(list(LineIndex('ab\ncd\n').starts), [0, 3, 6])
+        self.assertEqual(list(LineIndex('').starts), [0])
+        self.assertEqual(len(LineIndex('ab\n\ncd')), 3)
+
+    def test_bytes(self):
+        """Test bytes and memoryview are indexed like str"""
+        for s in [b'ab\ncd', bytearray(b'ab\ncd'), memoryview(b'ab\ncd')]:
+            self.assertEqual(list(LineIndex(s).starts), [0, 3, 6])
+        self.assertEqual(list(LineIndex(memoryview(b'ab\ncd').cast('c')).starts), [0, 3, 6])
+
+    def test_line_of(self):
+        """Test offsets map to line numbers, the newline belongs to its line"""
+        lines = LineIndex('ab\ncd\n')
+        self.assertEqual([lines.line_of(i) for i in range(7)], [0, 0, 0, 1, 1, 1, 1])
+
+    def test_spans(self):
+        """Test line spans leave out the newline"""
+        self.assertEqual(list(LineIndex('ab\n\ncd').spans()), [(0, 2), (3, 3), (4, 6)])
+
+    def test_next_start_and_line_end(self):
+        """Test lookups used to skip between lines"""
+        lines = LineIndex('ab\ncd\n')
+        self.assertEqual([lines.next_start(i) for i in range(7)], [0, 3, 3, 3, 6, 6, 6])
+        self.assertEqual([lines.line_end(i) for i in range(7)], [2, 2, 2, 5, 5, 5, 6])
+        self.assertEqual(LineIndex('ab').next_start(1), -1)
+
+    def test_check(self):
+        """Test an index is refused for a text of another length"""
+        LineIndex('ab\n').check('cd\n')
+        with self.assertRaises(Exception):
+            LineIndex('ab\n').check('ab')
+
+
+class TestShared(unittest.TestCase):
+    """Test one index serves both engines"""
+
+    def test_engines(self):
+        """Test the same index drives a regex and an nfa search"""
+        self.assertIs(nfa.LineIndex, regex.LineIndex)
+        text = 'a 1\nb 22\n'
+        lines = LineIndex(text)
+        r = regex.Regex('^\\w', flags=regex.MULTILINE)
+        self.assertEqual([m.span() for m in r.finditer(text, lines=lines)], [(0, 1), (4, 5)])
+        self.assertEqual(list(nfa.compile('^\\w', flags=nfa.MULTILINE).finditer(text, lines)), [(0, 1), (4, 5)])
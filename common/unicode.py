@@ -0,0 +1,168 @@
+"""
+Unicode range tables for \\p{...} and Unicode-aware \\d \\s \\w.
+
+A table is a sorted list of disjoint code point ranges, kept as two
+parallel lists of starts and ends for bisect. Tables are derived from
+unicodedata the first time a pattern asks for them and cached here, so
+every compiled pattern shares the same lists.
+
+Property names are general categories (L, Lu, Nd, P, Zs...), scripts
+(Han, Latin, Greek, ...) and word, digit, space for the \\w \\d \\s
+classes. unicodedata has no script property, scripts are taken from
+character names instead.
+
+Both engines import this one module, so a table is built once per
+process however many patterns and engines ask for it. The same goes for
+the reverse case map fold() uses for IGNORECASE.
+"""
+import itertools
+import unicodedata
+from bisect import bisect_right
+from typing import Dict, Iterable, List, Set, Tuple
+
+# Code points named with one of these prefixes belong to the script
+SCRIPTS: Dict[str, Tuple[str, ...]] = {
+    'Han': ('CJK UNIFIED IDEOGRAPH', 'CJK COMPATIBILITY IDEOGRAPH', 'CJK RADICAL', 'KANGXI RADICAL'),
+    'Hiragana': ('HIRAGANA ',),
+    'Katakana': ('KATAKANA ',),
+    'Hangul': ('HANGUL ',),
+    'Latin': ('LATIN ',),
+    'Greek': ('GREEK ',),
+    'Cyrillic': ('CYRILLIC ',),
+    'Arabic': ('ARABIC ',),
+    'Hebrew': ('HEBREW ',),
+    'Thai': ('THAI ',),
+    'Devanagari': ('DEVANAGARI ',),
+}
+
+# Whitespace that isn't in category Z: the controls str.isspace() accepts
+SPACE_CONTROLS = '\t\n\x0b\x0c\r\x1c\x1d\x1e\x1f\x85'
+
+Range = Tuple[int, int]
+
+
+class RangeTable(object):
+    """Named set of code points, as sorted disjoint inclusive ranges."""
+    __slots__ = ('name', 'starts', 'ends')
+
+    def __init__(self, name: str, ranges: Iterable[Range]) -> None:
+        self.name: str = name
+        self.starts: List[int] = []
+        self.ends: List[int] = []
+        for start, end in sorted(ranges):
+            if self.ends and start <= self.ends[-1] + 1:
+                self.ends[-1] = max(self.ends[-1], end)
+            else:
+                self.starts.append(start)
+                self.ends.append(end)
+
+    def __repr__(self) -> str:
+        return f'<range table {self.name}: {len(self.starts)} ranges>'
+
+    def __contains__(self, code: int) -> bool:
+        i = bisect_right(self.starts, code)
+        return i > 0 and code <= self.ends[i-1]
+
+    def ranges(self) -> List[Range]:
+        return list(zip(self.starts, self.ends))
+
+
+# Built on first use: category -> ranges, then name -> table
+CATEGORIES: Dict[str, List[Range]] = {}
+TABLES: Dict[str, RangeTable] = {}
+
+
+def categories() -> Dict[str, List[Range]]:
+    """Ranges of every two-letter general category, scanning all code points once."""
+    if not CATEGORIES:
+        start = 0
+        chars = map(chr, range(0x110000))
+        for cat, run in itertools.groupby(map(unicodedata.category, chars)):
+            n = sum(1 for _ in run)
+            CATEGORIES.setdefault(cat, []).append((start, start + n - 1))
+            start += n
+    return CATEGORIES
+
+
+def category_ranges(prefix: str) -> List[Range]:
+    """Ranges of the categories starting with prefix, L takes in Lu, Ll, ..."""
+    return [r for cat, ranges in categories().items() if cat.startswith(prefix) for r in ranges]
+
+
+def script_ranges(name: str) -> List[Range]:
+    """Ranges of the code points whose character names start with the script's prefixes."""
+    prefixes = SCRIPTS[name]
+    ranges = []
+    # Unassigned, private use and control code points have no script
+    for cat, runs in categories().items():
+        if cat[0] == 'C':
+            continue
+        for start, end in runs:
+            for c in range(start, end + 1):
+                if unicodedata.name(chr(c), '').startswith(prefixes):
+                    ranges.append((c, c))
+    return ranges
+
+
+def build(name: str) -> RangeTable:
+    """Derive the table of a property from unicodedata."""
+    if name == 'digit':
+        return RangeTable(name, category_ranges('Nd'))
+    if name == 'space':
+        ranges = category_ranges('Z') + [(ord(c), ord(c)) for c in SPACE_CONTROLS]
+        return RangeTable(name, ranges)
+    if name == 'word':
+        ranges = category_ranges('L') + category_ranges('N') + [(ord('_'), ord('_'))]
+        return RangeTable(name, ranges)
+    if name in SCRIPTS:
+        return RangeTable(name, script_ranges(name))
+    if name in categories() or name in {cat[0] for cat in categories()}:
+        return RangeTable(name, category_ranges(name))
+    raise Exception(f'unknown Unicode property {name!r}')
+
+
+def table(name: str) -> RangeTable:
+    """Shared range table of a property, built on first use."""
+    if name not in TABLES:
+        TABLES[name] = build(name)
+    return TABLES[name]
+
+
+# Built on first use: char -> the chars whose one-char lower, upper or title case it is
+CASED_FROM: Dict[str, Set[str]] = {}
+
+
+def cased_from() -> Dict[str, Set[str]]:
+    """Reverse of the one-char case mappings, scanning all code points once."""
+    if not CASED_FROM:
+        for start in range(0, 0x110000, 128):
+            block = ''.join(map(chr, range(start, start + 128)))
+            # Most blocks have no case at all
+            if block.lower() == block and block.upper() == block:
+                continue
+            for c in block:
+                for v in (c.lower(), c.upper(), c.title()):
+                    if v != c and len(v) == 1:
+                        CASED_FROM.setdefault(v, set()).add(c)
+    return CASED_FROM
+
+
+def fold(chars: Iterable[str]) -> Set[str]:
+    """
+    chars plus every case of each, repeated until nothing new turns up.
+
+    Mappings are followed both ways, so k takes in the Kelvin sign, whose
+    lower case is k, and s the long s, whose upper case is S. Only one-char
+    mappings count: 'ß'.upper() is 'SS' and 'İ'.lower() is two chars.
+    """
+    reverse = cased_from()
+    r: Set[str] = set()
+    todo = list(chars)
+    while todo:
+        c = todo.pop()
+        if c in r:
+            continue
+        r.add(c)
+        todo += [v for v in (c.lower(), c.upper(), c.title()) if len(v) == 1]
+        todo += reverse.get(c, ())
+    return r
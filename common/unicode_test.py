@@ -0,0 +1,82 @@
+import unittest
+
+import nfa
+import regex
+
+from .unicode import RangeTable, fold, table
+
+
+class TestRangeTable(unittest.TestCase):
+    """Test sorted range tables"""
+
+    def test_merge(self):
+        """Test overlapping and adjacent ranges are merged"""
+        t = RangeTable('x', [(10, 12), (1, 3), (4, 5), (11, 20)])
+        self.assertEqual(t.ranges(), [(1, 5), (10, 20)])
+
+    def test_contains(self):
+        """Test bisect lookup at range edges"""
+        t = RangeTable('x', [(1, 5), (10, 20)])
+        self.assertEqual([c in t for c in [0, 1, 5, 6, 9, 10, 20, 21]],
+                         [False, True, True, False, False, True, True, False])
+
+
+class TestTables(unittest.TestCase):
+    """Test properties derived from unicodedata"""
+
+    def test_shared(self):
+        """Test every lookup of a property returns the same table"""
+        self.assertIs(table('L'), table('L'))
+
+    def test_categories(self):
+        """Test one- and two-letter general categories"""
+        self.assertIn(ord('é'), table('L'))
+        self.assertIn(ord('É'), table('Lu'))
+        self.assertNotIn(ord('é'), table('Lu'))
+        self.assertIn(ord('٣'), table('Nd'))
+        self.assertIn(ord('½'), table('N'))
+        self.assertNotIn(ord('!'), table('N'))
+
+    def test_scripts(self):
+        """Test scripts taken from character names"""
+        self.assertIn(ord('中'), table('Han'))
+        self.assertNotIn(ord('a'), table('Han'))
+        self.assertIn(ord('ж'), table('Cyrillic'))
+
+    def test_classes(self):
+        """Test word, digit and space agree with str methods"""
+        for c in 'aé中_1٣ -!　\x85':
+            self.assertEqual(ord(c) in table('word'), c.isalnum() or c == '_', c)
+            self.assertEqual(ord(c) in table('digit'), c.isdecimal(), c)
+            self.assertEqual(ord(c) in table('space'), c.isspace(), c)
+
+    def test_unknown(self):
+        """Test unknown property names are rejected"""
+        with self.assertRaises(Exception):
+            table('Klingon')
+
+
+class TestFold(unittest.TestCase):
+    """Test case closures for IGNORECASE"""
+
+    def test_reverse(self):
+        """Test chars that only map to a case join its closure"""
+        self.assertEqual(fold('k'), {'k', 'K', '\u212a'})
+        self.assertEqual(fold('S'), {'s', 'S', 'ſ'})
+        self.assertEqual(fold('σ'), {'σ', 'Σ', 'ς'})
+
+    def test_closed(self):
+        """Test every member of a closure has the same closure"""
+        for c in 'kKsſσθµiı':
+            for v in fold(c):
+                self.assertEqual(fold(v), fold(c), (c, v))
+
+
+class TestShared(unittest.TestCase):
+    """Test both engines use the same tables"""
+
+    def test_engines(self):
+        """Test \\p{L} compiled by regex and nfa refers to one table"""
+        edge = nfa.compile('\\p{L}').outs[0][0]
+        self.assertIs(edge.table, regex.Regex('\\p{L}').e[0].table)
+        self.assertIs(edge.table, table('L'))
@@ -1,15 +1,172 @@
+"""
+grep-like command line front end for both engines.
+
+Large files are split into chunks at line boundaries and scanned in
+parallel by a process pool; every worker compiles the pattern once.
+Results are merged back in file order.
+"""
+import os
 import sys
 import logging
 import argparse
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
 
 import regex
 import nfa
 
 
-def main():
-    parser = argparse.ArgumentParser()
-    parser.add_argument('--loglevel', '-l', default='INFO')
-    parser.add_argument('rest', nargs='*', type=str)
+# (start, end) of every match in a line
+Finder = Callable[[str], Iterator[Tuple[int, int]]]
+# file, start offset, end offset, only-matching
+Task = Tuple[str, int, int, bool]
+
+# Compiled pattern of the current worker process
+FINDER: Optional[Finder] = None
+
+
+def make_finder(impl: str, exp: str, ignore_case: bool = False) -> Finder:
+    """Compile pattern with the chosen engine into a line scanner."""
+    if impl == 'nfa':
+        scanner = nfa.Scanner(nfa.compile(exp, flags=nfa.IGNORECASE if ignore_case else 0))
+
+        def finditer(s: str) -> Iterator[Tuple[int, int]]:
+            # One scanner per worker, reset for every line
+            scanner.reset()
+            return scanner.finditer(s)
+        return finditer
+    r = regex.Regex(exp, flags=regex.IGNORECASE if ignore_case else 0)
+    return lambda s: (m.span() for m in r.finditer(s))
+
+
+def init_worker(impl: str, exp: str, ignore_case: bool = False) -> None:
+    """Compile the pattern once per worker process."""
+    global FINDER
+    FINDER = make_finder(impl, exp, ignore_case)
+
+
+def grep_lines(lines: Iterable[str], finder: Finder, only: bool) -> Iterator[Tuple[int, str]]:
+    """Yield (line index, text) for matching lines, or for each match if only."""
+    for i, line in enumerate(lines):
+        for start, end in finder(line):
+            yield i, line[start:end] if only else line
+            if not only:
+                break
+
+
+def split_file(path: str, chunk_size: int) -> List[Tuple[int, int]]:
+    """Cut file into (start, end) byte ranges of about chunk_size, ending at newlines."""
+    size = os.path.getsize(path)
+    chunks = []
+    with open(path, 'rb') as f:
+        start = 0
+        while start < size:
+            end = min(start + chunk_size, size)
+            if end < size:
+                f.seek(end)
+                end += len(f.readline())
+            chunks.append((start, end))
+            start = end
+    return chunks
+
+
+def scan_chunk(task: Task) -> Tuple[int, List[Tuple[int, str]]]:
+    """Scan one chunk, return its line count and hits with chunk-relative line index."""
+    path, start, end, only = task
+    with open(path, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+    lines = data.decode('utf-8', errors='replace').split('\n')
+    if data.endswith(b'\n'):
+        lines.pop()
+    return len(lines), list(grep_lines(lines, FINDER, only))
+
+
+def scan_files(args: argparse.Namespace) -> Iterator[Tuple[str, int, str]]:
+    """Yield (file, line number, text) for every hit, in file order."""
+    tasks: List[Task] = []
+    for path in args.files:
+        for start, end in split_file(path, args.chunk_size):
+            tasks.append((path, start, end, args.only_matching))
+
+    if args.jobs == 1 or len(tasks) <= 1:
+        init_worker(args.impl, args.pattern, args.ignore_case)
+        results: Iterable[Tuple[int, List[Tuple[int, str]]]] = map(scan_chunk, tasks)
+        yield from merge(tasks, results)
+        return
+
+    executor = ProcessPoolExecutor(max_workers=args.jobs, initializer=init_worker,
+                                   initargs=(args.impl, args.pattern, args.ignore_case))
+    try:
+        yield from merge(tasks, executor.map(scan_chunk, tasks))
+    finally:
+        # Closed early, e.g. the reader is gone: drop the chunks not started yet
+        executor.shutdown(cancel_futures=True)
+
+
+def merge(tasks: List[Task], results: Iterable[Tuple[int, List[Tuple[int, str]]]]) -> Iterator[Tuple[str, int, str]]:
+    """Turn chunk-relative line indexes into file line numbers."""
+    path, offset = None, 0
+    for task, (nlines, hits) in zip(tasks, results):
+        if task[0] != path:
+            path, offset = task[0], 0
+        for i, text in hits:
+            yield path, offset + i + 1, text
+        offset += nlines
+
+
+def scan_stdin(args: argparse.Namespace) -> Iterator[Tuple[str, int, str]]:
+    """Yield (name, line number, text) for every hit on standard input."""
+    finder = make_finder(args.impl, args.pattern, args.ignore_case)
+    lines = sys.stdin.read().splitlines()
+    for i, text in grep_lines(lines, finder, args.only_matching):
+        yield '(standard input)', i + 1, text
+
+
+def output(args: argparse.Namespace, hits: Iterator[Tuple[str, int, str]]) -> int:
+    """Print hits in the requested mode, return how many lines matched."""
+    with_name = len(args.files) > 1
+    counts = {path: 0 for path in args.files}
+    last = None
+    for path, lineno, text in hits:
+        # hits arrive in order, several per line only with -o
+        if (path, lineno) != last:
+            last = (path, lineno)
+            counts[path] = counts.get(path, 0) + 1
+        if args.count:
+            continue
+        # Like grep -o, empty matches count the line but print nothing
+        if args.only_matching and not text:
+            continue
+        prefix = f'{path}:' if with_name else ''
+        if args.line_number:
+            prefix += f'{lineno}:'
+        print(prefix + text)
+    if args.count:
+        for path, n in counts.items():
+            print(f'{path}:{n}' if with_name else n)
+    return sum(counts.values())
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Search files for lines matching a pattern.')
+    parser.add_argument('--loglevel', '-l', default='WARNING')
+    parser.add_argument('--impl', choices=['regex', 'nfa'], default='regex',
+                        help='matching engine (default: regex)')
+    parser.add_argument('--count', '-c', action='store_true',
+                        help='print only the number of matching lines per file')
+    parser.add_argument('--line-number', '-n', action='store_true',
+                        help='prefix each line with its line number')
+    parser.add_argument('--only-matching', '-o', action='store_true',
+                        help='print only the matched parts, one per line')
+    parser.add_argument('--ignore-case', '-i', action='store_true',
+                        help='match without regard to case')
+    parser.add_argument('--jobs', '-j', type=int, default=os.cpu_count() or 1,
+                        help='worker processes (default: number of CPUs)')
+    parser.add_argument('--chunk-size', type=int, default=4 << 20,
+                        help='bytes per work unit, cut at line boundaries (default: 4MB)')
+    parser.add_argument('pattern', type=str)
+    parser.add_argument('files', nargs='*', type=str)
     args = parser.parse_args()
 
     handler = logging.StreamHandler(sys.stderr)
@@ -18,18 +175,18 @@ def main():
     logger.addHandler(handler)
     logger.setLevel(args.loglevel)
 
-    print(regex.match('abc.*def', 'abczzdef'))
-    print(regex.match('abc[a-z]*def', 'abczzdef'))
-    print(regex.match('abc(?P<pp>.*)def', 'abczzdef'))
-    print(regex.match('(abc)*end', 'abcabcend'))
-
-    print(nfa.compile('ab*c').match('abbc'))
-    print(nfa.compile('abc.*def').match('abczzdef'))
-    print(nfa.compile('abc[a0-9b]*def').match('abc00def'))
-    print(nfa.compile('abc.{2,4}def').match('abc00def'))
-    print(nfa.compile('abc\\d+def').match('abc00def'))
-    print(nfa.compile('(abc)*end').match('abcabcend'))
+    hits = scan_files(args) if args.files else scan_stdin(args)
+    try:
+        found = output(args, hits)
+        sys.stdout.flush()
+    except BrokenPipeError:
+        # The reader stopped early, like head: quit quietly, and point stdout
+        # at devnull so the flush at exit doesn't raise again
+        hits.close()
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
+    return 0 if found else 1
 
 
 if __name__ == '__main__':
-    main()
+    sys.exit(main())
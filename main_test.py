@@ -0,0 +1,75 @@
+import argparse
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+import main
+
+
+def run_output(hits, **kwargs):
+    args = argparse.Namespace(files=[], count=False, line_number=False, only_matching=False)
+    vars(args).update(kwargs)
+    out = io.StringIO()
+    with redirect_stdout(out):
+        n = main.output(args, iter(hits))
+    return n, out.getvalue()
+
+
+class TestFinder(unittest.TestCase):
+    """Test the compiled line scanners"""
+
+    def test_engines_agree(self):
+        """Test both engines find the same spans, line after line"""
+        lines = ['GET /a/1', 'x', 'POST /b/22 /c/3', '/d/4']
+        for ignore_case in [False, True]:
+            finders = [main.make_finder(impl, '/[a-z]/\\d+', ignore_case) for impl in ['regex', 'nfa']]
+            for line in lines:
+                self.assertEqual(*[list(f(line)) for f in finders], line)
+
+    def test_nfa_reuses_scanner(self):
+        """Test the nfa finder resets one scanner, even after a line scanned only in part"""
+        finder = main.make_finder('nfa', 'a+')
+        self.assertEqual(next(finder('xaa aaa')), (1, 3))
+        self.assertEqual(list(finder('aab')), [(0, 2)])
+        self.assertEqual(list(main.grep_lines(['a', 'b', 'ca'], finder, False)), [(0, 'a'), (2, 'ca')])
+
+
+class TestOutput(unittest.TestCase):
+    """Test how hits are printed"""
+
+    def test_only_matching_skips_empty(self):
+        """Test -o prints no blank line for an empty match, but still counts the line"""
+        hits = list(main.grep_lines(['abc', 'xx'], main.make_finder('regex', 'x*'), True))
+        n, out = run_output([('-', i + 1, text) for i, text in hits], only_matching=True)
+        self.assertEqual(out, 'xx\n')
+        self.assertEqual(n, 2)
+
+    def test_empty_line_printed(self):
+        """Test an empty matching line is still printed without -o"""
+        n, out = run_output([('-', 2, '')])
+        self.assertEqual((n, out), (1, '\n'))
+
+
+class TestBrokenPipe(unittest.TestCase):
+    """Test the reader closing the pipe early"""
+
+    def test_head(self):
+        """Test closing stdout after one line stops quietly, like piping into head"""
+        with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False) as f:
+            f.write('line\n' * 200000)
+        try:
+            p = subprocess.Popen([sys.executable, 'main.py', '-j', '2', '--chunk-size', '100000', 'line', f.name],
+                                 cwd=os.path.dirname(os.path.abspath(main.__file__)),
+                                 stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            self.assertEqual(p.stdout.readline(), b'line\n')
+            p.stdout.close()
+            err = p.stderr.read()
+            p.stderr.close()
+            self.assertEqual(p.wait(timeout=30), 1)
+            self.assertEqual(err, b'')
+        finally:
+            os.unlink(f.name)
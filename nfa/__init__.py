@@ -1,6 +1,37 @@
 """
 NFA-based regex engine.
 """
+from common.flags import Flag, UNICODE, IGNORECASE, MULTILINE
+from common.lines import LineIndex
+from common.budget import Budget, MatchTimeout
 from .compile import compile
+from .stats import MatchStats
+from .profile import Profile
+from .footprint import footprint
+from .export import write_dot, write_json, read_json
+from .scanner import Scanner
+from .aio import afinditer
+from .batch import match_many, search_many
+from .regexset import RegexSet
 
-__all__ = ['compile']
+__all__ = [
+    'compile',
+    'Flag',
+    'UNICODE',
+    'IGNORECASE',
+    'MULTILINE',
+    'Budget',
+    'MatchTimeout',
+    'MatchStats',
+    'Profile',
+    'footprint',
+    'write_dot',
+    'write_json',
+    'read_json',
+    'LineIndex',
+    'Scanner',
+    'afinditer',
+    'match_many',
+    'search_many',
+    'RegexSet',
+]
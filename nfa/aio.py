@@ -0,0 +1,53 @@
+"""
+asyncio front end for the streaming NFA Scanner.
+"""
+import asyncio
+import codecs
+from typing import AsyncIterator, AsyncIterable, Optional, Union
+
+from .nodes import Node
+from .scanner import Scanner, Span
+
+Chunk = Union[bytes, str]
+
+
+async def chunks(source: Union[asyncio.StreamReader, AsyncIterable[Chunk]],
+                 chunk_size: int) -> AsyncIterator[Chunk]:
+    """Read chunks from a StreamReader or any async iterable until EOF."""
+    if isinstance(source, asyncio.StreamReader):
+        while True:
+            chunk = await source.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+    else:
+        async for chunk in source:
+            yield chunk
+
+
+async def afinditer(graph: Node, source: Union[asyncio.StreamReader, AsyncIterable[Chunk]],
+                    encoding: Optional[str] = 'utf-8', chunk_size: int = 65536,
+                    slice_size: int = 4096) -> AsyncIterator[Span]:
+    """
+    Yield (start, end) of matches as the data arrives.
+
+    bytes chunks are decoded incrementally, so offsets count characters.
+    With encoding None they are scanned as raw bytes and offsets count
+    bytes. Each chunk is fed to the scanner in slices of slice_size characters,
+    handing control back to the event loop between slices, so a large
+    chunk never blocks other tasks for long.
+    """
+    scanner = Scanner(graph)
+    decoder = codecs.getincrementaldecoder(encoding)() if encoding else None
+    async for chunk in chunks(source, chunk_size):
+        if decoder is not None and isinstance(chunk, bytes):
+            chunk = decoder.decode(chunk)
+        for i in range(0, len(chunk), slice_size):
+            for span in scanner.feed(chunk[i:i+slice_size]):
+                yield span
+            await asyncio.sleep(0)
+    if decoder is not None:
+        for span in scanner.feed(decoder.decode(b'', final=True)):
+            yield span
+    for span in scanner.finish():
+        yield span
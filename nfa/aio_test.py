@@ -0,0 +1,62 @@
+import asyncio
+import unittest
+
+from .aio import afinditer
+from .compile import compile
+
+
+async def collect(agen):
+    """Gather everything an async generator yields"""
+    return [x async for x in agen]
+
+
+async def from_list(items):
+    """Async iterator over a list"""
+    for item in items:
+        yield item
+
+
+class TestAfinditer(unittest.IsolatedAsyncioTestCase):
+    """Test asyncio scanning"""
+
+    async def test_stream_reader(self):
+        """Test scanning data from a StreamReader"""
+        reader = asyncio.StreamReader()
+        reader.feed_data(b'xxab')
+        reader.feed_data(b'cxxabc')
+        reader.feed_eof()
+        spans = await collect(afinditer(compile('abc'), reader, chunk_size=3))
+        self.assertEqual(spans, [(2, 5), (7, 10)])
+
+    async def test_async_iterable_str(self):
+        """Test scanning str chunks from an async iterator"""
+        spans = await collect(afinditer(compile('\\d+'), from_list(['a1', '2b', '3'])))
+        self.assertEqual(spans, [(1, 3), (4, 5)])
+
+    async def test_split_multibyte(self):
+        """Test a multi-byte character split across chunks"""
+        data = 'é-ab'.encode('utf-8')
+        spans = await collect(afinditer(compile('ab'), from_list([data[:1], data[1:]])))
+        self.assertEqual(spans, [(2, 4)])
+
+    async def test_raw_bytes(self):
+        """Test scanning bytes without decoding, offsets count bytes"""
+        data = 'é-ab'.encode('utf-8')
+        spans = await collect(afinditer(compile('ab'), from_list([data]), encoding=None))
+        self.assertEqual(spans, [(3, 5)])
+
+    async def test_yields_control(self):
+        """Test other tasks run while a large chunk is scanned"""
+        ticks = []
+
+        async def ticker():
+            for _ in range(5):
+                ticks.append(len(ticks))
+                await asyncio.sleep(0)
+
+        task = asyncio.create_task(ticker())
+        seen = []
+        async for span in afinditer(compile('b'), from_list(['a' * 100 + 'b']), slice_size=10):
+            seen.append((span, len(ticks)))
+        await task
+        self.assertEqual(seen, [((100, 101), 5)])
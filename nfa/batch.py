@@ -0,0 +1,51 @@
+"""
+Batch matching of one pattern against many inputs.
+"""
+from collections import deque
+from typing import Deque, Iterable, List, Optional, Set, Tuple, Union
+
+from common.budget import Budget
+
+from .compile import compile
+from .edges import Input
+from .nodes import Node
+from .scanner import Scanner, Span
+
+Pattern = Union[str, bytes, Node]
+
+
+def match_many(pattern: Pattern, inputs: Iterable[Input],
+               budget: Optional[Budget] = None) -> bytearray:
+    """
+    Match every input against pattern, return one 0/1 byte per input.
+
+    The pattern is compiled once and the BFS queue and history set are
+    reused across inputs.
+    """
+    graph = pattern if isinstance(pattern, Node) else compile(pattern)
+    sts: Deque[Tuple[int, Node]] = deque()
+    history: Set[Tuple[int, int]] = set()
+    hits = bytearray()
+    for s in inputs:
+        hits.append(graph.run(s, budget, sts, history))
+    return hits
+
+
+def search_many(pattern: Pattern, inputs: Iterable[Input],
+                budget: Optional[Budget] = None) -> List[Tuple[int, Span]]:
+    """
+    Search every input, return (index, (start, end)) for those that match.
+
+    The budget, else the pattern default, applies to each search on its own.
+    """
+    graph = pattern if isinstance(pattern, Node) else compile(pattern)
+    if budget is None:
+        budget = graph.budget
+    scanner = Scanner(graph)
+    r: List[Tuple[int, Span]] = []
+    for i, s in enumerate(inputs):
+        scanner.reset()
+        for span in scanner.finditer(s, budget=budget):
+            r.append((i, span))
+            break
+    return r
@@ -0,0 +1,52 @@
+import unittest
+
+from common.budget import Budget, MatchTimeout
+
+from .batch import match_many, search_many
+from .compile import compile
+
+
+class TestMatchMany(unittest.TestCase):
+    """Test match_many"""
+
+    def test_hits(self):
+        """Test one flag per input"""
+        hits = match_many('a\\d+', ['a1', 'b1', 'a', 'a123'])
+        self.assertEqual(hits, bytearray([1, 0, 0, 1]))
+
+    def test_compiled_pattern(self):
+        """Test passing an already compiled graph"""
+        self.assertEqual(list(match_many(compile('ab'), iter(['ab', b'ab', 'ba']))), [1, 1, 0])
+
+    def test_empty(self):
+        """Test no inputs"""
+        self.assertEqual(match_many('a', []), bytearray())
+
+    def test_budget_per_input(self):
+        """Test the budget applies to each input separately"""
+        budget = Budget(max_steps=20)
+        self.assertEqual(list(match_many('ab', ['ab'] * 10, budget)), [1] * 10)
+        with self.assertRaises(MatchTimeout):
+            match_many('a.*b', ['a' * 50], budget)
+
+
+class TestSearchMany(unittest.TestCase):
+    """Test search_many"""
+
+    def test_spans(self):
+        """Test (index, span) pairs for matching inputs only"""
+        self.assertEqual(search_many('\\d+', ['abc', 'a12b3', '7']),
+                         [(1, (1, 3)), (2, (0, 1))])
+
+    def test_budget_per_input(self):
+        """Test the budget applies to each search separately and reports its steps"""
+        budget = Budget(max_steps=30)
+        self.assertEqual(search_many('ab', ['xxab'] * 10, budget), [(i, (2, 4)) for i in range(10)])
+        self.assertGreater(budget.steps, 0)
+        with self.assertRaises(MatchTimeout):
+            search_many('a.*b', ['a' * 50], budget)
+
+    def test_pattern_budget(self):
+        """Test the budget given to compile applies when none is passed"""
+        with self.assertRaises(MatchTimeout):
+            search_many(compile('a.*b', Budget(max_steps=30)), ['a' * 50])
@@ -2,52 +2,81 @@
 Compile regex string to NFA using Thompson's Construction.
 """
 import logging
-from typing import List, Tuple, Set, Generator
-from .edges import Empty, Any, Char, Charset, SPECIAL_QUOTES
+from typing import List, Tuple, Set, Generator, Optional, Union
+from common.unicode import fold, table
+from common.flags import Flag, UNICODE, IGNORECASE, MULTILINE
+from common.budget import Budget
+from .edges import Edge, Empty, Any, Char, Charset, Ranges, Assert, SPECIAL_QUOTES, UNICODE_QUOTES
 from .nodes import Node
 
 
-def compile(regex: str) -> Node:
-    """Compile regex string to NFA using Thompson's Construction."""
+def compile(regex: Union[str, bytes], budget: Optional[Budget] = None, flags: int = 0) -> Node:
+    """
+    Compile regex string to NFA using Thompson's Construction.
+
+    budget, if given, becomes the default limit for every match() on the
+    returned graph. A bytes pattern is read as Latin-1, so each byte
+    becomes the character with the same code and matches that byte.
+    flags combines Flag options, see flags.py.
+    """
+    if isinstance(regex, bytes):
+        regex = regex.decode('latin-1')
     toks = list(tokenizer(regex))
     logging.debug(toks)
-    head = Node('end')
-    graph = compile_subgraph(head, toks)
+    # Keep the accept node free of outgoing edges, a trailing quantifier
+    # loops back through the node in front of it instead.
+    head = Node()
+    head.outs.append((Empty(), Node('end')))
+    graph = compile_subgraph(head, toks, Flag(flags))
     graph.name = 'begin'
-    logging.debug(graph.graph2dot())
+    graph.budget = budget
+    if logging.getLogger().isEnabledFor(logging.DEBUG):
+        logging.debug(graph.graph2dot())
     return graph
 
 
-def compile_subgraph(head: Node, toks: List[str]) -> Node:
-    """Recursively compile token list into NFA subgraph, returns new head."""
+def compile_subgraph(head: Node, toks: List[str], flags: Flag = Flag(0)) -> Node:
+    """
+    Recursively compile token list into NFA subgraph, returns new head.
+
+    Tokens are compiled right to left, each atom leading to head, the entry
+    of what follows it. A quantified atom leads to an exit node of its own
+    instead, and a quantified group starts at one, so its loop edges stay
+    between its own entry and exit: were they on head, whatever follows
+    could loop back into the atom, and 'a*b*' would match 'aba'.
+    """
     tail = head
     quantifiers = '1'
 
     while toks:
         tok = toks.pop(-1)
+        after = head
+        if quantifiers != '1':
+            head = Node()
+            head.outs.append((Empty(), after))
         match tok[0]:
             case ')':
-                idx = scan_brackets(toks)
-                if idx == -1:
-                    raise Exception('Unmatched parenthesis')
-                newhead = compile_subgraph(head, toks[idx+1:])
-                toks = toks[:idx]
+                newhead, toks = compile_group(head, toks, flags, quantifiers != '1')
             case '(':
                 raise Exception('Unmatched parenthesis')
             case '.':
                 newhead = Node()
                 newhead.outs.append((Any(), head))
-            case '\\' if len(tok) > 1 and tok[1] in SPECIAL_QUOTES:
+            case '^' | '$':
                 newhead = Node()
-                newhead.outs.append((Charset(*SPECIAL_QUOTES[tok[1]]), head))
+                newhead.outs.append((Assert(tok, multiline=bool(flags & MULTILINE)), head))
             case '\\':
                 newhead = Node()
-                newhead.outs.append((Char(tok[1]), head))
+                newhead.outs.append((escape_edge(tok, flags), head))
             case '[':
                 newhead = Node()
-                newhead.outs.append((Charset(*tok_to_set(tok)), head))
+                newhead.outs.append((charset_edge(tok, flags), head))
             case '|':
-                newhead = compile_subgraph(tail, toks)
+                # Fork from a node of its own: the left branch's entry may be
+                # a loop target, or tail itself when the branch is empty
+                left = compile_subgraph(tail, toks, flags)
+                newhead = Node()
+                newhead.outs.append((Empty(), left))
                 newhead.outs.append((Empty(), head))
             case '*' | '+' | '?':
                 quantifiers = tok
@@ -57,7 +86,7 @@ def compile_subgraph(head: Node, toks: List[str]) -> Node:
                 continue
             case _:
                 newhead = Node()
-                newhead.outs.append((Char(tok), head))
+                newhead.outs.append((char_edge(tok, flags), head))
 
         newhead, head = proc_quantifiers(quantifiers, newhead, head)
         quantifiers = '1'
@@ -67,6 +96,53 @@ def compile_subgraph(head: Node, toks: List[str]) -> Node:
     return head
 
 
+def compile_group(head: Node, toks: List[str], flags: Flag, quantified: bool) -> Tuple[Node, List[str]]:
+    """Compile the group closed at the end of toks, returns its head and the tokens before it."""
+    idx = scan_brackets(toks)
+    if idx == -1:
+        raise Exception('Unmatched parenthesis')
+    newhead = compile_subgraph(head, toks[idx+1:], flags)
+    if quantified:
+        entry = Node()
+        entry.outs.append((Empty(), newhead))
+        newhead = entry
+    return newhead, toks[:idx]
+
+
+def escape_edge(tok: str, flags: Flag) -> Edge:
+    """Edge of an escape token: an assertion, a special class, a \\p{...} property or a literal."""
+    c = tok[1]
+    if c in 'AZ':
+        return Assert(c)
+    if c in 'bB':
+        return Assert(c, table('word') if flags & UNICODE else None)
+    if c in 'pP' and len(tok) > 2:
+        return Ranges(table(tok[3:-1]), c == 'p')
+    if c in SPECIAL_QUOTES and flags & UNICODE:
+        name, include = UNICODE_QUOTES[c]
+        return Ranges(table(name), include)
+    if c in SPECIAL_QUOTES:
+        return Charset(*SPECIAL_QUOTES[c])
+    return char_edge(c, flags)
+
+
+def char_edge(c: str, flags: Flag) -> Edge:
+    """Edge of a literal char, a Charset of all its cases under IGNORECASE."""
+    if flags & IGNORECASE:
+        cases = fold({c})
+        if len(cases) > 1:
+            return Charset(cases, True)
+    return Char(c)
+
+
+def charset_edge(tok: str, flags: Flag) -> Charset:
+    """Edge of a bracket token, its set case-closed under IGNORECASE."""
+    cset, include = tok_to_set(tok)
+    if flags & IGNORECASE:
+        cset = fold(cset)
+    return Charset(cset, include)
+
+
 def scan_brackets(toks: List[str]) -> int:
     """Find matching '(' for already-popped ')', handling nested brackets."""
     cur = len(toks) - 1
@@ -165,6 +241,18 @@ def repeat_n(quantifiers: str, newhead: Node, head: Node) -> Tuple[Node, Node]:
     return newhead, head
 
 
+def escape_end(regex: str, cur: int) -> int:
+    """End of the escape at cur: \\x, or \\p{...} naming a Unicode property."""
+    if cur + 1 >= len(regex):
+        raise Exception('Incomplete escape sequence')
+    if regex[cur+1] in 'pP' and regex.startswith('{', cur+2):
+        idx = regex.find('}', cur)
+        if idx == -1:
+            raise Exception('Unmatched brace')
+        return idx+1
+    return cur+2
+
+
 def tokenizer(regex: str) -> Generator[str, None, None]:
     """Split regex into tokens, handling quantifiers, brackets, escapes."""
     cur = 0
@@ -191,11 +279,9 @@ def tokenizer(regex: str) -> Generator[str, None, None]:
             yield regex[cur:cur+idx]
             cur += idx
         elif regex[cur] == '\\':
-            if cur + 1 < len(regex):
-                yield regex[cur:cur+2]
-                cur += 2
-            else:
-                raise Exception('Incomplete escape sequence')
+            end = escape_end(regex, cur)
+            yield regex[cur:end]
+            cur = end
         else:
             yield regex[cur]
             cur += 1
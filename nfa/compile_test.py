@@ -1,7 +1,11 @@
+import re
 import string
 import unittest
 
-from .compile import tokenizer, tok_to_set, compile, scan_brackets
+from common.flags import UNICODE, IGNORECASE, MULTILINE
+
+from .compile import tokenizer, tok_to_set, compile, scan_brackets, fold
+from .edges import Char, Charset
 
 
 class TestScanBrackets(unittest.TestCase):
@@ -723,3 +727,172 @@ class TestCompileComplex(unittest.TestCase):
         self.assertTrue(nfa.match('xabc@xyzy'))
         self.assertFalse(nfa.match('xuser@y'))
         self.assertFalse(nfa.match('x@hosty'))
+
+
+class TestCompileTrailingQuantifier(unittest.TestCase):
+    """Test quantifiers on the last element of the pattern"""
+
+    def test_trailing_star(self):
+        """Test trailing star"""
+        nfa = compile('ab*')
+        self.assertTrue(nfa.match('a'))
+        self.assertTrue(nfa.match('abbb'))
+        self.assertFalse(nfa.match('abc'))
+
+    def test_trailing_plus(self):
+        """Test trailing plus on a group"""
+        nfa = compile('(ab)+')
+        self.assertTrue(nfa.match('abab'))
+        self.assertFalse(nfa.match(''))
+
+    def test_end_node_has_no_outs(self):
+        """Test the accept node never gets outgoing edges"""
+        nfa = compile('a*')
+        self.assertTrue(nfa.match(''))
+        self.assertTrue(nfa.match('aaa'))
+
+
+class TestCompileAdjacentQuantifiers(unittest.TestCase):
+    """Test quantified atoms don't loop into their neighbours"""
+
+    def test_adjacent_loops(self):
+        """Test back-to-back quantifiers only repeat their own atom"""
+        self.assertFalse(compile('[^a]+[ab]*?').match('x xxaccaxc'))
+        self.assertFalse(compile('a*b*').match('aba'))
+        self.assertTrue(compile('a*b*').match('aabb'))
+        self.assertFalse(compile('x+y+').match('xyxy'))
+        self.assertTrue(compile('a{2,}b*').match('aab'))
+
+    def test_quantified_group(self):
+        """Test an inner loop can't leave a quantified group half way"""
+        nfa = compile('(a*b)*c')
+        self.assertFalse(nfa.match('ac'))
+        self.assertTrue(nfa.match('abaabc'))
+
+    def test_alternation(self):
+        """Test a branch can't loop into the other one"""
+        self.assertFalse(compile('|a').match('aa'))
+        self.assertFalse(compile('a*|b').match('ab'))
+        self.assertTrue(compile('a*|b').match('aa'))
+
+    def test_agrees_with_re(self):
+        """Test full matches agree with re on short strings"""
+        for pattern in ['(a|b*)c*', '(a+|b)+c?', 'a?b*?a+', '(|a)b*', 'a*|b*|c', 'a{1,3}b?a']:
+            nfa = compile(pattern)
+            for s in ['', 'a', 'ab', 'ba', 'abc', 'aba', 'bca', 'aab', 'cab', 'aaba', 'abcc']:
+                self.assertEqual(nfa.match(s), bool(re.fullmatch(pattern, s)), (pattern, s))
+
+
+class TestCompileUnicode(unittest.TestCase):
+    """Test Unicode properties and the UNICODE flag"""
+
+    def test_tokenize_property(self):
+        """Test \\p{...} is one token"""
+        self.assertEqual(list(tokenizer('a\\p{Han}+\\P{L}')), ['a', '\\p{Han}', '+', '\\P{L}'])
+        self.assertEqual(list(tokenizer('\\pa')), ['\\p', 'a'])
+
+    def test_unmatched_property_brace(self):
+        """Test an unclosed property name is rejected"""
+        with self.assertRaises(Exception):
+            list(tokenizer('\\p{Han'))
+
+    def test_property(self):
+        """Test property and negated property"""
+        nfa = compile('\\p{Han}+')
+        self.assertTrue(nfa.match('中文'))
+        self.assertFalse(nfa.match('中a'))
+        nfa = compile('\\P{N}\\p{N}')
+        self.assertTrue(nfa.match('a½'))
+        self.assertFalse(nfa.match('1½'))
+
+    def test_flag(self):
+        """Test UNICODE widens \\w \\d \\s"""
+        self.assertFalse(compile('\\w+').match('héllo'))
+        self.assertTrue(compile('\\w+', flags=UNICODE).match('héllo'))
+        self.assertTrue(compile('\\d\\s\\W', flags=UNICODE).match('٣\u3000!'))
+        self.assertFalse(compile('\\D', flags=UNICODE).match('٣'))
+
+    def test_bytes(self):
+        """Test properties match bytes by their Latin-1 code point"""
+        self.assertTrue(compile('\\p{L}').match(b'\xe9'))
+        self.assertFalse(compile('\\p{L}').match(b'1'))
+
+
+class TestCompileAnchors(unittest.TestCase):
+    """Test compiling assertions"""
+
+    def test_start_end(self):
+        """Test ^ $ \\A \\Z pin the match to the ends of the text"""
+        self.assertTrue(compile('^ab$').match('ab'))
+        self.assertTrue(compile('\\Aab\\Z').match('ab'))
+        self.assertFalse(compile('a^b').match('a^b'))
+        self.assertTrue(compile('a\\^b\\$').match('a^b$'))
+
+    def test_end_before_final_newline(self):
+        """Test $ doesn't hold before a final newline, unlike in re, unless MULTILINE"""
+        self.assertIsNone(compile('a$').search('a\n'))
+        self.assertIsNone(compile('^$').search('\n'))
+        self.assertEqual(compile('a$', flags=MULTILINE).search('a\n'), (0, 1))
+
+    def test_word_boundary(self):
+        """Test \\b \\B between chars"""
+        self.assertTrue(compile('\\bab\\b').match('ab'))
+        self.assertFalse(compile('a\\bb').match('ab'))
+        self.assertTrue(compile('a\\Bb').match('ab'))
+        self.assertTrue(compile('a\\b b').match('a b'))
+
+    def test_unicode_word_boundary(self):
+        """Test \\b uses Unicode word chars under UNICODE"""
+        self.assertTrue(compile('x\\bé').match('xé'))
+        self.assertFalse(compile('x\\bé', flags=UNICODE).match('xé'))
+
+    def test_quantified(self):
+        """Test an optional assertion"""
+        self.assertTrue(compile('a\\b?b').match('ab'))
+
+    def test_multiline(self):
+        """Test MULTILINE ^ $ hold at line breaks, \\A \\Z still only at the ends"""
+        self.assertTrue(compile('a$\n^b', flags=MULTILINE).match('a\nb'))
+        self.assertFalse(compile('a$\n^b').match('a\nb'))
+        self.assertFalse(compile('a\\Z\nb', flags=MULTILINE).match('a\nb'))
+
+
+class TestCompileIgnoreCase(unittest.TestCase):
+    """Test IGNORECASE folding at compile time"""
+
+    def test_fold(self):
+        """Test case closure of a set"""
+        self.assertEqual(fold({'a', '1'}), {'a', 'A', '1'})
+        self.assertEqual(fold({'ǅ'}), {'ǅ', 'Ǆ', 'ǆ'})
+        self.assertEqual(fold({'ß'}), {'ß', 'ẞ'})
+
+    def test_reverse_mappings(self):
+        """Test chars that only map to a case, like the Kelvin sign, join its set"""
+        self.assertTrue(compile('k', flags=IGNORECASE).match('\u212a'))
+        self.assertTrue(compile('\u212a', flags=IGNORECASE).match('K'))
+        self.assertTrue(compile('[s]', flags=IGNORECASE).match('ſ'))
+
+    def test_edges(self):
+        """Test cased literals become charsets, others stay chars"""
+        nfa = compile('a1', flags=IGNORECASE)
+        e, = [e for e, _ in nfa.outs]
+        self.assertIsInstance(e, Charset)
+        self.assertEqual(e.s, {'a', 'A'})
+        e, = [e for e, _ in nfa.outs[0][1].outs]
+        self.assertIsInstance(e, Char)
+
+    def test_match(self):
+        """Test literals, escapes and brackets ignore case"""
+        nfa = compile('hello\\.[a-c]+[^x]', flags=IGNORECASE)
+        self.assertTrue(nfa.match('HeLLo.AbCy'))
+        self.assertFalse(nfa.match('hello.abcX'))
+        self.assertFalse(compile('hello').match('HELLO'))
+
+    def test_search(self):
+        """Test search finds every casing"""
+        nfa = compile('error', flags=IGNORECASE)
+        self.assertEqual(list(nfa.finditer('Error ERROR eRRor')), [(0, 5), (6, 11), (12, 17)])
+
+    def test_bytes(self):
+        """Test Latin-1 bytes fold too"""
+        self.assertTrue(compile(b'caf\xe9', flags=IGNORECASE).match(b'CAF\xc9'))
@@ -0,0 +1,104 @@
+"""
+Lazily built DFA on top of an NFA graph.
+"""
+from typing import Dict, FrozenSet, Iterable, Set, Union
+
+from .edges import Input
+from .literals import has_assertions
+from .nodes import Node
+
+
+class State(object):
+    """
+    DFA state: an epsilon-closed set of NFA nodes.
+
+    accepts holds the tags of the accept nodes in the set, next caches
+    the transition taken on each input character (or byte value).
+    """
+
+    def __init__(self, nodes: FrozenSet[Node], accepts: FrozenSet[int]) -> None:
+        self.nodes: FrozenSet[Node] = nodes
+        self.accepts: FrozenSet[int] = accepts
+        self.next: Dict[Union[str, int], 'State'] = {}
+
+    def __repr__(self) -> str:
+        return f'<dfa state {len(self.nodes)} nodes, accepts {sorted(self.accepts)}>'
+
+
+class DFA(object):
+    """
+    Subset construction done on demand.
+
+    States and transitions are only built when the input first needs them
+    and then cached, so a scan costs one dict lookup per character once
+    warm. When more than max_states have been built the cache is dropped
+    with every cached transition and rebuilt from scratch, bounding
+    memory on adversarial input.
+
+    tags maps accept nodes (nodes without outgoing edges) to the ids of
+    the patterns they belong to. Graphs with assertions are refused: a
+    state only knows the next char, not what lies around the position.
+    """
+
+    def __init__(self, graph: Node, tags: Dict[Node, Set[int]], max_states: int = 10000) -> None:
+        if has_assertions(graph):
+            raise Exception('DFA cannot run a graph with assertions')
+        self.graph: Node = graph
+        self.tags: Dict[Node, Set[int]] = tags
+        self.max_states: int = max_states
+        self.cache: Dict[FrozenSet[Node], State] = {}
+        self.start: State = self.state([graph])
+
+    def __repr__(self) -> str:
+        return f'<dfa {len(self.cache)} states>'
+
+    def closure(self, nodes: Iterable[Node]) -> FrozenSet[Node]:
+        """Add every node reachable through epsilon edges."""
+        closed = set(nodes)
+        stack = list(closed)
+        while stack:
+            node = stack.pop()
+            for e, next_node in node.outs:
+                if not e.width and next_node not in closed:
+                    closed.add(next_node)
+                    stack.append(next_node)
+        return frozenset(closed)
+
+    def state(self, nodes: Iterable[Node]) -> State:
+        """Return the cached state for the closure of nodes, building it if new."""
+        closed = self.closure(nodes)
+        st = self.cache.get(closed)
+        if st is not None:
+            return st
+        if len(self.cache) >= self.max_states:
+            self.flush()
+            st = self.cache.get(closed)
+            if st is not None:
+                return st
+        accepts: Set[int] = set()
+        for node in closed:
+            if not node.outs and node in self.tags:
+                accepts |= self.tags[node]
+        st = State(closed, frozenset(accepts))
+        self.cache[closed] = st
+        return st
+
+    def flush(self) -> None:
+        """Drop every state and the transitions between them, keep a new start state."""
+        for st in self.cache.values():
+            st.next.clear()
+        self.cache.clear()
+        self.start = self.state([self.graph])
+
+    def step(self, st: State, s: Input, i: int) -> State:
+        """Follow the transition from st on s[i]."""
+        nxt = st.next.get(s[i])
+        if nxt is None:
+            targets = []
+            for node in st.nodes:
+                for e, next_node in node.outs:
+                    if e.width and e.match(s, i) is not None:
+                        targets.append(next_node)
+            nxt = self.state(targets)
+            st.next[s[i]] = nxt
+        return nxt
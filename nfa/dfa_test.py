@@ -0,0 +1,90 @@
+import random
+import unittest
+
+from .compile import compile
+from .dfa import DFA
+from .edges import Char, Empty
+from .nodes import Node
+
+
+def accept_tags(graph):
+    """Tag every accept node of graph with pattern 0"""
+    return {node: {0} for node in graph.walk() if not node.outs}
+
+
+def run(dfa, s):
+    """Run dfa over s, return the final state"""
+    st = dfa.start
+    for i in range(len(s)):
+        st = dfa.step(st, s, i)
+    return st
+
+
+class TestDFA(unittest.TestCase):
+    """Test the lazy DFA"""
+
+    def test_closure(self):
+        """Test epsilon closure follows only zero-width edges"""
+        end = Node('end')
+        mid = Node('mid')
+        start = Node('start')
+        start.outs.append((Empty(), mid))
+        mid.outs.append((Char('a'), end))
+        dfa = DFA(start, {end: {0}})
+        self.assertEqual(dfa.start.nodes, frozenset([start, mid]))
+        self.assertEqual(dfa.start.accepts, frozenset())
+
+    def test_accepts(self):
+        """Test final state accepts exactly the matching inputs"""
+        graph = compile('a(b|c)*d')
+        dfa = DFA(graph, accept_tags(graph))
+        self.assertEqual(run(dfa, 'abcbd').accepts, {0})
+        self.assertEqual(run(dfa, 'ad').accepts, {0})
+        self.assertEqual(run(dfa, 'abc').accepts, set())
+        self.assertEqual(run(dfa, b'acd').accepts, {0})
+
+    def test_transitions_cached(self):
+        """Test states and transitions are built once and reused"""
+        graph = compile('a*')
+        dfa = DFA(graph, accept_tags(graph))
+        st = dfa.step(dfa.start, 'a', 0)
+        self.assertIs(dfa.step(dfa.start, 'a', 0), st)
+        self.assertIs(dfa.step(st, 'a', 0), dfa.step(st, 'a', 0))
+        before = len(dfa.cache)
+        run(dfa, 'a' * 100)
+        self.assertEqual(len(dfa.cache), before)
+
+    def test_assertions_refused(self):
+        """Test graphs with assertions can't be run as a DFA"""
+        graph = compile('\\ba')
+        with self.assertRaises(Exception):
+            DFA(graph, accept_tags(graph))
+
+    def test_dead_state(self):
+        """Test a failed transition ends in the empty state"""
+        graph = compile('ab')
+        dfa = DFA(graph, accept_tags(graph))
+        self.assertEqual(run(dfa, 'x').nodes, frozenset())
+
+    def test_cache_limit(self):
+        """Test the state cache is flushed when it grows too large"""
+        graph = compile('.*a.{3}')
+        dfa = DFA(graph, accept_tags(graph), max_states=4)
+        self.assertEqual(run(dfa, 'xaxxx').accepts, {0})
+        self.assertLessEqual(len(dfa.cache), 4)
+
+    def test_flush_drops_states(self):
+        """Test a flush leaves no old states reachable from the start state"""
+        graph = compile('.*a.{6}')
+        dfa = DFA(graph, accept_tags(graph), max_states=50)
+        rng = random.Random(1)
+        run(dfa, ''.join(rng.choice('ax') for _ in range(5000)))
+        seen = {id(dfa.start): dfa.start}
+        stack = [dfa.start]
+        while stack:
+            for nxt in stack.pop().next.values():
+                if id(nxt) not in seen:
+                    seen[id(nxt)] = nxt
+                    stack.append(nxt)
+        self.assertLessEqual(len(seen), 50)
+        self.assertTrue(all(dfa.cache.get(st.nodes) is st for st in seen.values()))
@@ -3,23 +3,62 @@ Edge types for NFA regex engine.
 
 All edge types inherit from the Edge base class and implement
 the match() method for their specific matching logic.
+
+Input may be str, or any bytes-like object (bytes, bytearray, memoryview,
+mmap). Indexing bytes-likes gives ints, so edges compare against both the
+character and its code; byte values map to code points 0-255 (Latin-1).
 """
+import mmap
 import string
-from typing import Set, Optional, Dict, Tuple
+from bisect import bisect_right
+from typing import List, Set, Optional, Dict, Tuple, Union
 from abc import ABC, abstractmethod
 
+from common.unicode import RangeTable
+
+
+# Anything edges can index into
+Input = Union[str, bytes, bytearray, memoryview, mmap.mmap]
+
+
+def as_input(s: Input) -> Input:
+    """Return s in indexable form, casting memoryviews to unsigned bytes."""
+    if isinstance(s, memoryview) and s.format != 'B':
+        return s.cast('B')
+    return s
+
 
 class Edge(ABC):
-    """Abstract base for NFA edges - decoupled from nodes, only check transition conditions."""
+    """
+    Abstract base for NFA edges - decoupled from nodes, only check transition conditions.
+
+    width is how many characters a successful match consumes: 0 for edges
+    followed during epsilon closure, 1 for edges that step over a char.
+    """
+
+    # Edges hold no per-instance dict, subclasses list their own fields
+    __slots__ = ()
+
+    width: int = 1
 
     @abstractmethod
     def match(self, s: str, cur: int) -> Optional[int]:
         """Try to match at position, return new position or None."""
         pass
 
+    def holds(self, prev: Optional[Union[str, int]], nxt: Optional[Union[str, int]]) -> bool:
+        """
+        Whether a zero-width edge can be followed between chars prev and
+        nxt, either None at an end of the text. Only assertions look.
+        """
+        return True
+
 
 class Empty(Edge):
     """Epsilon edge - transitions without consuming input."""
+    __slots__ = ()
+
+    width: int = 0
 
     def __repr__(self) -> str:
         return 'ε'
@@ -31,6 +70,7 @@ class Empty(Edge):
 
 class Any(Edge):
     """Matches any single character if available."""
+    __slots__ = ()
 
     def __repr__(self) -> str:
         return '.'
@@ -44,9 +84,12 @@ class Any(Edge):
 
 class Char(Edge):
     """Matches a specific character."""
+    __slots__ = ('c', 'code')
 
     def __init__(self, c: str) -> None:
         self.c: str = c
+        # Byte value for bytes-like input, never equal to a str
+        self.code: Optional[int] = ord(c) if ord(c) < 256 else None
 
     def __repr__(self) -> str:
         return self.c
@@ -55,17 +98,21 @@ class Char(Edge):
         """Match if current char equals expected char."""
         if cur >= len(s):
             return None
-        if s[cur] != self.c:
+        x = s[cur]
+        if x != self.c and x != self.code:
             return None
         return cur+1
 
 
 class Charset(Edge):
     """Matches chars in/not-in a set, for [a-z] or [^0-9] patterns."""
+    __slots__ = ('s', 'include', 'keys')
 
     def __init__(self, s: Set[str], include: bool) -> None:
         self.s: Set[str] = set(s)
         self.include: bool = include
+        # Lookup set holding both the chars and their byte values
+        self.keys: Set[Union[str, int]] = self.s | {ord(c) for c in self.s if ord(c) < 256}
 
     def __repr__(self) -> str:
         return f'[{"^" if not self.include else ""}{"".join(sorted(self.s))}]'
@@ -75,14 +122,90 @@ class Charset(Edge):
         if cur >= len(s):
             return None
         if self.include:
-            if s[cur] not in self.s:
+            if s[cur] not in self.keys:
                 return None
         else:
-            if s[cur] in self.s:
+            if s[cur] in self.keys:
                 return None
         return cur+1
 
 
+class Ranges(Edge):
+    """Matches chars in/not-in a shared Unicode range table, for \\p{L} or Unicode \\w."""
+    __slots__ = ('table', 'include', 'starts', 'ends')
+
+    def __init__(self, table: RangeTable, include: bool) -> None:
+        self.table: RangeTable = table
+        self.include: bool = include
+        # The table's lists, looked up directly on the hot path
+        self.starts: List[int] = table.starts
+        self.ends: List[int] = table.ends
+
+    def __repr__(self) -> str:
+        return f'\\{"p" if self.include else "P"}{{{self.table.name}}}'
+
+    def match(self, s: str, cur: int) -> Optional[int]:
+        """Binary search the char's code point in the table's ranges."""
+        if cur >= len(s):
+            return None
+        x = s[cur]
+        code = ord(x) if isinstance(x, str) else x
+        i = bisect_right(self.starts, code)
+        if (i > 0 and code <= self.ends[i-1]) != self.include:
+            return None
+        return cur+1
+
+
+class Assert(Edge):
+    """
+    Zero-width assertion on the position: ^ and \\A at the start of the
+    text, $ and \\Z at its end, \\b and \\B at a word boundary or not.
+    With multiline, ^ also holds after a newline and $ before one.
+
+    Decided by the chars on either side alone, so a scanner that has
+    dropped the text before its buffer only needs to keep the last char.
+    That is also why, unlike in re, $ without multiline is the same as
+    \\Z: it doesn't hold before a final '\\n', which would need a look
+    two chars ahead.
+    """
+    __slots__ = ('kind', 'word', 'multiline')
+
+    width: int = 0
+
+    def __init__(self, kind: str, word: Optional[RangeTable] = None, multiline: bool = False) -> None:
+        # The assertion as written, without the backslash
+        self.kind: str = kind
+        # Word chars of \b \B under UNICODE, None for ASCII \w
+        self.word: Optional[RangeTable] = word
+        self.multiline: bool = multiline
+
+    def __repr__(self) -> str:
+        return self.kind if self.kind in '^$' else f'\\{self.kind}'
+
+    def is_word(self, c: Optional[Union[str, int]]) -> bool:
+        if c is None:
+            return False
+        if self.word is not None:
+            return (ord(c) if isinstance(c, str) else c) in self.word
+        return c in WORD_KEYS
+
+    def holds(self, prev: Optional[Union[str, int]], nxt: Optional[Union[str, int]]) -> bool:
+        kind = self.kind
+        if kind in '^A':
+            return prev is None or (self.multiline and prev in NEWLINE)
+        if kind in '$Z':
+            return nxt is None or (self.multiline and nxt in NEWLINE)
+        return (self.is_word(prev) != self.is_word(nxt)) == (kind == 'b')
+
+    def match(self, s: str, cur: int) -> Optional[int]:
+        """Look at the chars around cur, return cur if the assertion holds."""
+        prev = s[cur-1] if cur > 0 else None
+        nxt = s[cur] if cur < len(s) else None
+        if not self.holds(prev, nxt):
+            return None
+        return cur
+
+
 # Type alias for special character class definitions
 SPECIAL_QUOTES: Dict[str, Tuple[Set[str], bool]] = {
     'd': (set(string.digits), True),
@@ -92,3 +215,19 @@ SPECIAL_QUOTES: Dict[str, Tuple[Set[str], bool]] = {
     'w': (set('_'+string.ascii_letters+string.digits), True),
     'W': (set('_'+string.ascii_letters+string.digits), False),
 }
+
+# Range table names of the special classes under the UNICODE flag
+UNICODE_QUOTES: Dict[str, Tuple[str, bool]] = {
+    'd': ('digit', True),
+    'D': ('digit', False),
+    's': ('space', True),
+    'S': ('space', False),
+    'w': ('word', True),
+    'W': ('word', False),
+}
+
+# ASCII word chars and their byte values, for \b \B
+WORD_KEYS: Set[Union[str, int]] = SPECIAL_QUOTES['w'][0] | {ord(c) for c in SPECIAL_QUOTES['w'][0]}
+
+# A newline as a char and as a byte value, for multiline ^ $
+NEWLINE: Set[Union[str, int]] = {'\n', 10}
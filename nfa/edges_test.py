@@ -1,7 +1,9 @@
 import string
 import unittest
 
-from .edges import Edge, Empty, Any, Char, Charset, SPECIAL_QUOTES
+from common.unicode import table
+
+from .edges import Edge, Empty, Any, Char, Charset, Ranges, Assert, SPECIAL_QUOTES, as_input
 
 
 class TestEmpty(unittest.TestCase):
@@ -197,6 +199,82 @@ class TestCharset(unittest.TestCase):
         self.assertIsNone(edge.match('', 0))
 
 
+class TestRanges(unittest.TestCase):
+    """Test Ranges edge (Unicode property) matching"""
+
+    def test_include(self):
+        """Test chars inside the table match"""
+        edge = Ranges(table('L'), True)
+        self.assertEqual(edge.match('é1', 0), 1)
+        self.assertIsNone(edge.match('é1', 1))
+        self.assertIsNone(edge.match('é', 1))
+
+    def test_exclude(self):
+        """Test negated table"""
+        edge = Ranges(table('L'), False)
+        self.assertIsNone(edge.match('é', 0))
+        self.assertEqual(edge.match('1', 0), 1)
+
+    def test_bytes(self):
+        """Test byte values are looked up as code points"""
+        edge = Ranges(table('L'), True)
+        self.assertEqual(edge.match(b'\xe9', 0), 1)
+        self.assertIsNone(edge.match(b'1', 0))
+
+    def test_shares_table(self):
+        """Test edges keep the shared table lists"""
+        edge = Ranges(table('N'), True)
+        self.assertIs(edge.starts, table('N').starts)
+        self.assertEqual(repr(edge), '\\p{N}')
+        self.assertEqual(repr(Ranges(table('N'), False)), '\\P{N}')
+
+
+class TestAssert(unittest.TestCase):
+    """Test zero-width assertion edges"""
+
+    def test_start_end(self):
+        """Test ^ \\A hold at offset 0 only, $ \\Z at the end only"""
+        for kind in '^A':
+            self.assertEqual(Assert(kind).match('ab', 0), 0)
+            self.assertIsNone(Assert(kind).match('ab', 1))
+        for kind in '$Z':
+            self.assertEqual(Assert(kind).match('ab', 2), 2)
+            self.assertIsNone(Assert(kind).match('ab', 1))
+        self.assertEqual(Assert('^').width, 0)
+
+    def test_word_boundary(self):
+        """Test \\b holds between a word char and anything else, \\B elsewhere"""
+        b, nb = Assert('b'), Assert('B')
+        self.assertEqual([b.match('a b', i) for i in range(4)], [0, 1, 2, 3])
+        self.assertEqual([b.match('ab', i) for i in range(3)], [0, None, 2])
+        self.assertEqual([nb.match('ab', i) for i in range(3)], [None, 1, None])
+        self.assertEqual(b.match(b'a b', 1), 1)
+        self.assertIsNone(b.match(b'ab', 1))
+
+    def test_unicode_word(self):
+        """Test \\b with a Unicode word table"""
+        self.assertIsNone(Assert('b').match('é', 0))
+        self.assertEqual(Assert('b', table('word')).match('é', 0), 0)
+
+    def test_holds(self):
+        """Test assertions only look at the chars around the position"""
+        self.assertTrue(Assert('^').holds(None, 'a'))
+        self.assertFalse(Assert('^').holds('\n', 'a'))
+        self.assertTrue(Assert('b').holds('a', None))
+        self.assertTrue(Empty().holds('a', 'b'))
+
+    def test_multiline(self):
+        """Test multiline ^ $ also hold next to a newline, in str and bytes"""
+        self.assertEqual([Assert('^', multiline=True).match('a\nb', i) for i in range(4)], [0, None, 2, None])
+        self.assertEqual([Assert('$', multiline=True).match('a\nb', i) for i in range(4)], [None, 1, None, 3])
+        self.assertEqual(Assert('^', multiline=True).match(b'a\nb', 2), 2)
+        self.assertIsNone(Assert('^').match('a\nb', 2))
+
+    def test_repr(self):
+        """Test assertions print as written"""
+        self.assertEqual([repr(Assert(k)) for k in '^$AZbB'], ['^', '$', '\\A', '\\Z', '\\b', '\\B'])
+
+
 class TestSpecialQuotes(unittest.TestCase):
     """Test SPECIAL_QUOTES definitions"""
 
@@ -298,3 +376,46 @@ class TestEdgeInterface(unittest.TestCase):
         edges = [Empty(), Any(), Char('a'), Charset(set('a'), True)]
         for edge in edges:
             self.assertIsInstance(edge, Edge)
+
+    def test_no_instance_dict(self):
+        """Test edges are slotted, without a per-instance __dict__"""
+        edges = [Empty(), Any(), Char('a'), Charset(set('a'), True), Ranges(table('L'), True)]
+        for edge in edges:
+            self.assertFalse(hasattr(edge, '__dict__'))
+
+
+class TestBytesInput(unittest.TestCase):
+    """Test edges against bytes-like input"""
+
+    def test_char_bytes(self):
+        """Test Char matches the byte with the same code"""
+        edge = Char('a')
+        self.assertEqual(edge.match(b'xa', 1), 2)
+        self.assertIsNone(edge.match(b'xb', 1))
+        self.assertEqual(edge.match(bytearray(b'a'), 0), 1)
+
+    def test_char_not_confused_with_code(self):
+        """Test str input never matches through the byte code"""
+        edge = Char('a')
+        self.assertIsNone(edge.match('b', 0))
+
+    def test_charset_bytes(self):
+        """Test Charset against bytes"""
+        edge = Charset(set('abc'), True)
+        self.assertEqual(edge.match(b'b', 0), 1)
+        self.assertIsNone(edge.match(b'd', 0))
+        edge = Charset(set('abc'), False)
+        self.assertEqual(edge.match(b'd', 0), 1)
+        self.assertIsNone(edge.match(b'a', 0))
+
+    def test_any_memoryview(self):
+        """Test Any against a memoryview"""
+        edge = Any()
+        self.assertEqual(edge.match(memoryview(b'ab'), 1), 2)
+        self.assertIsNone(edge.match(memoryview(b'ab'), 2))
+
+    def test_as_input_casts_memoryview(self):
+        """Test memoryviews of other formats are cast to bytes"""
+        view = memoryview(bytearray(4)).cast('I')
+        self.assertEqual(as_input(view).format, 'B')
+        self.assertEqual(len(as_input(view)), 4)
@@ -0,0 +1,148 @@
+"""
+Streaming export of NFA graphs as DOT and JSON adjacency.
+
+Nodes are numbered 0, 1, 2... in breadth-first order from the head, so
+the same pattern always exports the same ids. Output goes line by line
+to a file object; the whole graph is walked once.
+"""
+import json
+from typing import Dict, IO, List, Optional, Sequence, Tuple, TYPE_CHECKING
+
+from common.unicode import table
+
+from .edges import Any, Assert, Char, Charset, Edge, Empty, Ranges
+from .nodes import Node
+
+if TYPE_CHECKING:
+    from .profile import Profile
+
+
+def number(graph: Node) -> Dict[Node, int]:
+    """Stable integer id of every node reachable from graph, head is 0."""
+    return {node: i for i, node in enumerate(graph.walk())}
+
+
+def write_dot(graph: Node, f: IO[str], profile: Optional['Profile'] = None) -> None:
+    """Write graph to f as DOT, with integer node ids."""
+    ids = number(graph)
+    f.writelines(graph.dot_lines(lambda node: str(ids[node]), profile))
+    f.write('\n')
+
+
+def edge_to_json(e: Edge) -> Tuple:
+    """JSON form of an edge: its kind followed by its fields."""
+    if isinstance(e, Empty):
+        return ('empty',)
+    if isinstance(e, Any):
+        return ('any',)
+    if isinstance(e, Char):
+        return ('char', e.c)
+    if isinstance(e, Charset):
+        return ('charset', ''.join(sorted(e.s)), e.include)
+    if isinstance(e, Ranges):
+        return ('ranges', e.table.name, e.include)
+    if isinstance(e, Assert):
+        return ('assert', e.kind, e.word.name if e.word is not None else None, e.multiline)
+    raise Exception(f'cannot export edge {e!r}')
+
+
+def edge_from_json(data: Sequence) -> Edge:
+    """Rebuild an edge from edge_to_json() output."""
+    kind = data[0]
+    if kind == 'empty':
+        return Empty()
+    if kind == 'any':
+        return Any()
+    if kind == 'char':
+        return Char(data[1])
+    if kind == 'charset':
+        return Charset(set(data[1]), data[2])
+    if kind == 'ranges':
+        return Ranges(table(data[1]), data[2])
+    if kind == 'assert':
+        return Assert(data[1], table(data[2]) if data[2] is not None else None, data[3])
+    raise Exception(f'unknown edge kind {kind!r}')
+
+
+def outs_to_json(node: Node, ids: Dict[Node, int]) -> List:
+    """Outs of node as [edge, target id] pairs."""
+    return [[edge_to_json(e), ids[n]] for e, n in node.outs]
+
+
+def to_tables(graph: Node) -> Tuple[Tuple, Tuple]:
+    """
+    Graph as an edge table and a node table indexed by node id.
+
+    Each distinct edge is listed once; a node row is its name and its
+    outs as (edge index, target id) pairs. Made of tuples, strings and
+    numbers only, so written out as a Python literal it compiles to a
+    single constant.
+    """
+    ids = number(graph)
+    edges: Dict[Tuple, int] = {}
+    rows = []
+    for node in ids:
+        outs = []
+        for e, n in node.outs:
+            outs.append((edges.setdefault(edge_to_json(e), len(edges)), ids[n]))
+        rows.append((node.name, tuple(outs)))
+    return tuple(edges), tuple(rows)
+
+
+def from_tables(tables: Sequence[Sequence], cache: Optional[Dict[Tuple, Edge]] = None) -> Node:
+    """
+    Rebuild a graph from to_tables() output, return its head.
+
+    Edges hold no state, so graphs loaded with the same cache dict share
+    equal edges instead of building them again.
+    """
+    edge_table, rows = tables
+    if cache is None:
+        cache = {}
+    edges = []
+    for e in edge_table:
+        if e not in cache:
+            cache[e] = edge_from_json(e)
+        edges.append(cache[e])
+    graph = [Node(name) for name, _ in rows]
+    for node, (_, outs) in zip(graph, rows):
+        node.outs = [(edges[e], graph[n]) for e, n in outs]
+    return graph[0]
+
+
+def to_json(graph: Node) -> List[Dict]:
+    """JSON adjacency of graph as a list of nodes, head first."""
+    ids = number(graph)
+    return [{'id': i, 'name': node.name, 'outs': outs_to_json(node, ids)} for node, i in ids.items()]
+
+
+def from_json(nodes: List[Dict]) -> Node:
+    """Rebuild a graph from its JSON adjacency, return its head."""
+    edges: Dict[Tuple, int] = {}
+    rows: List[Tuple] = [()] * len(nodes)
+    for d in nodes:
+        outs = tuple((edges.setdefault(tuple(e), len(edges)), n) for e, n in d['outs'])
+        rows[d['id']] = (d['name'], outs)
+    return from_tables((tuple(edges), rows))
+
+
+def write_json(graph: Node, f: IO[str]) -> None:
+    """
+    Write graph to f as JSON adjacency, one node per line.
+
+    {"nodes": [{"id": 0, "name": ..., "outs": [[edge, target id], ...]}, ...]}
+    Node 0 is the head; nodes without outs are accepting.
+    """
+    ids = number(graph)
+    f.write('{"nodes": [\n')
+    for node, i in ids.items():
+        if i:
+            f.write(',\n')
+        d = {'id': i, 'name': node.name, 'outs': outs_to_json(node, ids)}
+        f.write(json.dumps(d, ensure_ascii=False))
+    f.write('\n]}\n')
+
+
+def read_json(f: IO[str]) -> Node:
+    """Rebuild the graph written by write_json(), return its head."""
+    return from_json(json.load(f)['nodes'])
@@ -0,0 +1,140 @@
+import io
+import json
+import unittest
+
+from common.unicode import table
+
+from .compile import compile
+from .edges import Any, Assert, Char, Charset, Empty
+from .export import number, write_dot, write_json, read_json, edge_to_json, edge_from_json, to_tables, from_tables
+from .nodes import Node
+from .profile import Profile
+
+
+class TestNumber(unittest.TestCase):
+    """Test stable node ids"""
+
+    def test_head_is_zero(self):
+        """Test ids follow breadth-first order from the head"""
+        graph = compile('ab|c')
+        ids = number(graph)
+        self.assertEqual(ids[graph], 0)
+        self.assertEqual(sorted(ids.values()), list(range(len(ids))))
+
+    def test_stable(self):
+        """Test the same pattern always numbers the same way"""
+        out = []
+        for _ in range(2):
+            f = io.StringIO()
+            write_dot(compile('(a|b)*c{2,3}'), f)
+            out.append(f.getvalue())
+        self.assertEqual(out[0], out[1])
+
+
+class TestWriteDot(unittest.TestCase):
+    """Test DOT export"""
+
+    def test_ids(self):
+        """Test nodes are named by integer id"""
+        n1, n2 = Node('n1'), Node('n2')
+        n1.outs.append((Char('a'), n2))
+        f = io.StringIO()
+        write_dot(n1, f)
+        self.assertEqual(f.getvalue(),
+                         'digraph G {\n'
+                         '    "0" [label=""];\n'
+                         '    "0" -> "1" [label="a"];\n'
+                         '    "1" [label=""];\n'
+                         '}\n')
+
+    def test_matches_graph2dot(self):
+        """Test output is graph2dot with names swapped for ids"""
+        graph = compile('a+b')
+        ids = number(graph)
+        expected = graph.graph2dot()
+        for node, i in ids.items():
+            expected = expected.replace(f'"{node}"', f'"{i}"')
+        f = io.StringIO()
+        write_dot(graph, f)
+        self.assertEqual(f.getvalue(), expected + '\n')
+
+    def test_profile(self):
+        """Test a profile turns the output into a heatmap"""
+        graph = compile('ab')
+        profile = Profile(graph)
+        profile.run(['ab'])
+        f = io.StringIO()
+        write_dot(graph, f, profile)
+        self.assertIn('"0" [label="1", color=', f.getvalue())
+
+
+class TestJson(unittest.TestCase):
+    """Test JSON adjacency export"""
+
+    def test_edges_round_trip(self):
+        """Test every edge kind survives export"""
+        for e in [Empty(), Any(), Char('é'), Charset(set('a-z'), False), Assert('b'), Assert('B', table('word')),
+                  Assert('^', multiline=True)]:
+            back = edge_from_json(json.loads(json.dumps(edge_to_json(e))))
+            self.assertIs(type(back), type(e))
+            self.assertEqual(repr(back), repr(e))
+            self.assertEqual(getattr(back, 'multiline', None), getattr(e, 'multiline', None))
+
+    def test_unknown_edge(self):
+        """Test unknown edge kinds are rejected"""
+        with self.assertRaises(Exception):
+            edge_from_json(['nope'])
+
+    def test_format(self):
+        """Test one node per line, ids as targets"""
+        n1, n2 = Node('n1'), Node('n2')
+        n1.outs.append((Char('a'), n2))
+        f = io.StringIO()
+        write_json(n1, f)
+        lines = f.getvalue().splitlines()
+        self.assertEqual(len(lines), 4)
+        self.assertEqual(json.loads(f.getvalue()), {'nodes': [
+            {'id': 0, 'name': 'n1', 'outs': [[['char', 'a'], 1]]},
+            {'id': 1, 'name': 'n2', 'outs': []},
+        ]})
+
+    def test_round_trip(self):
+        """Test a reloaded graph matches like the original"""
+        for pattern in ['(get|post)/[a-z]+', 'a{2,4}b*', '[^0-9]\\d.', '\\p{L}\\P{N}', '^x\\b\\B?.$']:
+            graph = compile(pattern)
+            f = io.StringIO()
+            write_json(graph, f)
+            f.seek(0)
+            back = read_json(f)
+            self.assertEqual(len(number(back)), len(number(graph)))
+            for s in ['get/abc', 'post/', 'aab', 'aaaabbb', 'x1y', '11y', '']:
+                self.assertEqual(back.match(s), graph.match(s), (pattern, s))
+
+
+class TestTables(unittest.TestCase):
+    """Test compact tables for ahead-of-time compiled patterns"""
+
+    def test_edges_listed_once(self):
+        """Test repetition clones point at one edge row"""
+        edges, rows = to_tables(compile('[a-z]{5}'))
+        self.assertEqual(edges, (('charset', 'abcdefghijklmnopqrstuvwxyz', True), ('empty',)))
+        self.assertEqual(rows[0][0], 'begin')
+
+    def test_constant(self):
+        """Test tables survive a round trip through repr"""
+        tables = to_tables(compile('a|b+c'))
+        self.assertEqual(eval(repr(tables)), tables)
+
+    def test_round_trip(self):
+        """Test a reloaded graph matches like the original"""
+        graph = compile('(get|post)/\\w+')
+        back = from_tables(to_tables(graph))
+        for s in ['get/x1', 'post/', 'put/x', '']:
+            self.assertEqual(back.match(s), graph.match(s), s)
+
+    def test_shared_cache(self):
+        """Test graphs loaded with one cache share equal edges"""
+        cache = {}
+        g1 = from_tables(to_tables(compile('\\d+')), cache)
+        g2 = from_tables(to_tables(compile('x\\d')), cache)
+        self.assertIs(g1.outs[0][0], g2.outs[0][1].outs[0][0])
@@ -0,0 +1,86 @@
+"""
+Retained memory of a compiled NFA graph.
+"""
+import sys
+from typing import Dict, Set
+
+from .edges import Any, Assert, Char, Charset, Edge, Empty
+from .nodes import Node
+
+
+def sizeof(obj: object) -> int:
+    """Size of obj with its attribute dict, if it has one."""
+    size = sys.getsizeof(obj)
+    if hasattr(obj, '__dict__'):
+        size += sys.getsizeof(obj.__dict__)
+    return size
+
+
+class Footprint(object):
+    """
+    Bytes held by a graph, by construct.
+
+    sizes and counts are keyed by construct: nodes (with their out lists
+    and edge tuples), repetition (nodes cloned by {n,m}), literals,
+    charsets (with their lookup sets), epsilon, wildcards and anchors.
+    """
+
+    def __init__(self) -> None:
+        self.sizes: Dict[str, int] = {}
+        self.counts: Dict[str, int] = {}
+
+    def __repr__(self) -> str:
+        return f'<footprint {self.total} bytes>'
+
+    @property
+    def total(self) -> int:
+        return sum(self.sizes.values())
+
+    def add(self, construct: str, size: int) -> None:
+        self.sizes[construct] = self.sizes.get(construct, 0) + size
+        self.counts[construct] = self.counts.get(construct, 0) + 1
+
+
+def edge_size(e: Edge) -> int:
+    size = sizeof(e)
+    if isinstance(e, Charset):
+        # Single chars and small ints inside are interned, not retained
+        size += sys.getsizeof(e.s) + sys.getsizeof(e.keys)
+    return size
+
+
+def edge_construct(e: Edge) -> str:
+    if isinstance(e, Char):
+        return 'literals'
+    if isinstance(e, Charset):
+        return 'charsets'
+    if isinstance(e, Empty):
+        return 'epsilon'
+    if isinstance(e, Any):
+        return 'wildcards'
+    if isinstance(e, Assert):
+        return 'anchors'
+    return type(e).__name__.lower()
+
+
+def footprint(graph: Node) -> Footprint:
+    """
+    Walk graph and sum sys.getsizeof of every node and edge object once.
+
+    Repeating a group {n,m} clones its nodes but shares the edge objects,
+    so a node reached after another one holding the same edge object is
+    counted as a repetition clone.
+    """
+    fp = Footprint()
+    seen: Set[int] = set()
+    for node in graph.walk():
+        size = sizeof(node) + sys.getsizeof(node.outs) + sum(sys.getsizeof(t) for t in node.outs)
+        clone = False
+        for e, _ in node.outs:
+            if id(e) in seen:
+                clone = True
+                continue
+            seen.add(id(e))
+            fp.add(edge_construct(e), edge_size(e))
+        fp.add('repetition' if clone else 'nodes', size)
+    return fp
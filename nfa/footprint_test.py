@@ -0,0 +1,29 @@
+import unittest
+
+from .compile import compile
+from .footprint import footprint
+
+
+class TestFootprint(unittest.TestCase):
+    """Test retained memory walks"""
+
+    def test_literal(self):
+        """Test literal edges and nodes are counted once each"""
+        fp = footprint(compile('abc'))
+        self.assertEqual(fp.counts['literals'], 3)
+        self.assertEqual(fp.counts['nodes'], 5)
+        self.assertNotIn('repetition', fp.counts)
+        self.assertEqual(fp.total, sum(fp.sizes.values()))
+
+    def test_repetition_clones(self):
+        """Test {n} clones share edges and are reported as repetition"""
+        small, big = footprint(compile('a{2}')), footprint(compile('a{20}'))
+        self.assertEqual(big.counts['literals'], 1)
+        self.assertEqual(big.counts['repetition'] - small.counts['repetition'], 18)
+        self.assertGreater(big.total, small.total)
+
+    def test_charsets(self):
+        """Test charset lookup sets are included"""
+        fp = footprint(compile('[a-z]'))
+        self.assertEqual(fp.counts['charsets'], 1)
+        self.assertGreater(fp.sizes['charsets'], footprint(compile('a')).sizes['literals'])
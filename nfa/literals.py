@@ -0,0 +1,218 @@
+"""
+Literal and anchor analysis of compiled NFA graphs.
+"""
+from typing import Dict, Iterator, List, Optional, Set, Tuple, Union, TYPE_CHECKING
+
+from .edges import Assert, Char, Charset, Edge
+
+if TYPE_CHECKING:
+    from .nodes import Node
+
+
+def predecessors(graph: 'Node') -> Dict['Node', List[Tuple[Edge, 'Node']]]:
+    """Map every reachable node to its incoming (edge, source) pairs."""
+    preds: Dict['Node', List[Tuple[Edge, 'Node']]] = {n: [] for n in graph.walk()}
+    for n in preds:
+        for e, next_node in n.outs:
+            preds[next_node].append((e, n))
+    return preds
+
+
+def dominators(graph: 'Node', preds: Dict['Node', List[Tuple[Edge, 'Node']]]) -> Dict['Node', Set['Node']]:
+    """For each reachable node, the nodes every path from graph to it passes."""
+    nodes = list(preds)
+    dom: Dict['Node', Set['Node']] = {n: set(nodes) for n in nodes}
+    dom[graph] = {graph}
+    changed = True
+    while changed:
+        changed = False
+        for n in nodes[1:]:
+            new = set.intersection(*(dom[p] for _, p in preds[n])) | {n}
+            if new != dom[n]:
+                dom[n] = new
+                changed = True
+    return dom
+
+
+def literal_after(node: 'Node') -> str:
+    """Chars spelled by the chain of single outgoing edges from node."""
+    lit = ''
+    seen: Set['Node'] = set()
+    while len(node.outs) == 1 and node not in seen:
+        seen.add(node)
+        e, node = node.outs[0]
+        if isinstance(e, Char):
+            lit += e.c
+        elif e.width:
+            break
+    return lit
+
+
+def needles_after(node: 'Node', limit: int) -> Optional[List[str]]:
+    """
+    At most limit strings, one of which the chain of single outgoing edges
+    from node spells. Chars and small positive classes multiply the
+    spellings; None if not even the first char fits.
+    """
+    needles = ['']
+    seen: Set['Node'] = set()
+    while len(node.outs) == 1 and node not in seen:
+        seen.add(node)
+        e, node = node.outs[0]
+        if isinstance(e, Char):
+            cs = {e.c}
+        elif isinstance(e, Charset) and e.include:
+            cs = e.s
+        elif e.width:
+            break
+        else:
+            continue
+        if len(needles) * len(cs) > limit:
+            break
+        needles = [n + c for n in needles for c in cs]
+    return needles if needles != [''] else None
+
+
+def literal_before(graph: 'Node', node: 'Node', preds: Dict['Node', List[Tuple[Edge, 'Node']]]) -> str:
+    """Chars spelled by the chain of single incoming edges into node, back to graph at most."""
+    lit = ''
+    seen: Set['Node'] = set()
+    # graph is also entered from outside, when matching starts
+    while node is not graph and len(preds[node]) == 1 and node not in seen:
+        seen.add(node)
+        e, node = preds[node][0]
+        if isinstance(e, Char):
+            lit = e.c + lit
+        elif e.width:
+            break
+    return lit
+
+
+def required_factor(graph: 'Node') -> str:
+    """
+    Longest literal that every match of graph contains, '' if none.
+
+    Nodes that dominate every accept node lie on all matching paths. Around
+    such a node, chains of single incoming and single outgoing Char (or
+    epsilon) edges spell text that all matches contain, contiguously.
+    """
+    preds = predecessors(graph)
+    dom = dominators(graph, preds)
+    accepts = [n for n in dom if not n.outs]
+    if not accepts:
+        return ''
+    required = set.intersection(*(dom[a] for a in accepts))
+    return max((literal_before(graph, n, preds) + literal_after(n) for n in required), key=len, default='')
+
+
+def first_chars(graph: 'Node') -> Optional[Set[Union[str, int]]]:
+    """
+    Chars (and their byte values) a match of graph can start with.
+
+    None if that is unknown, because a wildcard or negated class may come
+    first, or if the match may be empty.
+    """
+    keys: Set[Union[str, int]] = set()
+    seen: Set['Node'] = {graph}
+    stack: List['Node'] = [graph]
+    while stack:
+        node = stack.pop()
+        if not node.outs:
+            return None
+        for e, next_node in node.outs:
+            if not e.width:
+                if next_node not in seen:
+                    seen.add(next_node)
+                    stack.append(next_node)
+            elif isinstance(e, Char):
+                keys.add(e.c)
+                if e.code is not None:
+                    keys.add(e.code)
+            elif isinstance(e, Charset) and e.include:
+                keys |= e.keys
+            else:
+                return None
+    return keys
+
+
+def has_assertions(graph: 'Node') -> bool:
+    """Whether graph has assertion edges, which look at the text around the position."""
+    seen: Set['Node'] = {graph}
+    stack: List['Node'] = [graph]
+    while stack:
+        for e, next_node in stack.pop().outs:
+            if isinstance(e, Assert):
+                return True
+            if next_node not in seen:
+                seen.add(next_node)
+                stack.append(next_node)
+    return False
+
+
+def anchored_start(graph: 'Node', lines: bool = False) -> bool:
+    """
+    Whether every match of graph passes ^ or \\A before its first char,
+    so starts the text; with lines, the start of a line, a multiline ^
+    being enough.
+    """
+    seen: Set['Node'] = {graph}
+    stack: List['Node'] = [graph]
+    while stack:
+        node = stack.pop()
+        if not node.outs:
+            return False
+        for e, next_node in node.outs:
+            if isinstance(e, Assert) and e.kind in '^A' and (lines or not e.multiline):
+                continue
+            if e.width:
+                return False
+            if next_node not in seen:
+                seen.add(next_node)
+                stack.append(next_node)
+    return True
+
+
+def longest(graph: 'Node') -> Optional[int]:
+    """Most chars on a path from graph to an accept node, None if a loop makes it unbounded."""
+    depth: Dict['Node', int] = {}
+    path: Set['Node'] = {graph}
+    stack: List[Tuple['Node', Iterator[Tuple[Edge, 'Node']]]] = [(graph, iter(graph.outs))]
+    while stack:
+        node, outs = stack[-1]
+        for _, next_node in outs:
+            if next_node in path:
+                return None
+            if next_node not in depth:
+                path.add(next_node)
+                stack.append((next_node, iter(next_node.outs)))
+                break
+        else:
+            stack.pop()
+            path.discard(node)
+            depth[node] = max((e.width + depth[n] for e, n in node.outs), default=0)
+    return depth[graph]
+
+
+def end_window(graph: 'Node', lines: bool = False) -> Optional[int]:
+    """
+    Most chars a match of graph can span, when every match passes $ or
+    \\Z after its last char and so ends the text; with lines, a line,
+    a multiline $ being enough. None if the length is unbounded or
+    matches aren't anchored at the end.
+    """
+    preds = predecessors(graph)
+    stack = [n for n in preds if not n.outs]
+    seen: Set['Node'] = set(stack)
+    while stack:
+        node = stack.pop()
+        if node is graph:
+            return None
+        for e, prev in preds[node]:
+            if isinstance(e, Assert) and e.kind in '$Z' and (lines or not e.multiline):
+                continue
+            if e.width:
+                return None
+            if prev not in seen:
+                seen.add(prev)
+                stack.append(prev)
+    return longest(graph)
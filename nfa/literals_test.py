@@ -0,0 +1,115 @@
+import unittest
+
+from common.flags import MULTILINE
+
+from .compile import compile
+from .literals import (dominators, first_chars, literal_after, needles_after, predecessors, required_factor,
+                       has_assertions, anchored_start, longest, end_window)
+
+
+class TestDominators(unittest.TestCase):
+    """Test dominator computation"""
+
+    def test_alternation(self):
+        """Test branches don't dominate the join"""
+        graph = compile('(a|b)c')
+        dom = dominators(graph, predecessors(graph))
+        for node, ds in dom.items():
+            self.assertIn(graph, ds)
+            self.assertIn(node, ds)
+        accept = [n for n in dom if not n.outs][0]
+        self.assertEqual(len([d for d in dom[accept] if len(d.outs) == 2]), 1)
+
+
+class TestRequiredFactor(unittest.TestCase):
+    """Test required literal extraction"""
+
+    def test_literal(self):
+        """Test a plain literal is its own factor"""
+        self.assertEqual(required_factor(compile('abc')), 'abc')
+
+    def test_longest(self):
+        """Test the longest required run is chosen"""
+        self.assertEqual(required_factor(compile('(foo|bar)bazz\\d+x')), 'bazz')
+        self.assertEqual(required_factor(compile('GET /index\\.html')), 'GET /index.html')
+
+    def test_optional(self):
+        """Test optional parts are not required"""
+        self.assertEqual(required_factor(compile('err(or)?')), 'err')
+        self.assertEqual(required_factor(compile('a*b?')), '')
+        self.assertEqual(required_factor(compile('a*b')), 'b')
+
+    def test_none(self):
+        """Test alternation of literals has no single factor"""
+        self.assertEqual(required_factor(compile('ab|cd')), '')
+        self.assertEqual(required_factor(compile('[ab]+')), '')
+
+    def test_after_loop(self):
+        """Test a factor following a loop is found whole"""
+        self.assertEqual(required_factor(compile('.*error')), 'error')
+        self.assertEqual(required_factor(compile('x.*error=\\d+')), 'error=')
+        self.assertEqual(required_factor(compile('(ab)+')), 'ab')
+        self.assertEqual(required_factor(compile('x(ab)*yz')), 'yz')
+
+
+class TestLeading(unittest.TestCase):
+    """Test what matches must start with"""
+
+    def test_prefix(self):
+        """Test literal prefix at the head of the graph"""
+        self.assertEqual(literal_after(compile('GET /x')), 'GET /x')
+        self.assertEqual(literal_after(compile('ab*')), 'a')
+        self.assertEqual(literal_after(compile('a|b')), '')
+
+    def test_first_chars(self):
+        """Test first char sets include byte values"""
+        self.assertEqual(first_chars(compile('a|b')), {'a', 'b', 97, 98})
+        self.assertEqual(first_chars(compile('x*[yz]')), {'x', 'y', 'z', 120, 121, 122})
+        self.assertIsNone(first_chars(compile('.a')))
+        self.assertIsNone(first_chars(compile('[^a]')))
+        self.assertIsNone(first_chars(compile('a?')))
+
+    def test_needles(self):
+        """Test spellings of the leading chain stay within the limit"""
+        self.assertEqual(set(needles_after(compile('[ab][cd]x'), 8)), {'acx', 'adx', 'bcx', 'bdx'})
+        self.assertEqual(set(needles_after(compile('[ab][cd]x'), 2)), {'a', 'b'})
+        self.assertIsNone(needles_after(compile('[abc]x'), 2))
+        self.assertIsNone(needles_after(compile('a|b'), 8))
+
+
+class TestAnchors(unittest.TestCase):
+    """Test where assertions pin matches"""
+
+    def test_has_assertions(self):
+        """Test graphs are scanned for assertion edges"""
+        self.assertTrue(has_assertions(compile('a|\\bb')))
+        self.assertFalse(has_assertions(compile('a|b')))
+
+    def test_anchored_start(self):
+        """Test every path must pass ^ or \\A before its first char"""
+        self.assertTrue(anchored_start(compile('^ab')))
+        self.assertTrue(anchored_start(compile('(\\Aa|^b)c')))
+        self.assertFalse(anchored_start(compile('^a|b')))
+        self.assertFalse(anchored_start(compile('a^')))
+
+    def test_multiline(self):
+        """Test MULTILINE ^ $ pin matches to lines, not to the text"""
+        self.assertFalse(anchored_start(compile('^a', flags=MULTILINE)))
+        self.assertTrue(anchored_start(compile('^a', flags=MULTILINE), True))
+        self.assertTrue(anchored_start(compile('\\Aa', flags=MULTILINE)))
+        self.assertIsNone(end_window(compile('ab$', flags=MULTILINE)))
+        self.assertEqual(end_window(compile('ab$', flags=MULTILINE), True), 2)
+
+    def test_longest(self):
+        """Test the longest path counts chars, loops make it unbounded"""
+        self.assertEqual(longest(compile('ab?|c')), 2)
+        self.assertEqual(longest(compile('a{2,5}')), 5)
+        self.assertIsNone(longest(compile('ab*')))
+
+    def test_end_window(self):
+        """Test bounded patterns pinned to the end of the text"""
+        self.assertEqual(end_window(compile('(a|bc)$')), 2)
+        self.assertEqual(end_window(compile('x{1,3}\\Z')), 3)
+        self.assertIsNone(end_window(compile('a+$')))
+        self.assertIsNone(end_window(compile('a$|b')))
+        self.assertIsNone(end_window(compile('$a')))
@@ -2,8 +2,16 @@
 Node definition for NFA.
 """
 import logging
-from typing import List, Set, Tuple, Dict, Optional
-from .edges import Edge
+from collections import deque
+from typing import Callable, List, Set, Tuple, Dict, Optional, Iterator, Deque, TYPE_CHECKING
+from common.lines import LineIndex
+from common.budget import Budget
+from .edges import Edge, Input, as_input
+from .scanner import Plan, Scanner
+from .stats import MatchStats, Trace
+
+if TYPE_CHECKING:
+    from .profile import Profile
 
 
 class Node(object):
@@ -15,12 +23,20 @@ class Node(object):
     while the target_node specifies where to go next.
 
     This design decouples the edge matching logic from the graph structure.
+
+    The head node of a compiled pattern may carry a default Budget, used by
+    match() when the caller doesn't pass one, and caches the Plan search
+    builds the first time it scans the graph.
     """
 
+    __slots__ = ('name', 'outs', 'budget', 'plan')
+
     def __init__(self, name=None) -> None:
         """Initialize empty node with no outgoing edges."""
         self.name = name
         self.outs: List[Tuple[Edge, 'Node']] = []
+        self.budget: Optional[Budget] = None
+        self.plan: Optional[Plan] = None
 
     def __repr__(self) -> str:
         if self.name:
@@ -37,56 +53,138 @@ class Node(object):
             nn.outs.append((e, n.clone(mapping)))
         return nn
 
-    def graph2dot(self) -> str:
-        """Generate Graphviz DOT format for NFA visualization."""
-        nodes: List['Node'] = [self]
-        done: Set['Node'] = set()
-        dot_content = "digraph G {\n"
-        while nodes:
-            p = nodes.pop(0)
-            if p in done:
-                continue
-            dot_content += f'    "{p}" [label=""];\n'
-            for e, next_node in p.outs:
-                next_id: str = str(next_node) if next_node else 'end'
-                dot_content += f'    "{p}" -> "{next_id}" [label="{e}"];\n'
-                if next_node:
-                    nodes.append(next_node)
-            done.add(p)
-        dot_content += "}"
-        return dot_content
-
-    def match(self, s: str) -> bool:
-        """Match string using BFS with history tracking to avoid cycles."""
-        # Queue of (position, node) states to explore
-        sts: List[Tuple[int, Node]] = [(0, self)]
-        # Set of (position, node_id) to avoid revisiting same state
+    def walk(self) -> Iterator['Node']:
+        """Yield every node reachable from here once, breadth first."""
+        seen: Set['Node'] = {self}
+        queue: Deque['Node'] = deque([self])
+        while queue:
+            node = queue.popleft()
+            yield node
+            for _, next_node in node.outs:
+                if next_node not in seen:
+                    seen.add(next_node)
+                    queue.append(next_node)
+
+    def graph2dot(self, profile: Optional['Profile'] = None) -> str:
+        """
+        Generate Graphviz DOT format for NFA visualization.
+
+        Given a Profile of this graph, render it as a heatmap: nodes show
+        visit counts, edges taken/tried counts, colored from blue to red
+        by how often they were tried.
+        """
+        return ''.join(self.dot_lines(str, profile))
+
+    def dot_lines(self, label: Callable[['Node'], str],
+                  profile: Optional['Profile'] = None) -> Iterator[str]:
+        """Yield the lines of graph2dot(), naming each node by label(node)."""
+        top_visits, top_tried = profile.tops() if profile else (0, 0)
+        yield 'digraph G {\n'
+        for p in self.walk():
+            name = label(p)
+            attrs = profile.node_attrs(p, top_visits) if profile else 'label=""'
+            yield f'    "{name}" [{attrs}];\n'
+            for i, (e, next_node) in enumerate(p.outs):
+                attrs = profile.edge_attrs(p, i, top_tried) if profile else f'label="{e}"'
+                yield f'    "{name}" -> "{label(next_node)}" [{attrs}];\n'
+        yield '}'
+
+    def search(self, s: Input, lines: Optional[LineIndex] = None) -> Optional[Tuple[int, int]]:
+        """Find the leftmost-longest match anywhere in s, as (start, end)."""
+        for span in self.finditer(s, lines):
+            return span
+        return None
+
+    def finditer(self, s: Input, lines: Optional[LineIndex] = None) -> Iterator[Tuple[int, int]]:
+        """
+        Yield (start, end) of successive non-overlapping matches in s.
+
+        lines is an optional LineIndex of s, which MULTILINE ^ and $ use to
+        jump between lines instead of finding the newlines again.
+        """
+        return Scanner(self).finditer(s, lines)
+
+    def match(self, s: Input, budget: Optional[Budget] = None,
+              stats: Optional[MatchStats] = None) -> bool:
+        """
+        Match string using BFS with history tracking to avoid cycles.
+
+        s may also be bytes, bytearray, memoryview or mmap, matched in place.
+
+        Each state popped from the queue costs one step against the budget
+        (the per-call one, else the pattern default). Raises MatchTimeout
+        when it runs out; budget.steps reports the steps used either way.
+
+        Passing stats has the loop report its work to it, see Trace.
+        """
+        if stats is not None:
+            return self.traced(s, budget, stats)
+        return self.run(s, budget, deque(), set())
+
+    def traced(self, s: Input, budget: Optional[Budget], trace: Trace) -> bool:
+        """Same as match(), reporting to trace from start() to done()."""
         history: Set[Tuple[int, int]] = set()
+        trace.start()
+        try:
+            return self.run(s, budget, deque(), history, trace)
+        finally:
+            trace.done(len(history))
+
+    def run(self, s: Input, budget: Optional[Budget],
+            sts: Deque[Tuple[int, 'Node']], history: Set[Tuple[int, int]],
+            trace: Optional[Trace] = None) -> bool:
+        """
+        Same as match(), with caller-owned scratch queue and history, cleared
+        first. A trace is told about every state and edge tried, see traced().
+        """
+        if budget is None:
+            budget = self.budget
+        s = as_input(s)
+        limit = budget.start() if budget is not None else float('inf')
+        steps = 0
 
-        while sts:
-            logging.debug(sts)
-            cur, node = sts.pop(0)
-
-            # Accept state: no outgoing edges and consumed entire input
-            if not node.outs and cur == len(s):
-                return True
-
-            # Explore all outgoing edges
-            for e, next_node in node.outs:
-                # Mark epsilon transitions in history before matching
-                history.add((cur, id(node)))
-
-                # Try to match the edge
-                new_cur: Optional[int] = e.match(s, cur)
-                if new_cur is None:
-                    continue
-
-                # Check if we've seen this state before
-                state_key = (new_cur, id(next_node))
-                if state_key in history:
-                    continue
-
-                # Add new state to queue
-                sts.append((new_cur, next_node))
-
-        return False
+        # Queue of (position, node) states to explore
+        sts.clear()
+        sts.append((0, self))
+        # Set of (position, node_id) ever queued, so each state runs once
+        history.clear()
+        history.add((0, id(self)))
+
+        try:
+            while sts:
+                steps += 1
+                if steps >= limit:
+                    limit = budget.check(steps)
+                logging.debug(sts)
+                cur, node = sts.popleft()
+                if trace is not None:
+                    trace.visit(node)
+
+                # Accept state: no outgoing edges and consumed entire input
+                if not node.outs and cur == len(s):
+                    return True
+
+                # Explore all outgoing edges
+                for e, next_node in node.outs:
+                    # Try to match the edge
+                    new_cur: Optional[int] = e.match(s, cur)
+                    if trace is not None:
+                        trace.edge(e, new_cur is not None)
+                    if new_cur is None:
+                        continue
+
+                    # Check if we've seen this state before
+                    state_key = (new_cur, id(next_node))
+                    if state_key in history:
+                        continue
+
+                    # Add new state to queue
+                    history.add(state_key)
+                    sts.append((new_cur, next_node))
+                if trace is not None:
+                    trace.queued(len(sts))
+
+            return False
+        finally:
+            if budget is not None:
+                budget.steps = steps
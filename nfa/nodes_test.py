@@ -1,3 +1,5 @@
+import mmap
+import tempfile
 import unittest
 
 from .nodes import Node
@@ -18,6 +20,10 @@ class TestNode(unittest.TestCase):
         self.assertEqual(node.name, 'start')
         self.assertEqual(node.outs, [])
 
+    def test_no_instance_dict(self):
+        """Test nodes are slotted, without a per-instance __dict__"""
+        self.assertFalse(hasattr(Node(), '__dict__'))
+
     def test_repr_without_name(self):
         """Test __repr__ without name returns id"""
         node = Node()
@@ -549,3 +555,48 @@ class TestMatchEdgeCases(unittest.TestCase):
         self.assertTrue(start.match('c'))
         self.assertFalse(start.match('a'))
         self.assertFalse(start.match('b'))
+
+
+class TestMatchBytes(unittest.TestCase):
+    """Test matching bytes-like input in place"""
+
+    def setUp(self):
+        self.end = Node('end')
+        self.start = Node('start')
+        mid = Node('mid')
+        self.start.outs.append((Char('a'), mid))
+        mid.outs.append((Charset(set('0123456789'), True), mid))
+        mid.outs.append((Empty(), self.end))
+
+    def test_bytes(self):
+        """Test bytes and bytearray input"""
+        self.assertTrue(self.start.match(b'a123'))
+        self.assertTrue(self.start.match(bytearray(b'a1')))
+        self.assertFalse(self.start.match(b'b123'))
+
+    def test_memoryview(self):
+        """Test memoryview input"""
+        self.assertTrue(self.start.match(memoryview(b'xa12')[1:]))
+
+    def test_mmap(self):
+        """Test mmap input"""
+        with tempfile.TemporaryFile() as f:
+            f.write(b'a42')
+            f.flush()
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                self.assertTrue(self.start.match(mm))
+
+
+class TestWalk(unittest.TestCase):
+    """Test graph traversal"""
+
+    def test_walk_cycle(self):
+        """Test each reachable node is yielded once, breadth first"""
+        n1 = Node('n1')
+        n2 = Node('n2')
+        n3 = Node('n3')
+        n1.outs.append((Char('a'), n2))
+        n1.outs.append((Char('b'), n3))
+        n2.outs.append((Empty(), n1))
+        n3.outs.append((Empty(), n2))
+        self.assertEqual(list(n1.walk()), [n1, n2, n3])
@@ -0,0 +1,111 @@
+"""
+Aho-Corasick prefilter over the required literals of many patterns.
+"""
+import mmap
+from typing import Dict, List, Set, Union
+
+from .edges import Input, as_input
+from .literals import required_factor
+from .nodes import Node
+
+
+class AhoCorasick(object):
+    """
+    Multi-string search automaton.
+
+    States are trie nodes numbered from 0 (the root), with goto maps,
+    failure links and the set of word indexes recognised in each state.
+    Transitions are keyed by both a char and its byte value, so str and
+    bytes-like input can be scanned alike.
+    """
+
+    def __init__(self, words: List[str]) -> None:
+        self.words: List[str] = words
+        self.goto: List[Dict[Union[str, int], int]] = [{}]
+        self.fail: List[int] = [0]
+        self.out: List[Set[int]] = [set()]
+        for n, word in enumerate(words):
+            self.add(n, word)
+        self.link()
+
+    def __repr__(self) -> str:
+        return f'<aho-corasick {len(self.words)} words, {len(self.goto)} states>'
+
+    def add(self, n: int, word: str) -> None:
+        """Insert word number n into the trie."""
+        st = 0
+        for c in word:
+            nxt = self.goto[st].get(c)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto.append({})
+                self.fail.append(0)
+                self.out.append(set())
+                self.goto[st][c] = nxt
+                if ord(c) < 256:
+                    self.goto[st][ord(c)] = nxt
+            st = nxt
+        self.out[st].add(n)
+
+    def link(self) -> None:
+        """Compute failure links breadth first, merging outputs along them."""
+        queue = list(set(self.goto[0].values()))
+        done = set(queue)
+        for st in queue:
+            for key, nxt in self.goto[st].items():
+                if nxt in done:
+                    continue
+                done.add(nxt)
+                f = self.fail[st]
+                while f and key not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[nxt] = self.goto[f].get(key, 0)
+                self.out[nxt] |= self.out[self.fail[nxt]]
+                queue.append(nxt)
+
+    def scan(self, s: Input) -> Set[int]:
+        """Return the indexes of all words occurring in s."""
+        if isinstance(s, mmap.mmap):
+            s = memoryview(s)
+        goto, fail, out = self.goto, self.fail, self.out
+        found: Set[int] = set()
+        st = 0
+        for x in as_input(s):
+            while st and x not in goto[st]:
+                st = fail[st]
+            st = goto[st].get(x, 0)
+            if out[st]:
+                found |= out[st]
+                if len(found) == len(self.words):
+                    break
+        return found
+
+
+class Prefilter(object):
+    """
+    Candidate selection for a set of patterns, as done by Hyperscan.
+
+    Each pattern's required literal factor is extracted from its graph;
+    one Aho-Corasick pass finds which factors occur in the input, and only
+    the patterns owning them need a full match. Patterns without a factor
+    of at least min_length chars are listed in unfiltered and must always
+    be run.
+    """
+
+    def __init__(self, graphs: List[Node], min_length: int = 1) -> None:
+        self.factors: List[str] = [required_factor(g) for g in graphs]
+        self.unfiltered: List[int] = [i for i, f in enumerate(self.factors) if len(f) < min_length]
+        words = sorted({f for f in self.factors if len(f) >= min_length})
+        index = {w: n for n, w in enumerate(words)}
+        self.owners: List[List[int]] = [[] for _ in words]
+        for i, f in enumerate(self.factors):
+            if f in index:
+                self.owners[index[f]].append(i)
+        self.ac: AhoCorasick = AhoCorasick(words)
+
+    def __repr__(self) -> str:
+        return f'<prefilter {len(self.ac.words)} factors, {len(self.unfiltered)} unfiltered>'
+
+    def candidates(self, s: Input) -> List[int]:
+        """Indexes of the filtered patterns whose factor occurs in s."""
+        return sorted(i for n in self.ac.scan(s) for i in self.owners[n])
@@ -0,0 +1,39 @@
+import unittest
+
+from .compile import compile
+from .prefilter import AhoCorasick, Prefilter
+
+
+class TestAhoCorasick(unittest.TestCase):
+    """Test multi-string search"""
+
+    def setUp(self):
+        self.ac = AhoCorasick(['he', 'she', 'his', 'hers'])
+
+    def test_scan(self):
+        """Test overlapping words are all found"""
+        self.assertEqual(self.ac.scan('ushers'), {0, 1, 3})
+        self.assertEqual(self.ac.scan('ahisx'), {2})
+        self.assertEqual(self.ac.scan('xyz'), set())
+
+    def test_bytes(self):
+        """Test scanning bytes and memoryview input"""
+        self.assertEqual(self.ac.scan(b'ushers'), {0, 1, 3})
+        self.assertEqual(self.ac.scan(memoryview(b'his')), {2})
+
+    def test_empty(self):
+        """Test an automaton without words"""
+        self.assertEqual(AhoCorasick([]).scan('abc'), set())
+
+
+class TestPrefilter(unittest.TestCase):
+    """Test candidate selection"""
+
+    def test_candidates(self):
+        """Test patterns sharing a factor are both candidates"""
+        pf = Prefilter([compile('error \\d+'), compile('a|b'), compile('.*error'), compile('warn')])
+        self.assertEqual(pf.factors, ['error ', '', 'error', 'warn'])
+        self.assertEqual(pf.unfiltered, [1])
+        self.assertEqual(pf.candidates('an error 1'), [0, 2])
+        self.assertEqual(pf.candidates('error'), [2])
+        self.assertEqual(pf.candidates('warning'), [3])
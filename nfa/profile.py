@@ -0,0 +1,93 @@
+"""
+Hit counts of NFA nodes and edges over a workload.
+"""
+from typing import Dict, Iterable, List, Optional, Tuple, TYPE_CHECKING
+
+from common.budget import Budget
+
+from .edges import Edge, Input
+from .stats import Trace
+
+if TYPE_CHECKING:
+    from .nodes import Node
+
+# An edge is the i-th out of its node; edge objects are shared between
+# the clones of a repetition, so they can't identify an edge themselves.
+EdgeKey = Tuple['Node', int]
+
+
+class Profile(Trace):
+    """
+    Profiling matcher bound to one compiled graph.
+
+    match() works like Node.match but counts, across all calls, how often
+    each node is visited and how often each edge is tried and taken. It
+    runs the graph's own loop with the profile as its Trace.
+    graph.graph2dot(profile) renders the counts as a heatmap.
+    """
+
+    def __init__(self, graph: 'Node') -> None:
+        self.graph: 'Node' = graph
+        self.calls: int = 0
+        self.visits: Dict['Node', int] = {}
+        self.tried: Dict[EdgeKey, int] = {}
+        self.taken: Dict[EdgeKey, int] = {}
+        # The node being expanded and the index of its next out
+        self.node: Optional['Node'] = None
+        self.out: int = 0
+
+    def __repr__(self) -> str:
+        return f'<profile of {self.calls} matches, {sum(self.visits.values())} visits>'
+
+    def match(self, s: Input, budget: Optional[Budget] = None) -> bool:
+        """Match s against the whole graph, adding to the counts."""
+        return self.graph.traced(s, budget, self)
+
+    def start(self) -> None:
+        self.calls += 1
+
+    def visit(self, node: 'Node') -> None:
+        self.visits[node] = self.visits.get(node, 0) + 1
+        self.node = node
+        self.out = 0
+
+    def edge(self, e: Edge, taken: bool) -> None:
+        key = (self.node, self.out)
+        self.out += 1
+        self.tried[key] = self.tried.get(key, 0) + 1
+        if taken:
+            self.taken[key] = self.taken.get(key, 0) + 1
+
+    def run(self, inputs: Iterable[Input]) -> int:
+        """Match every input, return how many matched."""
+        return sum(1 for s in inputs if self.match(s))
+
+    def hottest(self, n: int = 10) -> List[Tuple[EdgeKey, Edge, int, int]]:
+        """The n most tried edges as (key, edge, tried, taken)."""
+        keys = sorted(self.tried, key=self.tried.get, reverse=True)[:n]
+        return [(k, k[0].outs[k[1]][0], self.tried[k], self.taken.get(k, 0)) for k in keys]
+
+    def tops(self) -> Tuple[int, int]:
+        """Highest visit and try counts, which the heatmap colors are scaled to."""
+        return max(self.visits.values(), default=0), max(self.tried.values(), default=0)
+
+    def heat(self, count: int, top: int) -> str:
+        """Graphviz HSV color from blue (cold) to red (hot)."""
+        h = 0.666 * (1 - count / top) if top else 0.666
+        return f'{h:.3f} 1.000 1.000'
+
+    def node_attrs(self, node: 'Node', top: int) -> str:
+        """DOT attributes of node: its visit count, colored by hotness against top visits."""
+        count = self.visits.get(node, 0)
+        if not count:
+            return 'label="0", color="lightgray"'
+        return f'label="{count}", color="{self.heat(count, top)}"'
+
+    def edge_attrs(self, node: 'Node', i: int, top: int) -> str:
+        """DOT attributes of the i-th out of node: taken/tried counts, colored by tries against top."""
+        e = node.outs[i][0]
+        count = self.tried.get((node, i), 0)
+        label = f'{e} {self.taken.get((node, i), 0)}/{count}'
+        if not count:
+            return f'label="{label}", color="lightgray", fontcolor="gray"'
+        return f'label="{label}", color="{self.heat(count, top)}", penwidth={1 + 4 * count / top:.2f}'
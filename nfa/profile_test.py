@@ -0,0 +1,65 @@
+import unittest
+
+from common.budget import Budget
+
+from .compile import compile
+from .profile import Profile
+
+
+class TestProfile(unittest.TestCase):
+    """Test edge and node hit counts"""
+
+    def setUp(self):
+        self.graph = compile('(get|post)/x')
+        self.profile = Profile(self.graph)
+
+    def test_match(self):
+        """Test profiled match agrees with Node.match"""
+        for s in ['get/x', 'post/x', 'put/x', '']:
+            self.assertEqual(self.profile.match(s), self.graph.match(s), s)
+        self.assertEqual(self.profile.calls, 4)
+
+    def test_same_steps(self):
+        """Test profiled match runs the same loop as Node.match"""
+        plain, profiled = Budget(max_steps=1000), Budget(max_steps=1000)
+        for s in ['get/x', 'post/x', 'put/x']:
+            self.graph.match(s, plain)
+            self.profile.match(s, profiled)
+            self.assertEqual(profiled.steps, plain.steps, s)
+
+    def test_counts(self):
+        """Test head visits and tried/taken counts of its edges"""
+        self.assertEqual(self.profile.run(['get/x', 'post/x', 'put/y']), 2)
+        self.assertEqual(self.profile.visits[self.graph], 3)
+        tried = [self.profile.tried[(self.graph, i)] for i in range(len(self.graph.outs))]
+        taken = [self.profile.taken.get((self.graph, i), 0) for i in range(len(self.graph.outs))]
+        # the head forks into both branches with epsilon edges, always taken
+        self.assertEqual(tried, [3, 3])
+        self.assertEqual(taken, [3, 3])
+        get = self.graph.outs[0][1]
+        self.assertEqual(self.profile.tried[(get, 0)], 3)
+        self.assertEqual(self.profile.taken.get((get, 0), 0), 1)
+
+    def test_hottest(self):
+        """Test edges are ranked by tries"""
+        self.profile.run(['post/x'] * 3)
+        (key, edge, tried, taken), = self.profile.hottest(1)
+        self.assertEqual(tried, 3)
+        self.assertIs(key[0].outs[key[1]][0], edge)
+
+    def test_heatmap(self):
+        """Test DOT output carries counts and colors"""
+        self.profile.run(['get/x', 'post/x'])
+        dot = self.graph.graph2dot(self.profile)
+        self.assertIn('"begin" [label="2", color="0.000 1.000 1.000"];', dot)
+        self.assertIn('label="g 1/2"', dot)
+        self.assertIn('penwidth=', dot)
+
+    def test_cold_edges(self):
+        """Test never-tried edges are gray"""
+        self.profile.run(['x'])
+        self.assertIn('color="lightgray"', self.graph.graph2dot(self.profile))
+
+    def test_plain_dot_unchanged(self):
+        """Test graph2dot without a profile keeps plain labels"""
+        self.assertIn('"begin" [label=""];', self.graph.graph2dot())
@@ -0,0 +1,110 @@
+"""
+Match many patterns against the same input in a single pass.
+"""
+from typing import Dict, Iterable, List, Optional, Set, Union
+
+from .compile import compile
+from .dfa import DFA
+from .edges import Any, Empty, Input, as_input
+from .literals import has_assertions
+from .nodes import Node
+from .prefilter import Prefilter
+
+
+class RegexSet(object):
+    """
+    Union of many compiled patterns into a single automaton.
+
+    A new head node has an epsilon edge into every pattern's graph, and
+    each pattern's accept nodes are tagged with its index. One pass of the
+    lazy DFA over the input then tells which subset of patterns matched.
+    match() requires a pattern to match the whole input, like Node.match;
+    search() accepts a match anywhere, by looping the head over any char.
+
+    With prefilter set, patterns that have a required literal factor are
+    left out of the DFA. An Aho-Corasick pass over the input picks the ones
+    whose factor occurs, and only those are verified, each with its own
+    graph. Patterns without a factor still go through the DFA.
+
+    Patterns with assertions (^ $ \\b...) can't be run by the DFA; they
+    are matched one by one with their own graphs.
+    """
+
+    def __init__(self, patterns: Iterable[Union[str, bytes, Node]], max_states: int = 10000,
+                 prefilter: bool = False) -> None:
+        self.patterns: List[Union[str, bytes, Node]] = list(patterns)
+        self.graphs: List[Node] = [p if isinstance(p, Node) else compile(p) for p in self.patterns]
+        self.prefilter: Optional[Prefilter] = None
+        # Indexes of the patterns run through the DFA
+        self.ids: List[int] = list(range(len(self.graphs)))
+        if prefilter:
+            self.prefilter = Prefilter(self.graphs)
+            self.ids = self.prefilter.unfiltered
+        # Indexes of the patterns the DFA can't run, matched one by one
+        asserting = {i for i in self.ids if has_assertions(self.graphs[i])}
+        self.direct: List[int] = sorted(asserting)
+        self.ids = [i for i in self.ids if i not in asserting]
+        self.head: Node = Node('set')
+        tags: Dict[Node, Set[int]] = {}
+        for i in self.ids:
+            graph = self.graphs[i]
+            self.head.outs.append((Empty(), graph))
+            for node in graph.walk():
+                if not node.outs:
+                    tags.setdefault(node, set()).add(i)
+        # Unanchored entry: skip any prefix, then enter the set
+        self.loop: Node = Node('loop')
+        self.loop.outs.append((Any(), self.loop))
+        self.loop.outs.append((Empty(), self.head))
+        self.anchored: DFA = DFA(self.head, tags, max_states)
+        self.unanchored: DFA = DFA(self.loop, tags, max_states)
+
+    def __repr__(self) -> str:
+        return f'<regex set of {len(self.graphs)} patterns>'
+
+    def __len__(self) -> int:
+        return len(self.graphs)
+
+    def match(self, s: Input) -> Set[int]:
+        """Return indexes of the patterns matching the whole of s."""
+        s = as_input(s)
+        matched = self.match_dfa(s)
+        matched.update(i for i in self.direct if self.graphs[i].match(s))
+        if self.prefilter is not None:
+            matched.update(i for i in self.prefilter.candidates(s) if self.graphs[i].match(s))
+        return matched
+
+    def search(self, s: Input) -> Set[int]:
+        """Return indexes of the patterns matching somewhere in s."""
+        s = as_input(s)
+        matched = self.search_dfa(s)
+        matched.update(i for i in self.direct if self.graphs[i].search(s) is not None)
+        if self.prefilter is not None:
+            matched.update(i for i in self.prefilter.candidates(s) if self.graphs[i].search(s) is not None)
+        return matched
+
+    def match_dfa(self, s: Input) -> Set[int]:
+        """Run the anchored DFA over the whole of s."""
+        if not self.ids:
+            return set()
+        dfa = self.anchored
+        st = dfa.start
+        for i in range(len(s)):
+            st = dfa.step(st, s, i)
+            if not st.nodes:
+                return set()
+        return set(st.accepts)
+
+    def search_dfa(self, s: Input) -> Set[int]:
+        """Run the unanchored DFA until every DFA pattern matched or s ends."""
+        if not self.ids:
+            return set()
+        dfa = self.unanchored
+        st = dfa.start
+        matched = set(st.accepts)
+        for i in range(len(s)):
+            if len(matched) == len(self.ids):
+                break
+            st = dfa.step(st, s, i)
+            matched |= st.accepts
+        return matched
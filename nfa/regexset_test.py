@@ -0,0 +1,81 @@
+import unittest
+
+from .compile import compile
+from .regexset import RegexSet
+
+
+class TestRegexSet(unittest.TestCase):
+    """Test matching many patterns at once"""
+
+    def setUp(self):
+        self.rs = RegexSet(['ab*', '\\d+', 'x(a|b)y', '.*err.*'])
+
+    def test_match(self):
+        """Test whole-input match reports every matching pattern"""
+        self.assertEqual(self.rs.match('abbb'), {0})
+        self.assertEqual(self.rs.match('123'), {1})
+        self.assertEqual(self.rs.match('xby'), {2})
+        self.assertEqual(self.rs.match('an error'), {3})
+        self.assertEqual(self.rs.match('zzz'), set())
+
+    def test_match_several(self):
+        """Test several patterns matching the same input"""
+        rs = RegexSet(['a.*', '.*b', 'ab', 'ba'])
+        self.assertEqual(rs.match('ab'), {0, 1, 2})
+
+    def test_search(self):
+        """Test unanchored search reports patterns matching anywhere"""
+        self.assertEqual(self.rs.search('xx 12 xby ab'), {0, 1, 2})
+        self.assertEqual(self.rs.search('error'), {3})
+        self.assertEqual(self.rs.search('zzz'), set())
+
+    def test_search_bytes(self):
+        """Test searching bytes input"""
+        self.assertEqual(self.rs.search(b'x 42'), {1})
+
+    def test_agrees_with_nodes(self):
+        """Test set results agree with matching each pattern alone"""
+        patterns = ['a|b', 'a+', '[ab]{2}', 'a?b?', '(ab)*']
+        rs = RegexSet(patterns)
+        for s in ['', 'a', 'b', 'ab', 'aa', 'ba', 'abab', 'abc']:
+            expected = {i for i, p in enumerate(patterns) if compile(p).match(s)}
+            self.assertEqual(rs.match(s), expected, s)
+
+    def test_assertions(self):
+        """Test patterns with assertions are matched one by one"""
+        rs = RegexSet(['^ab', 'cd$', 'x', '\\bq\\b'])
+        self.assertEqual(rs.direct, [0, 1, 3])
+        self.assertEqual(rs.ids, [2])
+        self.assertEqual(rs.search('xab cd'), {1, 2})
+        self.assertEqual(rs.search('ab q cd'), {0, 1, 3})
+        self.assertEqual(rs.match('ab'), {0})
+
+    def test_compiled_graphs(self):
+        """Test passing compiled graphs"""
+        rs = RegexSet([compile('a'), compile('b')])
+        self.assertEqual(len(rs), 2)
+        self.assertEqual(rs.match('b'), {1})
+
+
+class TestRegexSetPrefilter(unittest.TestCase):
+    """Test the literal prefilter of pattern sets"""
+
+    patterns = ['ab*', '\\d+', 'x(a|b)y', '.*err.*', 'GET /[a-z]+', 'a|b']
+
+    def setUp(self):
+        self.plain = RegexSet(self.patterns)
+        self.rs = RegexSet(self.patterns, prefilter=True)
+
+    def test_unfiltered(self):
+        """Test only patterns without a literal factor run through the DFA"""
+        self.assertEqual(self.rs.ids, [1, 5])
+
+    def test_agrees_with_dfa(self):
+        """Test prefiltered results equal the plain set"""
+        for s in ['abbb', '123', 'xby', 'an error', 'GET /index', 'b', '', 'zzz', 'x 12 xay GET /x err']:
+            self.assertEqual(self.rs.match(s), self.plain.match(s), s)
+            self.assertEqual(self.rs.search(s), self.plain.search(s), s)
+
+    def test_search_bytes(self):
+        """Test prefiltered search on bytes"""
+        self.assertEqual(self.rs.search(b'GET /home'), {4})
@@ -0,0 +1,378 @@
+"""
+Incremental NFA search over input that arrives in chunks.
+"""
+from typing import Dict, Iterator, List, Optional, Set, Tuple, Union, TYPE_CHECKING
+
+from common.budget import Budget
+from common.lines import LineIndex
+
+from .edges import NEWLINE, Input, as_input
+from .literals import anchored_start, end_window, first_chars, has_assertions, literal_after, needles_after
+
+if TYPE_CHECKING:
+    from .nodes import Node
+
+# (start, end) absolute offsets of a match
+Span = Tuple[int, int]
+
+# Up to this many strings that every match starts with one of are searched for with find()
+FIND_NEEDLES = 8
+
+
+class Plan(object):
+    """
+    What a Scanner works out about a graph before scanning: the literal
+    prefix, first chars and find() needles of a match, and where its
+    assertions pin it. Built once per graph by plan() and kept on the head
+    node, so the edges of a graph must not change once it has been searched.
+    """
+    __slots__ = ('prefix', 'bprefix', 'firsts', 'needles', 'bneedles', 'asserts',
+                 'anchor_start', 'window', 'anchor_lines', 'line_window')
+
+    def __init__(self, graph: 'Node') -> None:
+        self.prefix: str = literal_after(graph)
+        # The prefix for bytes-like input, None if it can't occur there
+        self.bprefix: Optional[bytes] = None
+        if all(ord(c) < 256 for c in self.prefix):
+            self.bprefix = self.prefix.encode('latin-1')
+        self.firsts: Optional[Set[Union[str, int]]] = first_chars(graph)
+        # find() needles for str and bytes-like input, when there is no prefix
+        self.needles: Optional[List[str]] = None
+        self.bneedles: Optional[List[bytes]] = None
+        if not self.prefix and self.firsts is not None:
+            firsts = sorted(c for c in self.firsts if isinstance(c, str))
+            self.needles = needles_after(graph, FIND_NEEDLES)
+            if self.needles is None and len(firsts) <= FIND_NEEDLES:
+                self.needles = firsts
+        if self.needles is not None:
+            # Needles with chars past latin-1 can't occur in bytes
+            self.bneedles = [n.encode('latin-1') for n in self.needles if max(map(ord, n)) < 256]
+        # Whether closure() has assertions to check, and where they pin matches
+        self.asserts: bool = has_assertions(graph)
+        self.anchor_start: bool = self.asserts and anchored_start(graph)
+        self.window: Optional[int] = end_window(graph) if self.asserts else None
+        self.anchor_lines: bool = self.asserts and not self.anchor_start and anchored_start(graph, True)
+        self.line_window: Optional[int] = None
+        if self.asserts and self.window is None:
+            self.line_window = end_window(graph, True)
+
+    def __repr__(self) -> str:
+        return f'<plan prefix={self.prefix!r} needles={self.needles} asserts={self.asserts}>'
+
+
+def plan(graph: 'Node') -> Plan:
+    """The Plan of graph, built on first use and cached on its head node."""
+    if graph.plan is None:
+        graph.plan = Plan(graph)
+    return graph.plan
+
+
+class Scanner(object):
+    """
+    Streaming leftmost-longest search over an NFA graph.
+
+    All NFA threads advance in lockstep, one character at a time, so the
+    automaton state carries over from one chunk to the next. Each thread
+    remembers where its match started, and when two threads reach the same
+    node the earlier start wins. A match is reported once no live thread
+    could still produce an earlier or a longer one; scanning then resumes
+    at its end. Between chunks only the text from that resume point on is
+    kept, so memory stays bounded by the longest pending match.
+
+    Greedy and non-greedy quantifiers behave the same here, as in POSIX.
+
+    Chunks may be str or bytes-like, but not mixed. finditer() scans a
+    bytes-like object such as an mmap in place, without copying it.
+
+    While no thread is alive, the scanner jumps straight to the next place
+    a match can start: with find() if every match begins with a literal
+    prefix or one of a few first chars, else by testing chars against the
+    set of possible first chars. A pattern anchored with ^ or \\A is only
+    tried at offset 0. On the final chunk, one anchored with $ or \\Z and
+    of bounded length is only tried that many chars from the end.
+
+    Assertions look at the chars around the position; the char before
+    the buffer is kept when older text is dropped. A pattern anchored
+    with a MULTILINE ^ is only tried at line starts, one anchored with a
+    MULTILINE $ and bounded only that close to a line end. finditer()
+    can take a LineIndex of the text to find those without find().
+
+    finditer() can also take a Budget: every live thread costs one step
+    at each position, and MatchTimeout is raised once the scan runs out.
+
+    The analysis behind the skipping is the graph's Plan, shared by every
+    Scanner of the graph. To search many short inputs, reuse one Scanner
+    and reset() it before each.
+    """
+
+    def __init__(self, graph: 'Node') -> None:
+        self.graph: 'Node' = graph
+        p = plan(graph)
+        self.prefix: str = p.prefix
+        self.bprefix: Optional[bytes] = p.bprefix
+        self.firsts: Optional[Set[Union[str, int]]] = p.firsts
+        self.needles: Optional[List[str]] = p.needles
+        self.bneedles: Optional[List[bytes]] = p.bneedles
+        self.asserts: bool = p.asserts
+        self.anchor_start: bool = p.anchor_start
+        self.window: Optional[int] = p.window
+        self.anchor_lines: bool = p.anchor_lines
+        self.line_window: Optional[int] = p.line_window
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget all input and state, ready to scan a new stream."""
+        # Unconsumed text, buf[0] is at absolute offset base
+        self.buf: Input = ''
+        self.base: int = 0
+        # The char before buf[0], None at the start of the text
+        self.prev: Optional[Union[str, int]] = None
+        # Line starts of the text finditer() scans, if given
+        self.lines: Optional[LineIndex] = None
+        # Absolute offset of the next character to step over
+        self.pos: int = 0
+        # Live threads: node -> earliest start offset
+        self.states: Dict['Node', int] = {}
+        # Best match found so far that may still be improved
+        self.best: Optional[Span] = None
+        self.finished: bool = False
+        # Needle -> absolute offset its last find() stopped at
+        self.nexts: Dict[Union[str, bytes], int] = {}
+        # Budget of the finditer() scan, steps taken and next checkpoint
+        self.budget: Optional[Budget] = None
+        self.steps: int = 0
+        self.limit: float = float('inf')
+
+    def __repr__(self) -> str:
+        return f'<scanner at {self.pos}, {len(self.states)} threads>'
+
+    def feed(self, chunk: Input) -> List[Span]:
+        """Consume next chunk, return matches that are now final."""
+        if self.finished:
+            raise Exception('scanner already finished')
+        if not isinstance(chunk, (str, bytes)):
+            chunk = bytes(chunk)
+        self.buf = self.buf + chunk if self.buf else chunk
+        r = list(self.run(False))
+        self.trim()
+        return r
+
+    def finish(self) -> List[Span]:
+        """Signal end of input, return the remaining matches."""
+        if self.finished:
+            return []
+        r = list(self.run(True))
+        self.finished = True
+        self.buf = self.buf[:0]
+        return r
+
+    def finditer(self, s: Input, lines: Optional[LineIndex] = None,
+                 budget: Optional[Budget] = None) -> Iterator[Span]:
+        """
+        Lazily scan a complete string as a single final chunk, with its
+        LineIndex if built, and within budget if given.
+        """
+        if self.buf:
+            raise Exception('scanner already fed')
+        self.buf = as_input(s)
+        if lines is not None:
+            lines.check(self.buf)
+            self.lines = lines
+        self.finished = True
+        if budget is None:
+            return self.run(True)
+        return self.budgeted(budget)
+
+    def budgeted(self, budget: Budget) -> Iterator[Span]:
+        """run() for finditer() under budget, keeping budget.steps up to date for every match."""
+        self.budget = budget
+        self.limit = budget.start()
+        try:
+            for span in self.run(True):
+                budget.steps = self.steps
+                yield span
+        finally:
+            budget.steps = self.steps
+
+    def trim(self) -> None:
+        """Drop text that no future match or resume point can need."""
+        keep = self.pos if self.best is None else self.best[1]
+        if keep > self.base:
+            self.prev = self.buf[keep-self.base-1]
+            self.buf = self.buf[keep-self.base:]
+            self.base = keep
+
+    def run(self, eof: bool) -> Iterator[Span]:
+        """Advance over the buffered text, yielding matches as they become final."""
+        while True:
+            if self.best is not None and not self.states:
+                yield self.emit()
+                continue
+            i = self.pos - self.base
+            if self.best is None and not self.states and i < len(self.buf):
+                i = self.skip(i, eof)
+            if i > len(self.buf) or (i == len(self.buf) and not eof):
+                return
+            if self.best is None and self.graph not in self.states:
+                self.states[self.graph] = self.pos
+            self.closure(i)
+            self.steps += len(self.states)
+            if self.steps >= self.limit:
+                self.limit = self.budget.check(self.steps)
+            self.accept()
+            if i == len(self.buf):
+                # End of input, no thread can go any further
+                self.states = {}
+                if self.best is None:
+                    return
+                continue
+            self.states = self.step(i)
+            self.pos += 1
+
+    def skip(self, i: int, eof: bool) -> int:
+        """With no live thread, move to the next offset in buf a match can start at."""
+        buf = self.buf
+        if self.asserts:
+            i = self.skip_anchored(i, eof)
+            self.pos = self.base + i
+            if i >= len(buf):
+                return i
+        find = getattr(buf, 'find', None)
+        if self.prefix and find is not None:
+            prefix = self.prefix if isinstance(buf, str) else self.bprefix
+            j = find(prefix, i) if prefix is not None else -1
+            if j < 0:
+                # Keep a tail that may be the start of a split prefix
+                j = len(buf) if eof else max(i, len(buf)-len(self.prefix)+1)
+        elif self.needles is not None and find is not None:
+            j = self.find_needles(i, eof)
+        elif self.firsts is not None:
+            firsts = self.firsts
+            j = i
+            while j < len(buf) and buf[j] not in firsts:
+                j += 1
+        else:
+            return i
+        self.pos = self.base + j
+        return j
+
+    def skip_anchored(self, i: int, eof: bool) -> int:
+        """First offset in buf at or after i that the anchors of the pattern allow a match at."""
+        buf = self.buf
+        if self.anchor_start and self.base + i > 0:
+            # Past the start of the text, nothing can match anymore
+            return len(buf)
+        if eof and self.window is not None:
+            i = max(i, len(buf) - self.window)
+        if self.anchor_lines:
+            i = self.next_line(i)
+        if self.line_window is not None:
+            i = self.near_line_end(i)
+        return i
+
+    def newline(self, i: int) -> int:
+        """Offset in buf of the first newline at or after i, -1 if none."""
+        buf = self.buf
+        if self.lines is not None:
+            j = self.lines.line_end(self.base + i) - self.base
+            return j if j < len(buf) else -1
+        if isinstance(buf, str):
+            return buf.find('\n', i)
+        find = getattr(buf, 'find', None)
+        if find is not None:
+            return find(b'\n', i)
+        while i < len(buf) and buf[i] != 10:
+            i += 1
+        return i if i < len(buf) else -1
+
+    def next_line(self, i: int) -> int:
+        """Offset in buf of the first line start at or after i, len(buf) if none yet."""
+        prev = self.buf[i-1] if i > 0 else self.prev
+        if prev is None or prev in NEWLINE:
+            return i
+        j = self.newline(i)
+        return len(self.buf) if j < 0 else j+1
+
+    def near_line_end(self, i: int) -> int:
+        """Offset in buf of the first position at or after i within line_window of a line end."""
+        j = self.newline(i)
+        if j < 0:
+            # The line ends at the end of the text, or somewhere past the buffer
+            j = len(self.buf)
+        return max(i, j - self.line_window)
+
+    def find_needles(self, i: int, eof: bool) -> int:
+        """
+        skip() for a few needles, with find() on each.
+
+        Offsets only grow, so each needle's search resumes where the last
+        one stopped: at its previous hit, or where a needle split across
+        chunks could begin if it wasn't found.
+        """
+        buf, base = self.buf, self.base
+        needles = self.needles if isinstance(buf, str) else self.bneedles
+        j = len(buf)
+        for c in needles:
+            k = buf.find(c, max(i, self.nexts.get(c, 0) - base))
+            if k < 0:
+                k = len(buf) if eof else max(i, len(buf)-len(c)+1)
+            self.nexts[c] = base + k
+            j = min(j, k)
+        return j
+
+    def around(self, i: int) -> Tuple[Optional[Union[str, int]], Optional[Union[str, int]]]:
+        """The chars before and at buf[i], None past either end of the text."""
+        buf = self.buf
+        prev = buf[i-1] if i > 0 else self.prev
+        return prev, buf[i] if i < len(buf) else None
+
+    def closure(self, i: int) -> None:
+        """Follow zero-width edges at buf[i], keeping the earliest start per node."""
+        states = self.states
+        stack = list(states)
+        around = self.around(i) if self.asserts else None
+        while stack:
+            node = stack.pop()
+            start = states[node]
+            for e, next_node in node.outs:
+                if e.width or (around is not None and not e.holds(*around)):
+                    continue
+                if states.get(next_node, start+1) > start:
+                    states[next_node] = start
+                    stack.append(next_node)
+
+    def accept(self) -> None:
+        """Record accepting threads, drop threads that can't win anymore."""
+        best = self.best
+        for node, start in self.states.items():
+            if node.outs:
+                continue
+            if best is None or start < best[0] or (start == best[0] and self.pos > best[1]):
+                best = (start, self.pos)
+        if best is not None and best is not self.best:
+            self.best = best
+            self.states = {n: st for n, st in self.states.items() if st <= best[0]}
+
+    def step(self, i: int) -> Dict['Node', int]:
+        """Step every thread over buf[i]."""
+        buf = self.buf
+        nxt: Dict['Node', int] = {}
+        for node, start in self.states.items():
+            for e, next_node in node.outs:
+                if not e.width or e.match(buf, i) is None:
+                    continue
+                if nxt.get(next_node, start+1) > start:
+                    nxt[next_node] = start
+        return nxt
+
+    def emit(self) -> Span:
+        """
+        Hand out the best match and resume scanning at its end, or one char
+        on after an empty match. That drops no match, unlike it would in a
+        backtracker such as re: the match is the longest from its start, so
+        after an empty one no other match starts at the same place.
+        """
+        start, end = self.best
+        self.best = None
+        self.pos = end if end > start else end+1
+        return start, end
@@ -0,0 +1,255 @@
+import mmap
+import tempfile
+import unittest
+
+from common.flags import IGNORECASE, MULTILINE
+from common.lines import LineIndex
+
+from .compile import compile
+from .scanner import Scanner, plan
+
+
+def feed_all(scanner, chunks):
+    """Feed chunks one by one and collect every reported match"""
+    r = []
+    for chunk in chunks:
+        r += scanner.feed(chunk)
+    return r + scanner.finish()
+
+
+class TestFinditer(unittest.TestCase):
+    """Test scanning a complete string"""
+
+    def test_literal(self):
+        """Test literal matches are found anywhere"""
+        self.assertEqual(list(compile('ab').finditer('xabyab')), [(1, 3), (4, 6)])
+
+    def test_no_match(self):
+        """Test no matches yields nothing"""
+        self.assertEqual(list(compile('ab').finditer('xxxx')), [])
+
+    def test_longest(self):
+        """Test the longest alternative wins at the same start"""
+        self.assertEqual(list(compile('a|ab').finditer('xabab')), [(1, 3), (3, 5)])
+
+    def test_leftmost(self):
+        """Test an earlier start wins over an earlier end"""
+        self.assertEqual(list(compile('abcd|bc').finditer('abcd')), [(0, 4)])
+        self.assertEqual(list(compile('abcd|b').finditer('abce')), [(1, 2)])
+
+    def test_trailing_quantifier(self):
+        """Test trailing quantifier is matched greedily"""
+        self.assertEqual(list(compile('ab*').finditer('xabbbyab')), [(1, 5), (6, 8)])
+
+    def test_empty_matches(self):
+        """Test empty matches advance by one character"""
+        self.assertEqual(list(compile('x*').finditer('axxb')),
+                         [(0, 0), (1, 3), (3, 3), (4, 4)])
+
+    def test_no_match_lost_after_empty(self):
+        """Test a match is the longest from its start, so none is lost past an empty one"""
+        # re also gives (0, 0) first, then (0, 1) when its lazy b*? tries more
+        self.assertEqual(list(compile('b*?').finditer('b xaa')),
+                         [(0, 1), (1, 1), (2, 2), (3, 3), (4, 4), (5, 5)])
+        self.assertEqual(list(compile('b?').finditer('xb')), [(0, 0), (1, 2), (2, 2)])
+
+    def test_search(self):
+        """Test Node.search returns only the first match"""
+        self.assertEqual(compile('\\d+').search('a12b3'), (1, 3))
+        self.assertIsNone(compile('\\d+').search('abc'))
+
+
+class TestStreaming(unittest.TestCase):
+    """Test feeding input in chunks"""
+
+    def test_match_across_chunks(self):
+        """Test a match split over several chunks"""
+        scanner = Scanner(compile('abc'))
+        self.assertEqual(feed_all(scanner, ['xa', 'b', 'cx', 'ab', 'c']), [(1, 4), (5, 8)])
+
+    def test_single_chars(self):
+        """Test feeding one character at a time"""
+        scanner = Scanner(compile('abcd|b'))
+        self.assertEqual(feed_all(scanner, 'xxabcdabce'), [(2, 6), (7, 8)])
+
+    def test_reported_when_final(self):
+        """Test matches are reported as soon as they can't grow"""
+        scanner = Scanner(compile('ab+'))
+        self.assertEqual(scanner.feed('xabb'), [])
+        self.assertEqual(scanner.feed('bx'), [(1, 5)])
+        self.assertEqual(scanner.finish(), [])
+
+    def test_match_at_end(self):
+        """Test a match running to the end of input needs finish()"""
+        scanner = Scanner(compile('ab+'))
+        self.assertEqual(scanner.feed('xabb'), [])
+        self.assertEqual(scanner.finish(), [(1, 4)])
+
+    def test_keeps_minimal_tail(self):
+        """Test only the text needed to resume is buffered"""
+        scanner = Scanner(compile('abc'))
+        scanner.feed('x' * 1000)
+        self.assertEqual((scanner.buf, scanner.base), ('', 1000))
+        scanner.feed('xxab')
+        self.assertEqual(scanner.buf, '')
+        self.assertEqual(len(scanner.states), 1)
+        self.assertEqual(scanner.feed('c'), [])
+        self.assertEqual(scanner.finish(), [(1002, 1005)])
+
+    def test_keeps_text_for_resume(self):
+        """Test text after a pending match is kept for rescanning"""
+        scanner = Scanner(compile('abcd|b'))
+        self.assertEqual(scanner.feed('abc'), [])
+        self.assertEqual((scanner.buf, scanner.base), ('c', 2))
+        self.assertEqual(scanner.feed('e'), [(1, 2)])
+
+    def test_feed_after_finish(self):
+        """Test feeding a finished scanner raises"""
+        scanner = Scanner(compile('a'))
+        scanner.finish()
+        with self.assertRaises(Exception):
+            scanner.feed('a')
+
+
+class TestBytes(unittest.TestCase):
+    """Test scanning bytes-like input"""
+
+    def test_feed_bytes(self):
+        """Test feeding bytes chunks"""
+        scanner = Scanner(compile('ab'))
+        self.assertEqual(feed_all(scanner, [b'xa', bytearray(b'bxa'), memoryview(b'b')]),
+                         [(1, 3), (4, 6)])
+
+    def test_bytes_pattern(self):
+        """Test a bytes pattern with non-ASCII bytes"""
+        self.assertEqual(list(compile(b'\xff+').finditer(b'a\xff\xffb')), [(1, 3)])
+
+    def test_mmap_in_place(self):
+        """Test scanning an mmap without reading it into memory"""
+        with tempfile.TemporaryFile() as f:
+            f.write(b'log: error 42\nlog: ok\nlog: error 7\n')
+            f.flush()
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                self.assertEqual(list(compile('error \\d+').finditer(mm)), [(5, 13), (27, 34)])
+
+
+class TestAssertions(unittest.TestCase):
+    """Test assertions see the text around the position"""
+
+    def test_word_boundary(self):
+        """Test \\b against str and bytes"""
+        self.assertEqual(list(compile('\\bcat\\b').finditer('cat concat cats cat')), [(0, 3), (16, 19)])
+        self.assertEqual(list(compile('\\bcat\\b').finditer(b'a cat')), [(2, 5)])
+        self.assertEqual(list(compile('\\B.').finditer('ab cd')), [(1, 2), (4, 5)])
+
+    def test_empty_matches(self):
+        """Test assertions matching empty text"""
+        self.assertEqual(list(compile('\\b').finditer('ab cd')), [(0, 0), (2, 2), (3, 3), (5, 5)])
+        self.assertEqual(list(compile('$').finditer('ab')), [(2, 2)])
+
+    def test_across_chunks(self):
+        """Test the char before a chunk is kept for \\b"""
+        scanner = Scanner(compile('\\bcat\\b'))
+        self.assertEqual(feed_all(scanner, ['xx c', 'at con', 'cat', ' cat', 's cat']), [(3, 6), (19, 22)])
+
+    def test_end_needs_final_chunk(self):
+        """Test $ only holds once the input is finished"""
+        scanner = Scanner(compile('b$'))
+        self.assertEqual(scanner.feed('ab'), [])
+        self.assertEqual(scanner.feed('b'), [])
+        self.assertEqual(scanner.finish(), [(2, 3)])
+
+
+class TestSkip(unittest.TestCase):
+    """Test jumping to candidate starts while no thread is alive"""
+
+    def test_prefix(self):
+        """Test literal prefix is found with find()"""
+        scanner = Scanner(compile('err\\d'))
+        self.assertEqual(scanner.prefix, 'err')
+        self.assertEqual(list(scanner.finditer('x' * 50 + 'err1 err err2')), [(50, 54), (59, 63)])
+
+    def test_prefix_across_chunks(self):
+        """Test a prefix split between chunks is still found"""
+        scanner = Scanner(compile('error'))
+        self.assertEqual(feed_all(scanner, ['xxxxer', 'ror xxe', 'rr', 'or']), [(4, 9), (12, 17)])
+
+    def test_first_chars(self):
+        """Test first-char set skipping"""
+        scanner = Scanner(compile('[ab]c'))
+        self.assertEqual(scanner.prefix, '')
+        self.assertEqual(list(scanner.finditer('xxacxxbcx')), [(2, 4), (6, 8)])
+        self.assertEqual(list(Scanner(compile('[ab]c')).finditer(b'xxbc')), [(2, 4)])
+
+    def test_needles(self):
+        """Test a case-folded prefix is found with find() on its spellings"""
+        scanner = Scanner(compile('error', flags=IGNORECASE))
+        self.assertEqual(len(scanner.needles), 8)
+        self.assertEqual(list(scanner.finditer('x Error eRRor erx')), [(2, 7), (8, 13)])
+        self.assertEqual(list(compile('error', flags=IGNORECASE).finditer(b'ERROR')), [(0, 5)])
+
+    def test_needles_across_chunks(self):
+        """Test a needle split between chunks is still found"""
+        scanner = Scanner(compile('error', flags=IGNORECASE))
+        self.assertEqual(feed_all(scanner, ['xxxxEr', 'ror xxe', 'r', 'R', 'OR']), [(4, 9), (12, 17)])
+
+    def test_plan_cached(self):
+        """Test the analysis is built once per graph and shared by its scanners"""
+        graph = compile('(get|post)/\\d+')
+        self.assertIsNone(graph.plan)
+        Scanner(graph)
+        p = graph.plan
+        self.assertIs(plan(graph), p)
+        self.assertEqual(graph.search('post/12'), (0, 7))
+        self.assertIs(graph.plan, p)
+        self.assertEqual(p.needles, ['g', 'p'])
+        self.assertEqual(p.bneedles, [b'g', b'p'])
+
+    def test_anchored_start(self):
+        """Test a ^ pattern is not tried past offset 0"""
+        scanner = Scanner(compile('^ab'))
+        self.assertTrue(scanner.anchor_start)
+        self.assertEqual(list(scanner.finditer('abab')), [(0, 2)])
+        scanner = Scanner(compile('^ab'))
+        self.assertEqual(feed_all(scanner, ['xab', 'ab']), [])
+        self.assertEqual(scanner.base, 5)
+
+    def test_end_window(self):
+        """Test a bounded $ pattern is only tried near the end"""
+        scanner = Scanner(compile('a{1,2}$'))
+        self.assertEqual(scanner.window, 2)
+        self.assertEqual(list(scanner.finditer('aaaaa')), [(3, 5)])
+        self.assertEqual(feed_all(Scanner(compile('ab$')), ['abab', 'ab']), [(4, 6)])
+
+    def test_line_anchors(self):
+        """Test MULTILINE patterns jump from line to line, with or without an index"""
+        text = 'a 1\nb 22\n333\n'
+        scanner = Scanner(compile('^\\w', flags=MULTILINE))
+        self.assertEqual((scanner.anchor_start, scanner.anchor_lines), (False, True))
+        self.assertEqual(list(scanner.finditer(text)), [(0, 1), (4, 5), (9, 10)])
+        self.assertEqual(list(compile('^\\w', flags=MULTILINE).finditer(text, LineIndex(text))), [(0, 1), (4, 5), (9, 10)])
+        scanner = Scanner(compile('\\d{1,2}$', flags=MULTILINE))
+        self.assertEqual(scanner.line_window, 2)
+        self.assertEqual(list(scanner.finditer(text.encode())), [(2, 3), (6, 8), (10, 12)])
+        self.assertEqual(list(compile('\\d{1,2}$', flags=MULTILINE).finditer(text, LineIndex(text))),
+                         [(2, 3), (6, 8), (10, 12)])
+
+    def test_line_anchors_across_chunks(self):
+        """Test line starts and ends split between chunks"""
+        scanner = Scanner(compile('^ab$', flags=MULTILINE))
+        self.assertEqual(feed_all(scanner, ['xab\n', 'a', 'b\nab', 'x\nab']), [(4, 6), (11, 13)])
+
+    def test_wrong_index(self):
+        """Test an index built for other text is refused"""
+        with self.assertRaises(Exception):
+            list(compile('^a', flags=MULTILINE).finditer('a\na', LineIndex('a')))
+
+    def test_no_skip(self):
+        """Test patterns that may match empty text are not skipped"""
+        scanner = Scanner(compile('a*'))
+        self.assertIsNone(scanner.firsts)
+        self.assertEqual(list(scanner.finditer('ba')), [(0, 0), (1, 2), (2, 2)])
+
+    def test_non_latin1_prefix(self):
+        """Test a prefix that can't occur in bytes"""
+        self.assertEqual(list(compile('中').finditer(b'abc')), [])
@@ -0,0 +1,83 @@
+"""
+Execution counters for a single NFA match.
+"""
+from typing import Dict, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .edges import Edge
+    from .nodes import Node
+
+
+class Trace(object):
+    """
+    Observer of Node.traced(), for counting the work of a match.
+
+    start() is called before the first state, visit() for each state
+    popped from the queue, then edge() for each of its outs in order,
+    whether the edge matched or not, and queued() with the queue length
+    once they're expanded. done() gets the number of distinct states seen,
+    even when the match raises. The base class ignores everything.
+    """
+    __slots__ = ()
+
+    def start(self) -> None:
+        pass
+
+    def visit(self, node: 'Node') -> None:
+        pass
+
+    def edge(self, e: 'Edge', taken: bool) -> None:
+        pass
+
+    def queued(self, n: int) -> None:
+        pass
+
+    def done(self, history: int) -> None:
+        pass
+
+
+class MatchStats(Trace):
+    """
+    What one Node.match did, filled in when passed as stats.
+
+    states counts (position, node) states popped from the queue, edges the
+    edges tried on them, epsilon the zero-width edges followed. peak_queue
+    is the longest the work queue got and history the number of distinct
+    states seen. Counters are reset at the start of every match.
+    """
+    __slots__ = ('states', 'edges', 'epsilon', 'peak_queue', 'history')
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def __repr__(self) -> str:
+        return '<match stats ' + ', '.join(f'{k}={v}' for k, v in self.as_dict().items()) + '>'
+
+    def reset(self) -> None:
+        self.states: int = 0
+        self.edges: int = 0
+        self.epsilon: int = 0
+        self.peak_queue: int = 0
+        self.history: int = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return {k: getattr(self, k) for k in self.__slots__}
+
+    def start(self) -> None:
+        self.reset()
+        self.peak_queue = 1
+
+    def visit(self, node: 'Node') -> None:
+        self.states += 1
+
+    def edge(self, e: 'Edge', taken: bool) -> None:
+        self.edges += 1
+        if taken and not e.width:
+            self.epsilon += 1
+
+    def queued(self, n: int) -> None:
+        if n > self.peak_queue:
+            self.peak_queue = n
+
+    def done(self, history: int) -> None:
+        self.history = history
@@ -0,0 +1,59 @@
+import unittest
+
+from common.budget import Budget, MatchTimeout
+
+from .compile import compile
+from .stats import MatchStats, Trace
+
+
+class TestMatchStats(unittest.TestCase):
+    """Test counters of an instrumented match"""
+
+    def test_literal(self):
+        """Test a literal visits one state per char plus the accept path"""
+        stats = MatchStats()
+        self.assertTrue(compile('abc').match('abc', stats=stats))
+        self.assertEqual(stats.as_dict(), {'states': 5, 'edges': 4, 'epsilon': 1,
+                                           'peak_queue': 1, 'history': 5})
+
+    def test_agrees_with_plain_match(self):
+        """Test a traced match gives the same answers and takes the same steps"""
+        for p, s in [('a*b', 'aab'), ('a*b', 'aac'), ('(a|b)+', 'abba'), ('x.*y', 'xay'), ('', ''),
+                     ('(x+x+)+y', 'x' * 8), ('\\ba$', 'a')]:
+            graph = compile(p)
+            b1, b2 = Budget(), Budget()
+            self.assertEqual(graph.match(s, b1, MatchStats()), graph.match(s, b2), (p, s))
+            self.assertEqual(b1.steps, b2.steps, (p, s))
+
+    def test_trace(self):
+        """Test a bare Trace observes without changing the result"""
+        graph = compile('a(b|c)d')
+        self.assertTrue(graph.traced('acd', None, Trace()))
+        self.assertFalse(graph.traced('axd', None, Trace()))
+
+    def test_branching(self):
+        """Test alternation widens the queue"""
+        stats = MatchStats()
+        compile('(ab|ac|ad)').match('ad', stats=stats)
+        self.assertGreater(stats.peak_queue, 1)
+        self.assertGreater(stats.epsilon, 0)
+        self.assertGreaterEqual(stats.history, stats.states)
+
+    def test_reset_each_match(self):
+        """Test counters restart on every match"""
+        stats = MatchStats()
+        graph = compile('abc')
+        graph.match('abc', stats=stats)
+        first = stats.as_dict()
+        graph.match('abc', stats=stats)
+        self.assertEqual(stats.as_dict(), first)
+
+    def test_budget(self):
+        """Test the budget still applies and stats are kept on timeout"""
+        stats = MatchStats()
+        budget = Budget(max_steps=10)
+        with self.assertRaises(MatchTimeout):
+            compile('x.*.*.*=y').match('x' + 'a' * 50 + 'y', budget, stats)
+        self.assertEqual(budget.steps, 11)
+        self.assertEqual(stats.states, 10)
+        self.assertGreater(stats.history, 0)
@@ -2,9 +2,30 @@
 A simple regex implementation in Python.
 """
 
-from .regex import Regex, match
+from common.budget import Budget, MatchTimeout
+from common.flags import Flag, UNICODE, IGNORECASE, MULTILINE
+from common.lines import LineIndex
+from .regex import Regex, match, search, finditer, findall, match_many, search_many
+from .matcher import MatchStats, Context, Match
+from .footprint import footprint
 
 __all__ = [
     'Regex',
     'match',
+    'search',
+    'finditer',
+    'findall',
+    'match_many',
+    'search_many',
+    'Budget',
+    'MatchTimeout',
+    'MatchStats',
+    'Context',
+    'Match',
+    'Flag',
+    'UNICODE',
+    'IGNORECASE',
+    'MULTILINE',
+    'LineIndex',
+    'footprint',
 ]
@@ -0,0 +1,97 @@
+"""
+Retained memory of a compiled Regex.
+"""
+import sys
+from typing import Dict, List, Set, Tuple
+
+from .matcher import Str, FoldedStr, Charset, Ranges, Assert, SPECIAL_QUOTES, GroupStart, GroupEnd
+from .regex import Regex, Search
+
+
+def sizeof(obj: object) -> int:
+    size = sys.getsizeof(obj)
+    if hasattr(obj, '__dict__'):
+        size += sys.getsizeof(obj.__dict__)
+    return size
+
+
+class Footprint(object):
+    """
+    Bytes held by one Regex, by construct.
+
+    Constructs are elements (the element list), literals, charsets (with
+    their sets), repetition (Search wrappers), groups, anchors (^ $ \\b
+    assertions) and index (the search prefix and first-char set).
+    Module-wide objects such as \\d or . are shared by all patterns and
+    not counted.
+    """
+
+    def __init__(self) -> None:
+        self.sizes: Dict[str, int] = {}
+        self.counts: Dict[str, int] = {}
+
+    def __repr__(self) -> str:
+        return f'<regex footprint {self.total} bytes>'
+
+    @property
+    def total(self) -> int:
+        return sum(self.sizes.values())
+
+    def add(self, construct: str, size: int) -> None:
+        self.sizes[construct] = self.sizes.get(construct, 0) + size
+        self.counts[construct] = self.counts.get(construct, 0) + 1
+
+
+def matcher_parts(m: object) -> List[Tuple[object, int]]:
+    """Objects a matcher holds, with their sizes; nothing for the shared ."""
+    if isinstance(m, Charset):
+        return [(m.charset, sys.getsizeof(m.charset)), (m, sizeof(m))]
+    if isinstance(m, Str):
+        return [(m, sys.getsizeof(m))]
+    if isinstance(m, Ranges):
+        # the range tables themselves are shared by all patterns
+        return [(m, sizeof(m))]
+    if isinstance(m, FoldedStr):
+        return [(m, sizeof(m) + sys.getsizeof(m.sets) + sum(sys.getsizeof(cs) for cs in m.sets))]
+    return []
+
+
+def element_parts(m: object) -> List[Tuple[str, object, int]]:
+    """(construct, object, size) of everything an element holds."""
+    if isinstance(m, Search):
+        return [('repetition', m, sizeof(m))] + [('repetition', o, n) for o, n in matcher_parts(m.m)]
+    if isinstance(m, (Str, FoldedStr)):
+        return [('literals', o, n) for o, n in matcher_parts(m)]
+    if isinstance(m, (Charset, Ranges)):
+        return [('charsets', o, n) for o, n in matcher_parts(m)]
+    if isinstance(m, (GroupStart, GroupEnd)):
+        return [('groups', m, sizeof(m))]
+    if isinstance(m, Assert):
+        return [('anchors', m, sizeof(m))]
+    return []
+
+
+def footprint(r: Regex) -> Footprint:
+    """Sum sys.getsizeof over the objects r holds, each counted once."""
+    fp = Footprint()
+    seen: Set[int] = {id(c) for c in SPECIAL_QUOTES.values()}
+    seen |= {id(c.charset) for c in SPECIAL_QUOTES.values()}
+
+    def add(construct: str, obj: object, size: int) -> None:
+        if id(obj) in seen:
+            return
+        seen.add(id(obj))
+        fp.add(construct, size)
+
+    fp.add('elements', sys.getsizeof(r.e))
+    for m in r.e:
+        for construct, obj, size in element_parts(m):
+            add(construct, obj, size)
+    fp.add('groups', sys.getsizeof(r.groups) + sys.getsizeof(r.groupnames) + sys.getsizeof(r.groupindex))
+    for g in r.groups:
+        add('groups', g, sizeof(g) + sys.getsizeof(g.name))
+    if r.prefix:
+        add('index', r.prefix, sys.getsizeof(r.prefix))
+    if r.firsts is not None:
+        add('index', r.firsts, sys.getsizeof(r.firsts))
+    return fp
@@ -0,0 +1,22 @@
+import unittest
+
+from .regex import Regex
+from .footprint import footprint
+
+
+class TestFootprint(unittest.TestCase):
+
+    def test_literal(self):
+        fp = footprint(Regex('abc'))
+        self.assertEqual(fp.counts['literals'], 1)
+        self.assertEqual(fp.total, sum(fp.sizes.values()))
+
+    def test_charset(self):
+        fp = footprint(Regex('[a-z]x'))
+        self.assertEqual(fp.counts['charsets'], 2)
+        self.assertNotIn('charsets', footprint(Regex('\\dx')).counts)
+
+    def test_repetition_and_groups(self):
+        fp = footprint(Regex('(ab)x*'))
+        self.assertEqual(fp.counts['repetition'], 2)
+        self.assertGreater(fp.sizes['groups'], footprint(Regex('abx*')).sizes['groups'])
@@ -1,43 +1,167 @@
 import string
-from typing import List, Tuple, Set, Dict, Optional
+from bisect import bisect_right
+from typing import List, Tuple, Set, Dict, Optional, Union, TYPE_CHECKING
 
+from common.budget import Budget
+from common.unicode import RangeTable, fold, table
+from common.lines import LineIndex
 
-class Context(object):
 
-    def __init__(self, s: str) -> None:
-        self.s: str = s
-        self.len: int = len(self.s)
-        self.matches: List[int] = []
-        self.groups: List['GroupMatch'] = []
+if TYPE_CHECKING:
+    from .regex import Regex
+
+
+class MatchStats(object):
+    """
+    Counters filled in by Regex.match when given a stats object.
+
+    states counts elements tried, edges the single-step matcher advances,
+    epsilon the zero-width group markers passed, candidates the end
+    positions a quantifier offered and backtracks those that failed.
+    peak_stack is the deepest recursion reached. Reset on every match.
+    """
+    __slots__ = ('states', 'edges', 'epsilon', 'backtracks', 'candidates', 'peak_stack')
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def __repr__(self) -> str:
+        return '<regex stats ' + ', '.join(f'{k}={v}' for k, v in self.as_dict().items()) + '>'
+
+    def reset(self) -> None:
+        self.states: int = 0
+        self.edges: int = 0
+        self.epsilon: int = 0
+        self.backtracks: int = 0
+        self.candidates: int = 0
+        self.peak_stack: int = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return {k: getattr(self, k) for k in self.__slots__}
+
+
+class Context(object):
+    """
+    Mutable match state, reusable across calls via reset().
+
+    Matchers advance through it with advance(ctx, cur), which returns the
+    new position or -1, so the hot path allocates neither tuples nor
+    substrings. Captures are kept as a flat span list, start of group n at
+    spans[2*n] and end at spans[2*n+1], -1 when unset. With fullmatch set,
+    a match only succeeds if it ends at the end of the string. A match
+    ending at empty_at is refused, see Regex.finditer.
+
+    nexts remembers, per first char searched for with str.find, the
+    position search got to in s, so repeated searches never rescan.
+    lines is the LineIndex of s passed to search, if any.
+    """
+    __slots__ = ('s', 'len', 'spans', 'budget', 'steps', 'limit', 'fullmatch', 'empty_at', 'nexts', 'lines')
+
+    def __init__(self, s: str = '', budget: Optional[Budget] = None, ngroups: int = 1) -> None:
+        self.spans: List[int] = []
+        self.nexts: Dict[str, int] = {}
+        self.reset(s, budget, ngroups)
 
     def __repr__(self) -> str:
         return '<regex context>'
 
+    def reset(self, s: str, budget: Optional[Budget] = None, ngroups: int = 1) -> 'Context':
+        """Prepare for matching a new string, reusing the span list and nexts."""
+        self.s: str = s
+        self.len: int = len(s)
+        self.budget: Optional[Budget] = budget
+        self.steps: int = 0
+        self.limit: float = budget.start() if budget is not None else float('inf')
+        self.fullmatch: bool = False
+        self.empty_at: int = -1
+        self.nexts.clear()
+        self.lines: Optional[LineIndex] = None
+        if len(self.spans) != 2*ngroups:
+            self.spans = [-1] * (2*ngroups)
+        else:
+            self.clear()
+        return self
+
+    def clear(self) -> None:
+        """Forget all captures, before trying a new start position."""
+        spans = self.spans
+        for i in range(len(spans)):
+            spans[i] = -1
+
 
 class Str(str):
+    __slots__ = ()
+
+    def advance(self, ctx: Context, cur: int) -> int:
+        if ctx.s.startswith(self, cur):
+            return cur+len(self)
+        return -1
 
     def __call__(self, ctx: Context, cur: int) -> Tuple[bool, int]:
-        if ctx.len-cur < len(self):
+        n = self.advance(ctx, cur)
+        if n < 0:
             return False, cur
-        if ctx.s[cur:cur+len(self)] != self:
+        return True, n
+
+
+class FoldedStr(object):
+    """Literal matched ignoring case, one case-closed set per char."""
+    __slots__ = ('text', 'sets')
+
+    def __init__(self, text: str) -> None:
+        self.text: str = text
+        self.sets: List[Set[str]] = [fold(c) for c in text]
+
+    def __repr__(self) -> str:
+        return f'fold("{self.text}")'
+
+    def __len__(self) -> int:
+        return len(self.sets)
+
+    def __eq__(self, o: object) -> bool:
+        if not isinstance(o, FoldedStr):
+            return False
+        return self.text == o.text
+
+    def advance(self, ctx: Context, cur: int) -> int:
+        if ctx.len < cur + len(self.sets):
+            return -1
+        s = ctx.s
+        for cs in self.sets:
+            if s[cur] not in cs:
+                return -1
+            cur += 1
+        return cur
+
+    def __call__(self, ctx: Context, cur: int) -> Tuple[bool, int]:
+        n = self.advance(ctx, cur)
+        if n < 0:
             return False, cur
-        return True, cur+len(self)
+        return True, n
 
 
 class Any(object):
+    __slots__ = ()
 
     def __repr__(self) -> str:
         return '.'
 
-    def __call__(self, ctx: Context, cur: int) -> Tuple[bool, int]:
+    def advance(self, ctx: Context, cur: int) -> int:
         if ctx.len <= cur:
+            return -1
+        return cur+1
+
+    def __call__(self, ctx: Context, cur: int) -> Tuple[bool, int]:
+        n = self.advance(ctx, cur)
+        if n < 0:
             return False, cur
-        return True, cur+1
+        return True, n
 
 any: Any = Any()
 
 
 class Charset(object):
+    __slots__ = ('charset', 'include')
 
     def __init__(self, charset: Optional[Set[str]] = None, include: bool = True) -> None:
         if charset is None:
@@ -88,12 +212,50 @@ class Charset(object):
 
         return self, cur
 
+    def advance(self, ctx: Context, cur: int) -> int:
+        if ctx.len <= cur or self.include != (ctx.s[cur] in self.charset):
+            return -1
+        return cur+1
+
     def __call__(self, ctx: Context, cur: int) -> Tuple[bool, int]:
-        if ctx.len <= cur:
+        n = self.advance(ctx, cur)
+        if n < 0:
             return False, cur
-        if self.include != (ctx.s[cur] in self.charset):
+        return True, n
+
+
+class Ranges(object):
+    """Single char in/not-in a shared Unicode range table, for \\p{...}."""
+    __slots__ = ('table', 'include', 'starts', 'ends')
+
+    def __init__(self, table: RangeTable, include: bool = True) -> None:
+        self.table: RangeTable = table
+        self.include: bool = include
+        self.starts: List[int] = table.starts
+        self.ends: List[int] = table.ends
+
+    def __repr__(self) -> str:
+        return f'ranges({self.include}, {self.table.name})'
+
+    def __eq__(self, o: object) -> bool:
+        if not isinstance(o, Ranges):
+            return False
+        return self.table is o.table and self.include == o.include
+
+    def advance(self, ctx: Context, cur: int) -> int:
+        if ctx.len <= cur:
+            return -1
+        code = ord(ctx.s[cur])
+        i = bisect_right(self.starts, code)
+        if (i > 0 and code <= self.ends[i-1]) != self.include:
+            return -1
+        return cur+1
+
+    def __call__(self, ctx: Context, cur: int) -> Tuple[bool, int]:
+        n = self.advance(ctx, cur)
+        if n < 0:
             return False, cur
-        return True, cur+1
+        return True, n
 
 
 SPECIAL_QUOTES: Dict[str, Charset] = {
@@ -106,7 +268,56 @@ SPECIAL_QUOTES: Dict[str, Charset] = {
 }
 
 
+def unicode_quote(c: str) -> Ranges:
+    """Unicode version of \\d \\s \\w or their negations."""
+    name = {'d': 'digit', 's': 'space', 'w': 'word'}[c.lower()]
+    return Ranges(table(name), c.islower())
+
+
+class Assert(object):
+    """
+    Zero-width test of the position: ^ \\A at the start, $ \\Z at the
+    end, \\b \\B at a word boundary or not, with Unicode \\w if unicode.
+    A multiline ^ also holds after each newline and $ before each one.
+    Otherwise $ is \\Z, as in the nfa engine: unlike re, it doesn't
+    match before a trailing '\\n'.
+    """
+    __slots__ = ('kind', 'unicode', 'word', 'multiline')
+
+    def __init__(self, kind: str, unicode: bool = False, multiline: bool = False) -> None:
+        self.kind: str = kind
+        self.unicode: bool = unicode
+        self.multiline: bool = multiline
+        self.word: Union[Charset, Ranges] = unicode_quote('w') if unicode else SPECIAL_QUOTES['w']
+
+    def __repr__(self) -> str:
+        return f'assert({self.kind})'
+
+    def __eq__(self, o: object) -> bool:
+        if not isinstance(o, Assert):
+            return False
+        return self.kind == o.kind and self.unicode == o.unicode and self.multiline == o.multiline
+
+    def advance(self, ctx: Context, cur: int) -> int:
+        kind = self.kind
+        if kind in '^A':
+            ok = cur == 0 or (self.multiline and ctx.s[cur-1] == '\n')
+        elif kind in '$Z':
+            ok = cur == ctx.len or (self.multiline and ctx.s[cur] == '\n')
+        else:
+            before = cur > 0 and self.word.advance(ctx, cur-1) >= 0
+            ok = (before != (self.word.advance(ctx, cur) >= 0)) == (kind == 'b')
+        return cur if ok else -1
+
+    def __call__(self, ctx: Context, cur: int) -> Tuple[bool, int]:
+        n = self.advance(ctx, cur)
+        if n < 0:
+            return False, cur
+        return True, n
+
+
 class GroupMatch(object):
+    __slots__ = ('n', 'name', 'start', 'end')
 
     def __init__(self, n: int, name: str, start: int) -> None:
         self.n: int = n
@@ -118,24 +329,114 @@ class GroupMatch(object):
         return f'<group "{self.name}" {self.n}>: {self.start}-{self.end or ""}'
 
 
+class Match(object):
+    """
+    Result of a successful match.
+
+    Holds only the subject string and a copy of the flat span list;
+    strings and GroupMatch views are built on access. Groups can be
+    addressed by number or by name.
+    """
+    __slots__ = ('re', 's', 'spans')
+
+    def __init__(self, re: 'Regex', s: str, spans: Tuple[int, ...]) -> None:
+        self.re: 'Regex' = re
+        self.s: str = s
+        self.spans: Tuple[int, ...] = spans
+
+    def __repr__(self) -> str:
+        return f'<regex match {self.span()}: "{self.group()}">'
+
+    def __getitem__(self, g: Union[int, str]) -> Optional[str]:
+        return self.group(g)
+
+    def index(self, g: Union[int, str]) -> int:
+        """Resolve group name or number to group number."""
+        if isinstance(g, str):
+            return self.re.groupindex[g]
+        if not 0 <= g < len(self.spans) // 2:
+            raise IndexError(f'no such group {g}')
+        return g
+
+    def span(self, g: Union[int, str] = 0) -> Tuple[int, int]:
+        """Return (start, end) of group, (-1, -1) if it didn't take part."""
+        n = self.index(g)
+        return self.spans[2*n], self.spans[2*n+1]
+
+    def start(self, g: Union[int, str] = 0) -> int:
+        return self.span(g)[0]
+
+    def end(self, g: Union[int, str] = 0) -> int:
+        return self.span(g)[1]
+
+    def group(self, g: Union[int, str] = 0) -> Optional[str]:
+        """Return the substring captured by group, None if unset."""
+        start, end = self.span(g)
+        if start < 0 or end < 0:
+            return None
+        return self.s[start:end]
+
+    def groupdict(self) -> Dict[str, Optional[str]]:
+        return {name: self.group(n) for name, n in self.re.groupindex.items()}
+
+    @property
+    def groups(self) -> List[GroupMatch]:
+        """GroupMatch view of every group, built on each access."""
+        r = []
+        for n, name in enumerate(self.re.groupnames):
+            gm = GroupMatch(n, name, self.spans[2*n])
+            if self.spans[2*n+1] >= 0:
+                gm.end = self.spans[2*n+1]
+            r.append(gm)
+        return r
+
+
 class Group(object):
+    __slots__ = ('name', 'n', 'left', 'right')
 
     def __init__(self, name: str, n: int) -> None:
         self.name: str = name
         self.n: int = n
+        self.left: GroupStart = GroupStart(self)
+        self.right: GroupEnd = GroupEnd(self)
 
     def __repr__(self) -> str:
         return f'<group "{self.name}" {self.n+1}>'
 
-    def left(self, ctx: Context, cur: int) -> Tuple[bool, int]:
-        """Mark the start position of capture group."""
-        if len(ctx.groups) <= self.n:
-            ctx.groups.append(GroupMatch(self.n, self.name, cur))
-        else:
-            ctx.groups[self.n].start = cur
-        return True, cur
 
-    def right(self, ctx: Context, cur: int) -> Tuple[bool, int]:
-        """Mark the end position of capture group."""
-        ctx.groups[self.n].end = cur
-        return True, cur
+class GroupStart(object):
+    """Zero-width element marking the start position of capture group."""
+    __slots__ = ('group', 'slot')
+
+    def __init__(self, group: Group) -> None:
+        self.group: Group = group
+        self.slot: int = 2*group.n
+
+    def __repr__(self) -> str:
+        return f'({self.group.n}'
+
+    def advance(self, ctx: Context, cur: int) -> int:
+        ctx.spans[self.slot] = cur
+        return cur
+
+    def __call__(self, ctx: Context, cur: int) -> Tuple[bool, int]:
+        return True, self.advance(ctx, cur)
+
+
+class GroupEnd(object):
+    """Zero-width element marking the end position of capture group."""
+    __slots__ = ('group', 'slot')
+
+    def __init__(self, group: Group) -> None:
+        self.group: Group = group
+        self.slot: int = 2*group.n+1
+
+    def __repr__(self) -> str:
+        return f'{self.group.n})'
+
+    def advance(self, ctx: Context, cur: int) -> int:
+        ctx.spans[self.slot] = cur
+        return cur
+
+    def __call__(self, ctx: Context, cur: int) -> Tuple[bool, int]:
+        return True, self.advance(ctx, cur)
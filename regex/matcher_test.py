@@ -1,7 +1,7 @@
 import string
 import unittest
 
-from .matcher import Context, Str, any, Charset
+from .matcher import Context, Str, FoldedStr, fold, any, Charset, Assert, Group
 
 
 class TestStr(unittest.TestCase):
@@ -21,6 +21,12 @@ class TestStr(unittest.TestCase):
         self.assertEqual(s(Context('abz'), 0), (False, 0))
         self.assertEqual(s(Context('zabz'), 1), (False, 1))
 
+    def test_advance(self):
+        s = Str('abc')
+        self.assertEqual(s.advance(Context('zabcd'), 1), 4)
+        self.assertEqual(s.advance(Context('zabz'), 1), -1)
+        self.assertEqual(s.advance(Context('zab'), 1), -1)
+
 
 class TestAny(unittest.TestCase):
 
@@ -81,6 +87,81 @@ class TestCharset(unittest.TestCase):
         self.assertEqual(cs(Context('Abc'), 0), (False, 0))
         self.assertEqual(cs(Context('aBc'), 1), (False, 1))
 
+    def test_advance(self):
+        cs, cur = Charset.eval('a-z', 0)
+        self.assertEqual(cs.advance(Context('aBc'), 0), 1)
+        self.assertEqual(cs.advance(Context('aBc'), 1), -1)
+        self.assertEqual(cs.advance(Context('a'), 1), -1)
+
+
+class TestFold(unittest.TestCase):
+
+    def test_fold(self):
+        self.assertEqual(fold('aB1'), {'a', 'A', 'b', 'B', '1'})
+        self.assertEqual(fold('ǅ'), {'ǅ', 'Ǆ', 'ǆ'})
+        self.assertEqual(fold('ß'), {'ß', 'ẞ'})
+        self.assertEqual(fold('k'), {'k', 'K', '\u212a'})
+        self.assertEqual(fold('ſ'), {'s', 'S', 'ſ'})
+
+    def test_folded_str(self):
+        fs = FoldedStr('abc')
+        self.assertEqual(fs.advance(Context('xAbC'), 1), 4)
+        self.assertEqual(fs.advance(Context('xAbD'), 1), -1)
+        self.assertEqual(fs.advance(Context('xAb'), 1), -1)
+        self.assertEqual(fs(Context('ABC'), 0), (True, 3))
+
+
+class TestAssert(unittest.TestCase):
+
+    def test_start_end(self):
+        self.assertEqual(Assert('^').advance(Context('ab'), 0), 0)
+        self.assertEqual(Assert('A').advance(Context('ab'), 1), -1)
+        self.assertEqual(Assert('$').advance(Context('ab'), 2), 2)
+        self.assertEqual(Assert('Z').advance(Context('ab'), 1), -1)
+
+    def test_multiline(self):
+        ctx = Context('a\nb')
+        self.assertEqual([Assert('^', multiline=True).advance(ctx, i) for i in range(4)], [0, -1, 2, -1])
+        self.assertEqual([Assert('$', multiline=True).advance(ctx, i) for i in range(4)], [-1, 1, -1, 3])
+        self.assertEqual(Assert('^').advance(ctx, 2), -1)
+        self.assertNotEqual(Assert('^'), Assert('^', multiline=True))
+
+    def test_word_boundary(self):
+        ctx = Context('ab c')
+        self.assertEqual([Assert('b').advance(ctx, i) for i in range(5)], [0, -1, 2, 3, 4])
+        self.assertEqual([Assert('B').advance(ctx, i) for i in range(5)], [-1, 1, -1, -1, -1])
+        self.assertEqual(Assert('b', True).advance(Context('é'), 0), 0)
+        self.assertEqual(Assert('b')(Context('é'), 0), (False, 0))
+
+
+class TestSlots(unittest.TestCase):
+
+    def test_no_instance_dict(self):
+        cs, _ = Charset.eval('a-z', 0)
+        for e in (Str('a'), FoldedStr('a'), any, cs, Assert('b'), Group('g', 1)):
+            self.assertFalse(hasattr(e, '__dict__'))
+
+
+class TestContext(unittest.TestCase):
+
+    def test_reset(self):
+        ctx = Context('abc', ngroups=2)
+        g = Group('x', 1)
+        g.left.advance(ctx, 1)
+        g.right.advance(ctx, 2)
+        self.assertEqual(ctx.spans, [-1, -1, 1, 2])
+        spans = ctx.spans
+        self.assertEqual(ctx.reset('zz', ngroups=2), ctx)
+        self.assertEqual((ctx.s, ctx.len), ('zz', 2))
+        self.assertIs(ctx.spans, spans)
+        self.assertEqual(ctx.spans, [-1, -1, -1, -1])
+        ctx.reset('zz', ngroups=3)
+        self.assertEqual(ctx.spans, [-1] * 6)
+
+    def test_slots(self):
+        with self.assertRaises(AttributeError):
+            Context('abc').matches = []
+
 
 # class TestEval(unittest.TestCase):
 
@@ -1,15 +1,25 @@
+import copy
 import logging
-from typing import Union, Callable, Iterator, List, Tuple, Generator, Optional
+from typing import Union, Callable, Iterator, Iterable, List, Tuple, Generator, Optional, Dict, Set
 
-from .matcher import Context, Str, any, Charset, SPECIAL_QUOTES, GroupMatch, Group
+from common.budget import Budget
+from common.unicode import table
+from common.flags import Flag, UNICODE, IGNORECASE, MULTILINE
+from common.lines import LineIndex
 
+from .matcher import Context, Str, FoldedStr, fold, any, Charset, Ranges, Assert, SPECIAL_QUOTES, unicode_quote, Match, Group, GroupStart, GroupEnd, MatchStats
+
+
+# Up to this many strings that every match starts with one of are searched for with str.find
+FIND_NEEDLES = 8
 
 # Type alias for matchers
-Matcher = Union[Str, Charset, 'any.__class__', Callable[[Context, int], Tuple[bool, int]]]
+Matcher = Union[Str, FoldedStr, Charset, Ranges, Assert, 'any.__class__', Callable[[Context, int], Tuple[bool, int]]]
 Element = Union[str, Str, 'Search', Matcher, Callable[[Context, int], Tuple[bool, int]]]
 
 
 class Search(object):
+    __slots__ = ('m', 'repeat', 'greedy', 'smallest', 'longest')
 
     def __init__(self, m: Matcher, repeat: str, greedy: bool) -> None:
         self.m: Matcher = m
@@ -36,10 +46,10 @@ class Search(object):
     def scan(self, ctx: Context, cur: int, start: int, end: int) -> Generator[int, None, None]:
         ''' all the pos that the NEXT matcher could possible be '''
         while end >= cur:
-            r, next = self.m(ctx, cur)
+            next = self.m.advance(ctx, cur)
             if cur >= start:
                 yield cur
-            if not r:
+            if next < 0:
                 return
             cur = next
 
@@ -60,6 +70,83 @@ class Search(object):
         return r
 
 
+class Tally(object):
+    """Stats of one counting match, and how many quantifiers are backtracking."""
+    __slots__ = ('stats', 'depth')
+
+    def __init__(self, stats: MatchStats) -> None:
+        self.stats: MatchStats = stats
+        self.depth: int = 0
+
+
+class Counted(object):
+    """Single-step element that counts its tries, see Regex.counting()."""
+    __slots__ = ('m', 'tally', 'epsilon')
+
+    def __init__(self, m: Element, tally: Tally) -> None:
+        self.m: Element = m
+        self.tally: Tally = tally
+        self.epsilon: bool = isinstance(m, (GroupStart, GroupEnd))
+
+    def __repr__(self) -> str:
+        return repr(self.m)
+
+    def advance(self, ctx: Context, cur: int) -> int:
+        stats = self.tally.stats
+        stats.states += 1
+        stats.edges += 1
+        if self.epsilon:
+            stats.epsilon += 1
+        return self.m.advance(ctx, cur)
+
+
+class CountedSearch(object):
+    """
+    Quantifier that counts its candidates, see Regex.counting().
+
+    The backtracker only asks for the next candidate once the previous one
+    failed, and stops asking for good once one succeeds, so every resume
+    is a backtrack and depth needs no unwinding after a success.
+    """
+    __slots__ = ('m', 'tally')
+
+    def __init__(self, m: Search, tally: Tally) -> None:
+        self.m: Search = m
+        self.tally: Tally = tally
+
+    def __repr__(self) -> str:
+        return repr(self.m)
+
+    def search(self, ctx: Context, cur: int) -> Iterator[int]:
+        tally = self.tally
+        stats = tally.stats
+        stats.states += 1
+        tally.depth += 1
+        for snext in self.m.search(ctx, cur):
+            stats.candidates += 1
+            if tally.depth >= stats.peak_stack:
+                stats.peak_stack = tally.depth + 1
+            yield snext
+            stats.backtracks += 1
+        tally.depth -= 1
+
+
+def fold_element(m: Element) -> Element:
+    """Case-insensitive version of a compiled element, for IGNORECASE."""
+    if isinstance(m, Search):
+        return Search(fold_element(m.m), m.repeat, m.greedy)
+    if isinstance(m, Str):
+        if all(len(fold(c)) == 1 for c in m):
+            return m
+        if len(m) == 1:
+            return Charset(fold(m), True)
+        return FoldedStr(m)
+    # \d \s \w are shared and have no case to fold
+    if isinstance(m, Charset) and all(m is not q for q in SPECIAL_QUOTES.values()):
+        return Charset(fold(m.charset), m.include)
+    return m
+
+
 def buffered(f: Callable[['Regex', str], Generator[Element, None, None]]) -> Callable[['Regex', str], Generator[Union[Str, Element], None, None]]:
     """Buffer consecutive string matches into Str elements."""
     def _(self: 'Regex', exp: str) -> Generator[Union[Str, Element], None, None]:
@@ -77,12 +164,14 @@ def buffered(f: Callable[['Regex', str], Generator[Element, None, None]]) -> Cal
     return _
 
 
-def debugging(f: Callable[['Regex', Context, int, int, int], Tuple[bool, int]]) -> Callable[['Regex', Context, int, int, int], Tuple[bool, int]]:
-    """Add debug logging to matching functions."""
-    def _(self: 'Regex', ctx: Context, ecur: int, scur: int, depth: int) -> Tuple[bool, int]:
+def debugging(f: Callable[['Regex', Context, int, int, int], int]) -> Callable[['Regex', Context, int, int, int], int]:
+    """Add debug logging to matching functions, only formatted when enabled."""
+    def _(self: 'Regex', ctx: Context, ecur: int, scur: int, depth: int) -> int:
+        if not logging.root.isEnabledFor(logging.INFO):
+            return f(self, ctx, ecur, scur, depth)
         logging.info(f'{"+"*depth}run: "{self.e[:ecur]}{self.e[ecur:]}", "{ctx.s[:scur]}[{ctx.s[scur:]}]"')
         r = f(self, ctx, ecur, scur, depth)
-        if r:
+        if r >= 0:
             logging.info(f'{"+"*depth}successed match')
         return r
     return _
@@ -90,10 +179,21 @@ def debugging(f: Callable[['Regex', Context, int, int, int], Tuple[bool, int]])
 
 class Regex(object):
 
-    def __init__(self, exp: Optional[str] = None) -> None:
+    def __init__(self, exp: Optional[str] = None, budget: Optional[Budget] = None, flags: int = 0) -> None:
         self.e: List[Element] = []
+        self.flags: Flag = Flag(flags)
         self.groups: List[Group] = []
         self.stack: List[Group] = []
+        self.budget: Optional[Budget] = budget
+        self.groupnames: List[str] = ['']
+        self.groupindex: Dict[str, int] = {}
+        self.prefix: str = ''
+        self.firsts: Optional[Set[str]] = None
+        self.needles: Optional[List[str]] = None
+        self.anchor_start: bool = False
+        self.window: Optional[int] = None
+        self.anchor_lines: bool = False
+        self.line_window: Optional[int] = None
         if exp is not None:
             self.compile(exp)
 
@@ -102,10 +202,110 @@ class Regex(object):
         self.stack = []
         self.group_id = 1
         self.e = list(self._compile(exp))
+        if self.flags & IGNORECASE:
+            self.e = [fold_element(m) for m in self.e]
         if self.stack:
             raise Exception('')
-        del self.stack
         del self.group_id
+        self._finish()
+
+    def _finish(self) -> None:
+        """Drop the group stack, work out group lookups and search hints of the elements."""
+        del self.stack
+        self.groupnames = [''] + [g.name for g in self.groups]
+        self.groupindex = {g.name: g.n for g in self.groups if g.name}
+        self.prefix, self.firsts = self.leading()
+        self.needles = self.leading_needles()
+        self.anchor_start, self.window = self.anchors()
+        self.anchor_lines, self.line_window = self.anchors(True)
+
+    def leading(self) -> Tuple[str, Optional[Set[str]]]:
+        """
+        Work out what any match must start with, for skipping in search.
+
+        Returns the literal prefix (may be empty) and the set of possible
+        first characters (None if any character could start a match).
+        Literals run on across group boundaries and assertions, and a single-char first
+        set doubles as the prefix, so that search can use str.find.
+        """
+        prefix = ''
+        for m in self.e:
+            if isinstance(m, (GroupStart, GroupEnd, Assert)):
+                continue
+            if isinstance(m, Str):
+                prefix += m
+                continue
+            if prefix:
+                break
+            if isinstance(m, Search) and m.smallest == 0 and m.repeat != '+':
+                return '', None
+            if isinstance(m, Search):
+                m = m.m
+                if isinstance(m, Str):
+                    return str(m), {m[0]}
+            if isinstance(m, Charset) and m.include:
+                if len(m.charset) == 1:
+                    return next(iter(m.charset)), m.charset
+                return '', m.charset
+            if isinstance(m, FoldedStr):
+                return '', m.sets[0]
+            return '', None
+        if prefix:
+            return prefix, {prefix[0]}
+        return '', None
+
+    def leading_needles(self) -> Optional[List[str]]:
+        """
+        A few strings one of which every match starts with, for str.find
+        where there is no prefix: the spellings of the head of a leading
+        FoldedStr, or a small first char set.
+        """
+        if self.prefix or self.firsts is None:
+            return None
+        m = next((m for m in self.e if not isinstance(m, (GroupStart, GroupEnd, Assert))), None)
+        if isinstance(m, FoldedStr):
+            needles = ['']
+            for cs in m.sets:
+                if len(needles) * len(cs) > FIND_NEEDLES:
+                    break
+                needles = [n + c for n in needles for c in cs]
+            return needles
+        if len(self.firsts) <= FIND_NEEDLES:
+            return list(self.firsts)
+        return None
+
+    def anchors(self, lines: bool = False) -> Tuple[bool, Optional[int]]:
+        """
+        Work out where matches are pinned, for skipping in search.
+
+        Returns whether a match must start at the start of the string
+        (^ or \\A first), and, when it must end at the end ($ or \\Z last),
+        the most chars it can span; None if unbounded or not pinned.
+        With lines, MULTILINE ^ and $ count too, pinning matches to the
+        start or end of a line instead.
+        """
+        es = [m for m in self.e if not isinstance(m, (GroupStart, GroupEnd))]
+
+        def pinned(m: Element, kinds: str) -> bool:
+            return isinstance(m, Assert) and m.kind in kinds and (lines or not m.multiline)
+
+        start = bool(es) and pinned(es[0], '^A')
+        if not es or not pinned(es[-1], '$Z'):
+            return start, None
+        longest = 0
+        for m in es:
+            if isinstance(m, Search) and m.repeat in '*+':
+                return start, None
+            n = 1
+            if isinstance(m, Search):
+                n = 1 if m.repeat == '?' else m.longest
+                m = m.m
+            if isinstance(m, (Str, FoldedStr)):
+                n *= len(m)
+            elif isinstance(m, Assert):
+                n = 0
+            longest += n
+        return start, longest
 
     @buffered
     def _compile(self, exp: str) -> Generator[Element, None, None]:
@@ -121,12 +321,10 @@ class Regex(object):
                 yield m
                 continue
 
-            if (
-                callable(m)
-                and getattr(m, "__name__", "") == "right"
-                and isinstance(getattr(m, "__self__", None), Group)
-            ):
+            if isinstance(m, GroupEnd):
                 raise Exception('quantifier on group is not supported')
+            if isinstance(m, Assert):
+                raise Exception('quantifier on assertion is not supported')
 
             # turn to search
             if exp[cur] == '{':
@@ -157,16 +355,11 @@ class Regex(object):
         if exp[cur] == '.':
             return any, cur+1
 
-        # TODO: \A \b \B \Z
+        if exp[cur] in '^$':
+            return Assert(exp[cur], multiline=bool(self.flags & MULTILINE)), cur+1
+
         if exp[cur] == '\\':
-            cur += 1
-            if len(exp) <= cur:
-                raise Exception()  # TODO: compile exception
-            c = exp[cur]
-            cur += 1
-            if c in SPECIAL_QUOTES:
-                return SPECIAL_QUOTES[c], cur
-            return c, cur
+            return self.eval_escape(exp, cur+1)
 
         if exp[cur] == '[':
             return Charset.eval(exp, cur+1)
@@ -193,46 +386,294 @@ class Regex(object):
         c = exp[cur]
         return c, cur+1
 
+    def eval_escape(self, exp: str, cur: int) -> Tuple[Union[Element, Callable[[Context, int], Tuple[bool, int]]], int]:
+        """Parse the escape after a backslash at exp[cur-1], return (element, next_position)."""
+        if len(exp) <= cur:
+            raise Exception()  # TODO: compile exception
+        c = exp[cur]
+        cur += 1
+        if c in 'AZbB':
+            return Assert(c, bool(self.flags & UNICODE)), cur
+        if c in 'pP' and exp.startswith('{', cur):
+            pos = exp.find('}', cur)
+            if pos == -1:
+                raise Exception()
+            return Ranges(table(exp[cur+1:pos]), c == 'p'), pos+1
+        if c in SPECIAL_QUOTES and self.flags & UNICODE:
+            return unicode_quote(c), cur
+        if c in SPECIAL_QUOTES:
+            return SPECIAL_QUOTES[c], cur
+        return c, cur
+
     @debugging
-    def _match(self, ctx: Context, ecur: int, scur: int, depth: int) -> Tuple[bool, int]:
-        sinit = scur
+    def _match(self, ctx: Context, ecur: int, scur: int, depth: int) -> int:
+        """Match elements from ecur at scur, return end position or -1."""
         while len(self.e) > ecur:
             # logging.info(f'loop {self.e[ecur:]}, "{s[scur:]}"')
+            ctx.steps += 1
+            if ctx.steps >= ctx.limit:
+                ctx.limit = ctx.budget.check(ctx.steps)
             m = self.e[ecur]
-            if len(ctx.matches) <= ecur:
-                ctx.matches.append(scur)
-            else:
-                ctx.matches[ecur] = scur
-            # print(depth, ecur, ctx.matches)
 
             if hasattr(m, 'search'):
-                logging.info(f'{"+"*depth}search {m} in "{ctx.s[scur:]}"')
+                if logging.root.isEnabledFor(logging.INFO):
+                    logging.info(f'{"+"*depth}search {m} in "{ctx.s[scur:]}"')
                 for snext in m.search(ctx, scur):
-                    r, send = self._match(ctx, ecur+1, snext, depth+1)
-                    if r:
-                        return True, send
-                return False, sinit
-
-            r, snext = m(ctx, scur)
-            if not r:
-                return False, sinit
+                    ctx.steps += 1
+                    if ctx.steps >= ctx.limit:
+                        ctx.limit = ctx.budget.check(ctx.steps)
+                    send = self._match(ctx, ecur+1, snext, depth+1)
+                    if send >= 0:
+                        return send
+                return -1
+
+            scur = m.advance(ctx, scur)
+            if scur < 0:
+                return -1
             ecur += 1
-            scur = snext
-
-        return True, scur
-
-    def match(self, s: str) -> Optional[Context]:
-        """Match regex against string from beginning, return Context or None."""
-        ctx = Context(s)
-        ctx.groups.append(GroupMatch(0, '', 0))
-        r = self._match(ctx, 0, 0, 0)
-        if r[0] and r[1] == len(s):
-            ctx.groups[0].end = r[1]
-            return ctx
-        return None
 
+        if ctx.fullmatch and scur != ctx.len:
+            return -1
+        if scur == ctx.empty_at:
+            return -1
+        return scur
+
+    def match(self, s: str, budget: Optional[Budget] = None,
+              ctx: Optional[Context] = None, stats: Optional[MatchStats] = None) -> Optional[Match]:
+        """
+        Match regex against the whole string, return Match or None.
+
+        The per-call budget overrides the one given to the constructor.
+        Raises MatchTimeout when exceeded; steps used are left in
+        budget.steps.
+
+        Passing a ctx reuses it instead of allocating a new Context, which
+        saves allocations when matching many strings in a loop. Only a
+        successful match allocates, copying the capture spans.
+
+        Passing stats runs the same backtracker over elements wrapped to
+        count their work; without it the plain elements run untouched.
+        """
+        ctx = self.prepare(s, budget, ctx)
+        if not self.anchored(ctx, stats):
+            return None
+        return Match(self, s, tuple(ctx.spans))
+
+    def prepare(self, s: str, budget: Optional[Budget], ctx: Optional[Context],
+                lines: Optional[LineIndex] = None) -> Context:
+        """Get a fresh or reset Context for matching s."""
+        if budget is None:
+            budget = self.budget
+        if ctx is None:
+            ctx = Context(s, budget, len(self.groupnames))
+        else:
+            ctx.reset(s, budget, len(self.groupnames))
+        if lines is not None:
+            lines.check(s)
+            ctx.lines = lines
+        return ctx
+
+    def counting(self, stats: MatchStats) -> 'Regex':
+        """Copy of self sharing everything but its elements, which count their work into stats."""
+        r = copy.copy(self)
+        tally = Tally(stats)
+        r.e = [CountedSearch(m, tally) if isinstance(m, Search) else Counted(m, tally) for m in self.e]
+        return r
 
-def match(exp: str, s: str) -> Optional[Context]:
+    def anchored(self, ctx: Context, stats: Optional[MatchStats] = None) -> bool:
+        """Match the whole of ctx.s, leaving the match in ctx.spans."""
+        ctx.fullmatch = True
+        ctx.spans[0] = 0
+        try:
+            if stats is None:
+                end = self._match(ctx, 0, 0, 0)
+            else:
+                stats.reset()
+                stats.peak_stack = 1
+                end = self.counting(stats)._match(ctx, 0, 0, 0)
+        finally:
+            if ctx.budget is not None:
+                ctx.budget.steps = ctx.steps
+        ctx.spans[1] = end
+        return end >= 0
+
+    def candidate(self, ctx: Context, pos: int) -> int:
+        """Next position at or after pos where a match could start, or -1."""
+        s = ctx.s
+        if self.anchor_start or self.anchor_lines or self.line_window is not None:
+            pos = self.skip_anchored(ctx, pos)
+            if pos < 0:
+                return -1
+        if self.prefix:
+            return s.find(self.prefix, pos)
+        if self.needles is not None:
+            return self.find_needles(ctx, pos)
+        if self.firsts is not None:
+            firsts = self.firsts
+            while pos < len(s):
+                if s[pos] in firsts:
+                    return pos
+                pos += 1
+            return -1
+        return pos
+
+    def skip_anchored(self, ctx: Context, pos: int) -> int:
+        """
+        candidate() for the anchors: the first position at or after pos
+        that a match pinned to the start or end of the string or of a line
+        could start at, or -1. Newlines are looked up in ctx.lines when
+        search was given a LineIndex, found with str.find otherwise.
+        """
+        s = ctx.s
+        if self.anchor_start:
+            return pos if pos == 0 else -1
+        if self.window is not None:
+            pos = max(pos, ctx.len - self.window)
+        if self.anchor_lines and pos > 0 and s[pos-1] != '\n':
+            if ctx.lines is not None:
+                return ctx.lines.next_start(pos)
+            i = s.find('\n', pos)
+            return i+1 if i >= 0 else -1
+        if self.window is None and self.line_window is not None:
+            end = ctx.lines.line_end(pos) if ctx.lines is not None else s.find('\n', pos)
+            pos = max(pos, (end if end >= 0 else ctx.len) - self.line_window)
+        return pos
+
+    def find_needles(self, ctx: Context, pos: int) -> int:
+        """
+        candidate() for a few needles, str.find on each.
+
+        Positions only move forward while scanning one string, so an
+        occurrence found earlier is reused while it's still ahead, and a
+        needle that wasn't found is never searched for again.
+        """
+        best = -1
+        nexts = ctx.nexts
+        for c in self.needles:
+            i = nexts.get(c)
+            if i is None or 0 <= i < pos:
+                i = nexts[c] = ctx.s.find(c, pos)
+            if i >= 0 and (best < 0 or i < best):
+                best = i
+        return best
+
+    def scan(self, ctx: Context, pos: int) -> bool:
+        """Find the leftmost match at or after pos, leaving it in ctx.spans."""
+        try:
+            while pos <= ctx.len:
+                pos = self.candidate(ctx, pos)
+                if pos < 0:
+                    return False
+                ctx.clear()
+                ctx.spans[0] = pos
+                end = self._match(ctx, 0, pos, 0)
+                if end >= 0:
+                    ctx.spans[1] = end
+                    return True
+                pos += 1
+            return False
+        finally:
+            if ctx.budget is not None:
+                ctx.budget.steps = ctx.steps
+
+    def search(self, s: str, pos: int = 0, budget: Optional[Budget] = None,
+               ctx: Optional[Context] = None, lines: Optional[LineIndex] = None) -> Optional[Match]:
+        """
+        Find the leftmost match anywhere in s from pos, return Match or None.
+
+        Start positions are skipped ahead with str.find on the literal
+        prefix, or by testing the first-character set, before running the
+        backtracker. A LineIndex of s, if given, lets MULTILINE ^ and $
+        skip from line to line without finding the newlines again.
+        """
+        ctx = self.prepare(s, budget, ctx, lines)
+        if not self.scan(ctx, pos):
+            return None
+        return Match(self, s, tuple(ctx.spans))
+
+    def finditer(self, s: str, pos: int = 0, budget: Optional[Budget] = None,
+                 lines: Optional[LineIndex] = None) -> Iterator[Match]:
+        """
+        Yield successive non-overlapping matches, sharing one budget and line index.
+
+        As in re, the next search starts where the last match ended, and
+        after an empty match it may not match empty there again, so the
+        backtracker goes on to a non-empty match at the same position.
+        """
+        ctx = self.prepare(s, budget, None, lines)
+        while self.scan(ctx, pos):
+            start, end = ctx.spans[0], ctx.spans[1]
+            yield Match(self, s, tuple(ctx.spans))
+            pos = end
+            # Any match from end that ends there is empty
+            ctx.empty_at = end if end == start else -1
+
+    def match_many(self, inputs: Iterable[str], budget: Optional[Budget] = None) -> bytearray:
+        """
+        Match every input as a whole, return one 0/1 byte per input.
+
+        A single Context is reused for all inputs and no Match objects are
+        built, so the per-input cost is just the matching itself.
+        """
+        ctx = Context(ngroups=len(self.groupnames))
+        hits = bytearray()
+        for s in inputs:
+            hits.append(self.anchored(self.prepare(s, budget, ctx)))
+        return hits
+
+    def search_many(self, inputs: Iterable[str], budget: Optional[Budget] = None) -> List[Tuple[int, Tuple[int, int]]]:
+        """Search every input, return (index, (start, end)) for those that match."""
+        ctx = Context(ngroups=len(self.groupnames))
+        r: List[Tuple[int, Tuple[int, int]]] = []
+        for i, s in enumerate(inputs):
+            if self.scan(self.prepare(s, budget, ctx), 0):
+                r.append((i, (ctx.spans[0], ctx.spans[1])))
+        return r
+
+    def findall(self, s: str, pos: int = 0, budget: Optional[Budget] = None,
+                lines: Optional[LineIndex] = None) -> List[Union[str, Tuple[str, ...]]]:
+        """Return all matches as strings, like re.findall."""
+        ngroups = len(self.groupnames) - 1
+        r: List[Union[str, Tuple[str, ...]]] = []
+        for m in self.finditer(s, pos, budget, lines):
+            if ngroups == 0:
+                r.append(m.group())
+            elif ngroups == 1:
+                r.append(m.group(1) or '')
+            else:
+                r.append(tuple(m.group(n) or '' for n in range(1, ngroups+1)))
+        return r
+
+
+def match(exp: str, s: str, budget: Optional[Budget] = None, flags: int = 0) -> Optional[Match]:
     """Compile regex pattern and match against string."""
-    r = Regex(exp)
+    r = Regex(exp, budget, flags)
     return r.match(s)
+
+
+def search(exp: str, s: str, budget: Optional[Budget] = None, flags: int = 0) -> Optional[Match]:
+    """Compile regex pattern and search for it anywhere in string."""
+    return Regex(exp, budget, flags).search(s)
+
+
+def finditer(exp: str, s: str, budget: Optional[Budget] = None, flags: int = 0) -> Iterator[Match]:
+    """Compile regex pattern and iterate over all its matches in string."""
+    return Regex(exp, budget, flags).finditer(s)
+
+
+def findall(exp: str, s: str, budget: Optional[Budget] = None, flags: int = 0) -> List[Union[str, Tuple[str, ...]]]:
+    """Compile regex pattern and return all its matches in string."""
+    return Regex(exp, budget, flags).findall(s)
+
+
+def match_many(exp: Union[str, Regex], inputs: Iterable[str], budget: Optional[Budget] = None) -> bytearray:
+    """Compile regex pattern once and match it against every input."""
+    r = exp if isinstance(exp, Regex) else Regex(exp)
+    return r.match_many(inputs, budget)
+
+
+def search_many(exp: Union[str, Regex], inputs: Iterable[str],
+                budget: Optional[Budget] = None) -> List[Tuple[int, Tuple[int, int]]]:
+    """Compile regex pattern once and search for it in every input."""
+    r = exp if isinstance(exp, Regex) else Regex(exp)
+    return r.search_many(inputs, budget)
@@ -1,7 +1,9 @@
 import unittest
 
+from common.budget import Budget, MatchTimeout
+
 from . import regex
-from .matcher import Context, any, Charset, SPECIAL_QUOTES
+from .matcher import Context, any, Charset, SPECIAL_QUOTES, MatchStats
 
 
 DIGITS = SPECIAL_QUOTES['d']
@@ -178,3 +180,302 @@ class TestRegex(unittest.TestCase):
         self.assertEqual(bool(m), True)
         self.assertEqual((m.groups[1].start, m.groups[1].end), (0, 5))
         self.assertEqual((m.groups[2].start, m.groups[2].end), (3, 5))
+
+
+class TestBudget(unittest.TestCase):
+
+    def test_steps_reported(self):
+        budget = Budget()
+        m = regex.match('abc.*def', 'abczzdef', budget)
+        self.assertEqual(bool(m), True)
+        self.assertGreater(budget.steps, 0)
+        self.assertEqual(regex.match('abc.*def', 'abczzdeg', budget), None)
+        self.assertGreater(budget.steps, 0)
+
+    def test_max_steps(self):
+        budget = Budget(max_steps=20)
+        with self.assertRaises(MatchTimeout) as cm:
+            regex.match('.*.*.*=.*', 'a' * 50, budget)
+        self.assertEqual(cm.exception.steps, 21)
+        self.assertEqual(budget.steps, 21)
+
+    def test_timeout(self):
+        r = regex.Regex('.*.*.*=.*', Budget(timeout=-1, interval=1))
+        with self.assertRaises(MatchTimeout):
+            r.match('a' * 50)
+        self.assertEqual(bool(r.match('a=b', Budget())), True)
+
+
+class TestReuse(unittest.TestCase):
+
+    def test_context_reuse(self):
+        r = regex.Regex('abc([a-z]*)def')
+        ctx = Context()
+        m1 = r.match('abczzdef', ctx=ctx)
+        self.assertEqual(m1.span(1), (3, 5))
+        self.assertEqual(r.match('abcdeg', ctx=ctx), None)
+        m2 = r.match('abczdef', ctx=ctx)
+        self.assertEqual(m2.span(1), (3, 4))
+        self.assertEqual(m1.span(1), (3, 5))
+
+    def test_context_reuse_search(self):
+        # the find() positions are cleared, not reallocated, for each new string
+        r = regex.Regex('[xy]\\d')
+        ctx = Context()
+        nexts = ctx.nexts
+        self.assertEqual(r.search('aaaax1', ctx=ctx).span(), (4, 6))
+        self.assertEqual(r.search('y2', ctx=ctx).span(), (0, 2))
+        self.assertIs(ctx.nexts, nexts)
+
+
+class TestMatch(unittest.TestCase):
+
+    def test_group(self):
+        m = regex.match('abc(?P<mid>[a-z]*)(d)ef', 'abczzdef')
+        self.assertEqual(m.group(), 'abczzdef')
+        self.assertEqual(m.group(1), 'zz')
+        self.assertEqual(m['mid'], 'zz')
+        self.assertEqual(m.group(2), 'd')
+        self.assertEqual(m.span('mid'), (3, 5))
+        self.assertEqual((m.start(2), m.end(2)), (5, 6))
+        self.assertEqual(m.groupdict(), {'mid': 'zz'})
+
+    def test_group_views(self):
+        m = regex.match('abc(?P<mid>[a-z]*)def', 'abczzdef')
+        groups = m.groups
+        self.assertEqual([g.n for g in groups], [0, 1])
+        self.assertEqual(groups[1].name, 'mid')
+        self.assertEqual((groups[0].start, groups[0].end), (0, 8))
+
+    def test_bad_group(self):
+        m = regex.match('abc', 'abc')
+        with self.assertRaises(IndexError):
+            m.group(1)
+        with self.assertRaises(KeyError):
+            m.group('x')
+
+
+class TestRegexSearch(unittest.TestCase):
+
+    def test_match_whole_string(self):
+        self.assertEqual(bool(regex.match('a.*?b', 'axbxb')), True)
+        self.assertEqual(bool(regex.match('a.*?b', 'axbx')), False)
+
+    def test_search(self):
+        m = regex.search('b+c', 'aabbbcx')
+        self.assertEqual(m.span(), (2, 6))
+        self.assertEqual(regex.search('b+c', 'aabbbx'), None)
+        m = regex.search('([a-z]+)@([a-z]+)', 'mail: user@host!')
+        self.assertEqual((m.group(1), m.group(2)), ('user', 'host'))
+
+    def test_search_pos(self):
+        r = regex.Regex('ab')
+        self.assertEqual(r.search('abxab', 1).span(), (3, 5))
+
+    def test_finditer(self):
+        spans = [m.span() for m in regex.finditer('\\d+', 'a12b3c456')]
+        self.assertEqual(spans, [(1, 3), (4, 5), (6, 9)])
+
+    def test_finditer_empty(self):
+        spans = [m.span() for m in regex.finditer('x*', 'axxb')]
+        self.assertEqual(spans, [(0, 0), (1, 3), (3, 3), (4, 4)])
+
+    def test_finditer_after_empty(self):
+        # like re: after an empty match, a non-empty one may start at the same place
+        spans = [m.span() for m in regex.finditer('b*?', 'b xaa')]
+        self.assertEqual(spans, [(0, 0), (0, 1), (1, 1), (2, 2), (3, 3), (4, 4), (5, 5)])
+        self.assertEqual(regex.findall('a??', 'aa'), ['', 'a', '', 'a', ''])
+        self.assertEqual(regex.findall('x?', 'axxb'), ['', 'x', 'x', '', ''])
+
+    def test_findall(self):
+        self.assertEqual(regex.findall('\\d+', 'a12b3c456'), ['12', '3', '456'])
+        self.assertEqual(regex.findall('a(\\d)', 'a1a2'), ['1', '2'])
+        self.assertEqual(regex.findall('(\\w)(\\d)', 'a1b2'), [('a', '1'), ('b', '2')])
+
+    def test_leading(self):
+        self.assertEqual(regex.Regex('abc.*').leading(), ('abc', {'a'}))
+        self.assertEqual(regex.Regex('(ab)c').leading(), ('abc', {'a'}))
+        self.assertEqual(regex.Regex('a(b)(c)d*').leading(), ('abc', {'a'}))
+        self.assertEqual(regex.Regex('\\d+x').leading(), ('', DIGITS.charset))
+        self.assertEqual(regex.Regex('a{2,3}x').leading(), ('a', {'a'}))
+        self.assertEqual(regex.Regex('[x]+y').leading(), ('x', {'x'}))
+        self.assertEqual(regex.Regex('a*x').leading(), ('', None))
+        self.assertEqual(regex.Regex('.x').leading(), ('', None))
+        self.assertEqual(regex.Regex('[^a]x').leading(), ('', None))
+
+    def test_search_budget(self):
+        budget = Budget()
+        self.assertEqual(regex.search('zz', 'a' * 10, budget), None)
+        self.assertEqual(budget.steps, 0)
+        with self.assertRaises(MatchTimeout):
+            regex.search('a.*b', 'a' * 50, Budget(max_steps=20))
+
+
+class TestBatch(unittest.TestCase):
+
+    def test_match_many(self):
+        hits = regex.match_many('a\\d+', ['a1', 'b1', 'a', 'a123'])
+        self.assertEqual(hits, bytearray([1, 0, 0, 1]))
+
+    def test_match_many_groups(self):
+        r = regex.Regex('(a)(b*)')
+        self.assertEqual(list(r.match_many(['ab', 'a', 'b'])), [1, 1, 0])
+
+    def test_search_many(self):
+        self.assertEqual(regex.search_many(regex.Regex('\\d+'), ['abc', 'a12b3', '7']),
+                         [(1, (1, 3)), (2, (0, 1))])
+
+    def test_budget_per_input(self):
+        budget = Budget(max_steps=10)
+        self.assertEqual(list(regex.match_many('ab', ['ab'] * 10, budget)), [1] * 10)
+        with self.assertRaises(MatchTimeout):
+            regex.match_many('.*.*=', ['a' * 30], budget)
+
+
+class TestStats(unittest.TestCase):
+
+    def test_literal(self):
+        stats = MatchStats()
+        self.assertIsNotNone(regex.Regex('(a)b(c)').match('abc', stats=stats))
+        self.assertEqual(stats.as_dict(), {'states': 7, 'edges': 7, 'epsilon': 4, 'backtracks': 0,
+                                           'candidates': 0, 'peak_stack': 1})
+
+    def test_backtracking(self):
+        stats = MatchStats()
+        self.assertIsNotNone(regex.Regex('a?a?aa').match('aa', stats=stats))
+        self.assertGreater(stats.backtracks, 0)
+        self.assertEqual(stats.candidates, stats.backtracks + 2)
+        self.assertEqual(stats.peak_stack, 3)
+
+    def test_agrees_with_plain_match(self):
+        for p, s in [('a*b', 'aab'), ('a*b', 'aac'), ('x.*y', 'xay'), ('(\\d+)-(\\d+)', '12-3'),
+                     ('a?a?aa', 'aa'), ('.*.*=', 'a' * 8), ('(\\w+)@x{1,3}?', 'ab@xx')]:
+            r = regex.Regex(p)
+            b1, b2 = Budget(), Budget()
+            m1, m2 = r.match(s, b1, stats=MatchStats()), r.match(s, b2)
+            self.assertEqual(m1 and m1.spans, m2 and m2.spans, (p, s))
+            self.assertEqual(b1.steps, b2.steps, (p, s))
+        self.assertIsNot(r.counting(MatchStats()).e, r.e)
+
+    def test_budget(self):
+        stats = MatchStats()
+        with self.assertRaises(MatchTimeout):
+            regex.Regex('.*.*=').match('a' * 30, Budget(max_steps=10), stats=stats)
+        self.assertGreater(stats.candidates, 0)
+
+
+class TestUnicode(unittest.TestCase):
+
+    def test_property(self):
+        self.assertEqual(regex.findall('\\p{Han}+', '说中文 ok 汉字'), ['说中文', '汉字'])
+        self.assertEqual(regex.findall('\\P{L}+', 'ab12c-'), ['12', '-'])
+        self.assertIsNotNone(regex.match('\\p{Lu}\\p{Ll}+', 'Élan'))
+
+    def test_property_repeat(self):
+        self.assertEqual(regex.search('\\p{N}{2,3}', 'x½٣4y').span(), (1, 4))
+
+    def test_flag(self):
+        self.assertEqual(regex.findall('\\w+', 'héllo'), ['h', 'llo'])
+        self.assertEqual(regex.findall('\\w+', 'héllo wörld', flags=regex.UNICODE), ['héllo', 'wörld'])
+        self.assertIsNotNone(regex.match('\\d\\s\\W', '٣\u3000!', flags=regex.UNICODE))
+        self.assertIsNone(regex.match('\\D', '٣', flags=regex.UNICODE))
+
+    def test_unknown(self):
+        with self.assertRaises(Exception):
+            regex.Regex('\\p{Nope}')
+
+
+class TestAnchors(unittest.TestCase):
+
+    def test_start_end(self):
+        self.assertEqual([m.span() for m in regex.finditer('^ab', 'abab')], [(0, 2)])
+        self.assertEqual([m.span() for m in regex.finditer('ab$', 'abab')], [(2, 4)])
+        self.assertIsNotNone(regex.match('\\Aab\\Z', 'ab'))
+        self.assertIsNone(regex.search('a^b', 'a^b'))
+        self.assertIsNotNone(regex.search('a\\^b\\$', 'a^b$'))
+
+    def test_word_boundary(self):
+        self.assertEqual(regex.findall('\\bcat\\b', 'cat concat cats cat'), ['cat', 'cat'])
+        self.assertEqual([m.span() for m in regex.finditer('\\Bcat', 'cat concat')], [(7, 10)])
+        self.assertEqual([m.span() for m in regex.finditer('\\b', 'ab cd')], [(0, 0), (2, 2), (3, 3), (5, 5)])
+        self.assertEqual(regex.findall('\\b\\w', 'é x'), ['x'])
+        self.assertEqual(regex.findall('\\b\\w', 'é xé', flags=regex.UNICODE), ['é', 'x'])
+
+    def test_anchors(self):
+        r = regex.Regex('^(ab)')
+        self.assertEqual((r.anchor_start, r.window, r.prefix), (True, None, 'ab'))
+        self.assertIsNone(r.search('xab'))
+        r = regex.Regex('a?b{2,3}$')
+        self.assertEqual((r.anchor_start, r.window), (False, 4))
+        self.assertEqual([m.span() for m in r.finditer('abbbbb')], [(3, 6)])
+        self.assertIsNone(regex.Regex('a+$').window)
+
+    def test_end_before_final_newline(self):
+        self.assertIsNone(regex.search('a$', 'a\n'))
+        self.assertIsNone(regex.search('^$', '\n'))
+        self.assertEqual(regex.search('a$', 'a\n', flags=regex.MULTILINE).span(), (0, 1))
+
+    def test_empty_at_end(self):
+        self.assertEqual([m.span() for m in regex.finditer('a?$', 'baa')], [(2, 3), (3, 3)])
+        self.assertEqual([m.span() for m in regex.finditer('$', 'ab')], [(2, 2)])
+
+    def test_quantified(self):
+        with self.assertRaises(Exception):
+            regex.Regex('\\b+')
+
+    def test_multiline(self):
+        text = 'a 1\nb 22\n333\n'
+        self.assertEqual(regex.findall('^\\w', text, flags=regex.MULTILINE), ['a', 'b', '3'])
+        self.assertEqual(regex.findall('^\\w', text), ['a'])
+        self.assertEqual(regex.findall('\\d+$', text, flags=regex.MULTILINE), ['1', '22', '333'])
+        self.assertEqual(regex.findall('\\A\\w', 'ab\ncd', flags=regex.MULTILINE), ['a'])
+        self.assertEqual(regex.findall('\\w\\Z', 'ab\ncd', flags=regex.MULTILINE), ['d'])
+
+    def test_line_anchors(self):
+        r = regex.Regex('^b', flags=regex.MULTILINE)
+        self.assertEqual((r.anchor_start, r.anchor_lines, r.prefix), (False, True, 'b'))
+        r = regex.Regex('\\d{1,2}$', flags=regex.MULTILINE)
+        self.assertEqual((r.window, r.line_window), (None, 2))
+        text = 'a 1\nb 22\n333\n'
+        lines = regex.LineIndex(text)
+        self.assertEqual([m.span() for m in r.finditer(text, lines=lines)], [(2, 3), (6, 8), (10, 12)])
+        self.assertEqual(regex.Regex('^\\d', flags=regex.MULTILINE).search(text, lines=lines).span(), (9, 10))
+        with self.assertRaises(Exception):
+            r.search('12', lines=lines)
+
+
+class TestIgnoreCase(unittest.TestCase):
+
+    def test_match(self):
+        r = regex.Regex('(?P<w>hello) [a-c]+ [^x]z*', flags=regex.IGNORECASE)
+        self.assertEqual(r.match('HeLLo AbC yZZ').group('w'), 'HeLLo')
+        self.assertIsNone(r.match('hello abc X'))
+        self.assertIsNone(regex.match('hello', 'HELLO'))
+
+    def test_search(self):
+        self.assertEqual(regex.findall('error', 'Error ERROR eRRor', flags=regex.IGNORECASE),
+                         ['Error', 'ERROR', 'eRRor'])
+        self.assertEqual(regex.search('x+y', 'aXxY', flags=regex.IGNORECASE).span(), (1, 4))
+
+    def test_reverse_mappings(self):
+        self.assertEqual(regex.match('kiss', '\u212aiſs', flags=regex.IGNORECASE).span(), (0, 4))
+        self.assertIsNotNone(regex.match('[a-z]+', '\u212a', flags=regex.IGNORECASE))
+
+    def test_uncased(self):
+        r = regex.Regex('12-\\d', flags=regex.IGNORECASE)
+        self.assertEqual(r.prefix, '12-')
+        self.assertIs(r.e[-1], SPECIAL_QUOTES['d'])
+
+    def test_anchored_end(self):
+        r = regex.Regex('ab$', flags=regex.IGNORECASE)
+        self.assertEqual(r.window, 2)
+        self.assertEqual([m.span() for m in r.finditer('abAB')], [(2, 4)])
+        self.assertIsNotNone(regex.match('x?Hi\\Z', 'hI', flags=regex.IGNORECASE))
+
+    def test_leading(self):
+        r = regex.Regex('get', flags=regex.IGNORECASE)
+        self.assertEqual((r.prefix, r.firsts), ('', {'g', 'G'}))
+        self.assertEqual(set(r.needles), {'get', 'geT', 'gEt', 'gET', 'Get', 'GeT', 'GEt', 'GET'})
+        self.assertEqual(len(regex.Regex('error', flags=regex.IGNORECASE).needles), 8)
+        self.assertEqual(len(regex.Regex('[ab]x').needles), 2)
+        self.assertIsNone(regex.Regex('\\dx').needles)
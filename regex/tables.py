@@ -0,0 +1,89 @@
+"""
+Compiled Regex as plain tables of tuples, strings and numbers.
+
+The tables can be dumped as JSON or as a Python literal and turned back
+into a Regex without parsing the pattern again. Elements are tuples of
+their kind and fields; \\d and friends are stored by name, so reloaded
+patterns share them like compiled ones do.
+"""
+from typing import Dict, Sequence, Tuple
+
+from common.unicode import table
+
+from .matcher import Str, FoldedStr, Any, Charset, Ranges, Assert, SPECIAL_QUOTES, Group, GroupStart, GroupEnd, any
+from .regex import Regex, Search
+
+
+def element_to_table(m: object) -> Tuple:
+    """Table form of one element: its kind followed by its fields."""
+    if isinstance(m, Str):
+        return ('str', str(m))
+    if isinstance(m, FoldedStr):
+        return ('fold', m.text)
+    if isinstance(m, Any):
+        return ('any',)
+    if isinstance(m, Charset):
+        for k, sq in SPECIAL_QUOTES.items():
+            if m is sq:
+                return ('quote', k)
+        return ('charset', ''.join(sorted(m.charset)), m.include)
+    if isinstance(m, Ranges):
+        return ('ranges', m.table.name, m.include)
+    if isinstance(m, Assert):
+        return ('assert', m.kind, m.unicode, m.multiline)
+    if isinstance(m, Search):
+        return ('search', element_to_table(m.m), m.repeat, m.greedy)
+    if isinstance(m, GroupStart):
+        return ('start', m.group.n)
+    if isinstance(m, GroupEnd):
+        return ('end', m.group.n)
+    raise Exception(f'cannot export element {m!r}')
+
+
+def element_from_table(data: Sequence, groups: Dict[int, Group]) -> object:
+    """Rebuild an element from element_to_table() output."""
+    kind = data[0]
+    if kind == 'str':
+        return Str(data[1])
+    if kind == 'fold':
+        return FoldedStr(data[1])
+    if kind == 'any':
+        return any
+    if kind == 'quote':
+        return SPECIAL_QUOTES[data[1]]
+    if kind == 'charset':
+        return Charset(set(data[1]), data[2])
+    if kind == 'ranges':
+        return Ranges(table(data[1]), data[2])
+    if kind == 'assert':
+        return Assert(data[1], data[2], data[3])
+    if kind == 'search':
+        return Search(element_from_table(data[1], groups), data[2], data[3])
+    if kind == 'start':
+        return groups[data[1]].left
+    if kind == 'end':
+        return groups[data[1]].right
+    raise Exception(f'unknown element kind {kind!r}')
+
+
+def to_tables(r: Regex) -> Tuple:
+    """
+    Tables of a compiled Regex: its elements, its (name, n) groups and
+    its flags.
+
+    Made of tuples, strings and numbers only, so written out as a Python
+    literal it compiles to a single constant.
+    """
+    elements = tuple(element_to_table(m) for m in r.e)
+    return elements, tuple((g.name, g.n) for g in r.groups), int(r.flags)
+
+
+def from_tables(data: Sequence[Sequence]) -> Regex:
+    """Rebuild the Regex described by to_tables() output."""
+    elements, groups_table, flags = data
+    r = Regex(flags=flags)
+    r.groups = [Group(name, n) for name, n in groups_table]
+    groups = {g.n: g for g in r.groups}
+    r.e = [element_from_table(m, groups) for m in elements]
+    r._finish()
+    return r
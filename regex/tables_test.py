@@ -0,0 +1,72 @@
+import json
+import unittest
+
+from common.flags import IGNORECASE, UNICODE, MULTILINE
+
+from .regex import Regex
+from .matcher import SPECIAL_QUOTES, any
+from .tables import to_tables, from_tables, element_from_table
+
+
+class TestTables(unittest.TestCase):
+
+    def reload(self, exp):
+        return from_tables(to_tables(Regex(exp)))
+
+    def test_elements(self):
+        r = Regex('ab[^x-z].\\d+?c{2,3}')
+        back = self.reload('ab[^x-z].\\d+?c{2,3}')
+        self.assertEqual(repr(back.e), repr(r.e))
+        self.assertIs(back.e[2], any)
+        self.assertIs(back.e[3].m, SPECIAL_QUOTES['d'])
+        self.assertEqual((back.prefix, back.firsts), (r.prefix, r.firsts))
+
+    def test_groups(self):
+        r = self.reload('(?P<user>\\w+):(\\d+)')
+        m = r.match('bob:12')
+        self.assertEqual(m.groupdict(), {'user': 'bob'})
+        self.assertEqual(m.group(2), '12')
+        self.assertIs(r.e[0].group, r.groups[0])
+
+    def test_constant(self):
+        # tuples all the way down, so the tables are a compile-time literal
+        tables = to_tables(Regex('(a)[bc]*\\s.'))
+        self.assertEqual(eval(repr(tables)), tables)
+        self.assertEqual(from_tables(json.loads(json.dumps(tables))).match('abcb x').span(), (0, 6))
+
+    def test_matches(self):
+        for exp in ['\\w+@\\w+\\.com', 'a.*?b', '[0-9]{2,4}x?', '\\p{L}+\\P{L}']:
+            r, back = Regex(exp), self.reload(exp)
+            for s in ['me@host.com', 'axxbb', '123x', '1', '']:
+                self.assertEqual(repr(back.search(s)), repr(r.search(s)), (exp, s))
+
+    def test_ignorecase(self):
+        r = from_tables(to_tables(Regex('hello [a-c]', flags=IGNORECASE)))
+        self.assertIsNotNone(r.match('HeLLo B'))
+        self.assertEqual(r.firsts, {'h', 'H'})
+        self.assertEqual(r.flags, IGNORECASE)
+
+    def test_flags(self):
+        for flags in [0, UNICODE, MULTILINE | IGNORECASE]:
+            r = Regex('^a\\w$', flags=flags)
+            back = from_tables(to_tables(r))
+            self.assertEqual(back.flags, r.flags)
+            self.assertEqual(vars(back).keys(), vars(r).keys())
+
+    def test_assertions(self):
+        r = Regex('^\\bab\\B.$', flags=UNICODE)
+        back = from_tables(to_tables(r))
+        self.assertEqual(back.e, r.e)
+        self.assertEqual((back.anchor_start, back.window), (True, 3))
+        self.assertIsNotNone(back.match('abé'))
+
+    def test_multiline(self):
+        r = Regex('^ab$', flags=MULTILINE)
+        back = from_tables(to_tables(r))
+        self.assertEqual(back.e, r.e)
+        self.assertEqual((back.anchor_start, back.anchor_lines, back.line_window), (False, True, 2))
+        self.assertEqual([m.span() for m in back.finditer('x\nab\n')], [(2, 4)])
+
+    def test_unknown(self):
+        with self.assertRaises(Exception):
+            element_from_table(('nope',), {})
@@ -5,7 +5,9 @@ Quick test suite for regex library - supports both regex and nfa implementations
 
 import argparse
 import sys
-from typing import Callable
+import re
+import time
+from typing import Callable, Dict, List, Optional, Tuple
 
 
 def test_case(name: str, pattern: str, text: str, expected: bool,
@@ -21,60 +23,94 @@ def test_case(name: str, pattern: str, text: str, expected: bool,
         return False
 
 
-def run_regex_tests() -> bool:
-    """Run tests using the regex implementation"""
-    import regex
+# (name, pattern, text, expected) cases of each suite
+REGEX_TESTS: List[Tuple[str, str, str, bool]] = [
+    # 1. Basic wildcard matching with .*
+    ("Wildcard match (.*)", "abc.*def", "abcXYZdef", True),
 
-    def regex_matcher(pattern: str, text: str) -> bool:
-        return bool(regex.match(pattern, text))
+    # 2. One or more matches with .+
+    ("One or more (.+)", "abc.+def", "abczdef", True),
 
-    print("=" * 100)
-    print("Regex Implementation Test Suite")
-    print("=" * 100)
+    # 3. Optional match with .?
+    ("Optional match (.?)", "abc.?def", "abcdef", True),
+
+    # 4. Character class [a-z]
+    ("Character class", "abc[a-z]*def", "abczzdef", True),
+
+    # 5. Negated character class [^a-z]
+    ("Negated class", "abc[^a-z]*def", "abcZZdef", True),
+
+    # 6. Digit matching with \d
+    ("Digit match (\\d)", "abc\\ddef", "abc0def", True),
+
+    # 7. Whitespace matching with \s
+    ("Whitespace (\\s)", "abc\\sdef", "abc def", True),
+
+    # 8. Escape special characters
+    ("Escape special chars", "abc\\.\\*def", "abc.*def", True),
+
+    # 9. Repetition count {n,m}
+    ("Repetition {n,m}", "abc.{2,3}def", "abczzdef", True),
 
-    tests = [
-        # 1. Basic wildcard matching with .*
-        ("Wildcard match (.*)", "abc.*def", "abcXYZdef", True),
+    # 10. Capturing groups
+    ("Capturing groups", "abc([a-z]*)def", "abczzdef", True),
+]
 
-        # 2. One or more matches with .+
-        ("One or more (.+)", "abc.+def", "abczdef", True),
+NFA_TESTS: List[Tuple[str, str, str, bool]] = [
+    # 1. Basic wildcard matching with .*
+    ("Wildcard match (.*)", "abc.*def", "abcXYZdef", True),
 
-        # 3. Optional match with .?
-        ("Optional match (.?)", "abc.?def", "abcdef", True),
+    # 2. One or more matches with .+
+    ("One or more (.+)", "abc.+def", "abczdef", True),
 
-        # 4. Character class [a-z]
-        ("Character class", "abc[a-z]*def", "abczzdef", True),
+    # 3. Optional match with .?
+    ("Optional match (.?)", "abc.?def", "abcdef", True),
 
-        # 5. Negated character class [^a-z]
-        ("Negated class", "abc[^a-z]*def", "abcZZdef", True),
+    # 4. Character class [a-z]
+    ("Character class", "abc[a-z]*def", "abczzdef", True),
 
-        # 6. Digit matching with \d
-        ("Digit match (\\d)", "abc\\ddef", "abc0def", True),
+    # 5. Negated character class [^a-z]
+    ("Negated class", "abc[^a-z]*def", "abcZZdef", True),
 
-        # 7. Whitespace matching with \s
-        ("Whitespace (\\s)", "abc\\sdef", "abc def", True),
+    # 6. Digit matching with \d
+    ("Digit match (\\d)", "abc\\ddef", "abc0def", True),
 
-        # 8. Escape special characters
-        ("Escape special chars", "abc\\.\\*def", "abc.*def", True),
+    # 7. Whitespace matching with \s
+    ("Whitespace (\\s)", "abc\\sdef", "abc def", True),
 
-        # 9. Repetition count {n,m}
-        ("Repetition {n,m}", "abc.{2,3}def", "abczzdef", True),
+    # 8. Escape special characters
+    ("Escape special chars", "abc\\.\\*def", "abc.*def", True),
 
-        # 10. Capturing groups
-        ("Capturing groups", "abc([a-z]*)def", "abczzdef", True),
-    ]
+    # 9. Non-greedy quantifiers
+    ("Non-greedy (*?)", "a.*?b", "aXXXb", True),
+
+    # 10. Alternation (|)
+    ("Alternation (|)", "abc|def", "abc", True),
+]
+
+
+def run_regex_tests() -> bool:
+    """Run tests using the regex implementation"""
+    import regex
+
+    def regex_matcher(pattern: str, text: str) -> bool:
+        return bool(regex.match(pattern, text))
+
+    print("=" * 100)
+    print("Regex Implementation Test Suite")
+    print("=" * 100)
 
     passed = 0
     failed = 0
 
-    for test in tests:
+    for test in REGEX_TESTS:
         if test_case(*test, match_func=regex_matcher):
             passed += 1
         else:
             failed += 1
 
     print("=" * 100)
-    print(f"Regex Results: {passed} passed, {failed} failed out of {len(tests)} tests")
+    print(f"Regex Results: {passed} passed, {failed} failed out of {len(REGEX_TESTS)} tests")
     print("=" * 100)
 
     return failed == 0
@@ -92,51 +128,90 @@ def run_nfa_tests() -> bool:
     print("NFA Implementation Test Suite")
     print("=" * 100)
 
-    tests = [
-        # 1. Basic wildcard matching with .*
-        ("Wildcard match (.*)", "abc.*def", "abcXYZdef", True),
+    passed = 0
+    failed = 0
 
-        # 2. One or more matches with .+
-        ("One or more (.+)", "abc.+def", "abczdef", True),
+    for test in NFA_TESTS:
+        if test_case(*test, match_func=nfa_matcher):
+            passed += 1
+        else:
+            failed += 1
 
-        # 3. Optional match with .?
-        ("Optional match (.?)", "abc.?def", "abcdef", True),
+    print("=" * 100)
+    print(f"NFA Results: {passed} passed, {failed} failed out of {len(NFA_TESTS)} tests")
+    print("=" * 100)
 
-        # 4. Character class [a-z]
-        ("Character class", "abc[a-z]*def", "abczzdef", True),
+    return failed == 0
 
-        # 5. Negated character class [^a-z]
-        ("Negated class", "abc[^a-z]*def", "abcZZdef", True),
 
-        # 6. Digit matching with \d
-        ("Digit match (\\d)", "abc\\ddef", "abc0def", True),
+def compilers() -> Dict[str, Callable[[str], Callable[[str], bool]]]:
+    """Compile a pattern once with each engine into a full-match function"""
+    import regex
+    import nfa
 
-        # 7. Whitespace matching with \s
-        ("Whitespace (\\s)", "abc\\sdef", "abc def", True),
+    def regex_compiler(pattern: str) -> Callable[[str], bool]:
+        compiled = regex.Regex(pattern)
+        return lambda text: bool(compiled.match(text))
 
-        # 8. Escape special characters
-        ("Escape special chars", "abc\\.\\*def", "abc.*def", True),
+    def re_compiler(pattern: str) -> Callable[[str], bool]:
+        compiled = re.compile(pattern)
+        return lambda text: bool(compiled.fullmatch(text))
 
-        # 9. Non-greedy quantifiers
-        ("Non-greedy (*?)", "a.*?b", "aXXXb", True),
+    def nfa_compiler(pattern: str) -> Callable[[str], bool]:
+        return nfa.compile(pattern).match
 
-        # 10. Alternation (|)
-        ("Alternation (|)", "abc|def", "abc", True),
-    ]
+    return {'regex': regex_compiler, 'nfa': nfa_compiler, 're': re_compiler}
 
-    passed = 0
-    failed = 0
 
-    for test in tests:
-        if test_case(*test, match_func=nfa_matcher):
-            passed += 1
-        else:
-            failed += 1
+def percentile(samples: List[float], p: float) -> float:
+    """Nearest-rank percentile of sorted samples"""
+    return samples[min(len(samples) - 1, max(0, round(p / 100 * len(samples)) - 1))]
 
+
+def time_case(match_func: Callable[[str], bool], text: str, expected: bool,
+              runs: int) -> Optional[Tuple[str, List[float]]]:
+    """Run one case many times, return its status mark and sorted latencies in µs"""
+    try:
+        status = "✓" if match_func(text) == expected else "✗"
+    except Exception:
+        return None
+    samples = []
+    for _ in range(runs):
+        t = time.perf_counter()
+        match_func(text)
+        samples.append((time.perf_counter() - t) * 1e6)
+    samples.sort()
+    return status, samples
+
+
+def run_timing(name: str, tests: List[Tuple[str, str, str, bool]], runs: int) -> bool:
+    """Time every case with regex, nfa and re side by side, report p50/p95/p99 in µs"""
+    engines = compilers()
     print("=" * 100)
-    print(f"NFA Results: {passed} passed, {failed} failed out of {len(tests)} tests")
+    print(f"{name} Suite Timing: {runs} runs per case, p50/p95/p99 latency in µs")
     print("=" * 100)
+    print(f"  {'':30s} | " + " | ".join(f"{e:^22s}" for e in engines))
 
+    failed = 0
+    for case, pattern, text, expected in tests:
+        cols = []
+        for engine, compiler in engines.items():
+            try:
+                timing = time_case(compiler(pattern), text, expected, runs)
+            except Exception:
+                timing = None
+            if timing is None:
+                cols.append(f"{'error':^22s}")
+                continue
+            status, samples = timing
+            cols.append(f"{status} " + "/".join(f"{percentile(samples, p):6.1f}" for p in (50, 95, 99)))
+        # The suite's own engine decides pass/fail, as in the correctness run
+        own = cols[0] if name == 'Regex' else cols[1]
+        mark = "✓" if own.startswith("✓") else "✗"
+        failed += mark == "✗"
+        print(f"{mark} {case:30s} | " + " | ".join(cols))
+
+    print("=" * 100)
     return failed == 0
 
 
@@ -149,6 +224,7 @@ Examples:
   %(prog)s              # Run both regex and nfa tests
   %(prog)s --impl regex # Run only regex tests
   %(prog)s --impl nfa   # Run only nfa tests
+  %(prog)s --timing     # Also time every case against re, with percentiles
         """
     )
     parser.add_argument(
@@ -158,8 +234,28 @@ Examples:
         help='Select implementation to test (default: all)'
     )
 
+    parser.add_argument(
+        '--timing',
+        action='store_true',
+        help='Run each case many times and report p50/p95/p99 latency for regex, nfa and re'
+    )
+    parser.add_argument(
+        '--runs',
+        type=int,
+        default=1000,
+        help='Runs per case in timing mode (default: 1000)'
+    )
+
     args = parser.parse_args()
 
+    if args.timing:
+        results = []
+        if args.impl in ['regex', 'all']:
+            results.append(run_timing('Regex', REGEX_TESTS, args.runs))
+        if args.impl in ['nfa', 'all']:
+            results.append(run_timing('NFA', NFA_TESTS, args.runs))
+        return all(results)
+
     results = []
 
     if args.impl in ['regex', 'all']: